@@ -0,0 +1,217 @@
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from cache import TieredCache
+from nlp_processor import BaseNLPProcessor, EMPTY_PARAMS
+from rate_limiter import parse_retry_after
+from transport import RETRY_STATUSES, TransportMetrics, backoff_delay
+
+# aiohttp opsional, hanya dibutuhkan untuk NLP processor asyncio
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+class AsyncNLPProcessor(BaseNLPProcessor):
+    """
+    Versi asyncio dari NLPProcessor dengan prompt, cache, validasi, dan ekstraktor aturan yang sama.
+
+    Semua request memakai satu aiohttp.ClientSession (koneksi keep-alive bersama), jumlah
+    request bersamaan dibatasi semaphore, dan timeout serta retry (backoff + Retry-After
+    untuk 429/5xx) sama dengan HTTPTransport; latensi, retry, dan error dicatat di metrics.
+    Gunakan sebagai async context manager atau panggil close() ketika selesai.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[TieredCache] = None,
+                 vocabulary: Optional[Dict[str, Dict[str, str]]] = None,
+                 max_batch_tokens: int = 2000, max_batch_size: int = 50, max_concurrency: int = 8,
+                 instrumentation=None, connect_timeout: float = 5.0, read_timeout: float = 60.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, backoff_max: float = 30.0,
+                 retry_statuses=RETRY_STATUSES, debug: bool = False):
+        """
+        Args:
+            api_key, cache, vocabulary, max_batch_tokens, max_batch_size, max_concurrency, instrumentation:
+                Lihat BaseNLPProcessor
+            connect_timeout, read_timeout, max_retries, backoff_factor, backoff_max, retry_statuses:
+                Sama dengan argumen HTTPTransport
+            debug: Cetak informasi retry
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("AsyncNLPProcessor membutuhkan aiohttp. Instal dengan: pip install aiohttp")
+
+        super().__init__(api_key=api_key, cache=cache, vocabulary=vocabulary, max_batch_tokens=max_batch_tokens,
+                         max_batch_size=max_batch_size, max_concurrency=max_concurrency,
+                         instrumentation=instrumentation)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.debug = debug
+        self.metrics = TransportMetrics()
+        # ClientSession aiohttp dibuat saat pertama dipakai, di dalam event loop yang berjalan
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Tutup connection pool"""
+        if self._client is not None and not self._client.closed:
+            await self._client.close()
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None or self._client.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._client = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _chat(self, messages, **options) -> Dict[str, Any]:
+        """Versi asyncio dari NLPProcessor._chat(), dengan retry seperti HTTPTransport._send()"""
+        client = self._get_client()
+        payload = self._payload(messages, **options)
+
+        started, start = time.time(), time.perf_counter()
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._semaphore:
+                attempt_start = time.perf_counter()
+                try:
+                    async with client.post(self.api_url, headers=self._request_headers(), json=payload) as response:
+                        self.metrics.record(time.perf_counter() - attempt_start)
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        give_up = (
+                            response.status not in self.retry_statuses
+                            or attempt >= self.max_retries
+                            or (retry_after is not None and retry_after > self.backoff_max)
+                        )
+                        if give_up:
+                            if response.status in self.retry_statuses:
+                                self.metrics.record_error()
+                            response.raise_for_status()
+                            result = await response.json()
+                            self._record_call(started, start, attempt, result)
+                            return result["choices"][0]
+                        reason = f"HTTP {response.status}"
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    self.metrics.record(time.perf_counter() - attempt_start)
+                    if attempt >= self.max_retries:
+                        self.metrics.record_error()
+                        raise
+                    reason = e.__class__.__name__
+
+            # Tunggu di luar semaphore agar slot bisa dipakai request lain
+            delay = max(backoff_delay(attempt, self.backoff_factor, self.backoff_max), retry_after or 0)
+            attempt += 1
+            self.metrics.record_retry()
+            self.instrumentation.count("http.retries", method="POST")
+            if self.debug:
+                print(f"Debug - POST {self.api_url} gagal ({reason}), retry {attempt}/{self.max_retries} dalam {delay:.2f} detik")
+            await asyncio.sleep(delay)
+
+    def _record_call(self, started: float, start: float, attempt: int, result: Dict[str, Any]) -> None:
+        # Banyak task berjalan bersamaan di satu thread, jadi span dicatat setelah selesai
+        usage = result.get("usage") or {}
+        self.instrumentation.record("llm.call", started, time.perf_counter() - start, model=self.model,
+                                    attempts=attempt + 1, prompt_tokens=usage.get("prompt_tokens"),
+                                    completion_tokens=usage.get("completion_tokens"))
+
+    async def parse_command(self, query: str, remember: bool = True) -> Dict[str, Any]:
+        """Versi asyncio dari NLPProcessor.parse_command()"""
+        local = self._local_result(query)
+        if local is not None:
+            return local
+
+        if not self.api_key:
+            print("Perintah tidak dapat dianalisis tanpa OpenAI API key (mode offline hanya mengenali nama opsi situs)")
+            return dict(EMPTY_PARAMS)
+
+        try:
+            messages = self._command_messages(query)
+            choice = await self._chat(messages, response_format=self.response_format)
+            params, problems = self._check_choice(choice)
+            if problems:
+                self.corrections += 1
+                choice = await self._chat(self._correction_messages(messages, choice, problems),
+                                          response_format=self.response_format)
+                params, problems = self._check_choice(choice)
+            return self._finish_command(query, params, problems, remember)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error saat menghubungi OpenAI API: {e}")
+            return dict(EMPTY_PARAMS)
+        except Exception as e:
+            print(f"Error saat memproses respons: {e}")
+            return dict(EMPTY_PARAMS)
+
+    async def revalidate(self, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Versi asyncio dari NLPProcessor.revalidate()"""
+        clean, problems = self._validate(params)
+        if problems and self.api_key:
+            self.corrections += 1
+            try:
+                choice = await self._chat(self._revalidation_messages(query, params, problems),
+                                          response_format=self.response_format)
+                clean, problems = self._check_choice(choice)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error saat menghubungi OpenAI API: {e}")
+            except Exception as e:
+                print(f"Error saat memproses respons: {e}")
+        return self._finish_command(query, clean, problems)
+
+    async def parse_many(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Analisis banyak query satu per satu secara bersamaan (dibatasi max_concurrency)"""
+        return list(await asyncio.gather(*(self.parse_command(query) for query in queries)))
+
+    async def _parse_batch(self, queries: List[str]) -> Dict[str, Dict[str, Any]]:
+        messages, options = self._batch_request(queries)
+        results = self._decode_batch(queries, await self._chat(messages, **options))
+        if results is None:
+            middle = len(queries) // 2
+            halves = await asyncio.gather(self._parse_batch(queries[:middle]), self._parse_batch(queries[middle:]))
+            results = {**halves[0], **halves[1]}
+        return results
+
+    async def parse_commands(self, queries: List[str], remember: bool = True) -> List[Dict[str, Any]]:
+        """Versi asyncio dari NLPProcessor.parse_commands(); batch dikirim bersamaan"""
+        results, pending = self._pending_queries(queries)
+
+        answers: Dict[str, Dict[str, Any]] = {}
+        if pending and not self.api_key:
+            print(f"{len(pending)} perintah tidak dapat dianalisis tanpa OpenAI API key")
+        elif pending:
+            batches = self._split_batches(list(pending.values()))
+            outcomes = await asyncio.gather(*(self._parse_batch(batch) for batch in batches), return_exceptions=True)
+
+            answered: Dict[str, Dict[str, Any]] = {}
+            unreachable = set()
+            for batch, outcome in zip(batches, outcomes):
+                if isinstance(outcome, (aiohttp.ClientError, asyncio.TimeoutError)):
+                    # API tidak bisa dihubungi: jangan ulangi satu per satu (_chat sudah retry)
+                    print(f"Error saat menghubungi OpenAI API: {outcome}")
+                    unreachable.update(batch)
+                elif isinstance(outcome, BaseException):
+                    print(f"Error saat memproses respons batch: {outcome}")
+                else:
+                    answered.update(outcome)
+            self._collect_answers(pending, answered, unreachable, answers, remember)
+
+            # Tidak ada di jawaban batch: analisis satu per satu
+            missing = [(key, query) for key, query in pending.items() if key not in answers]
+            singles = await asyncio.gather(*(self.parse_command(query, remember) for _, query in missing))
+            for (key, _), params in zip(missing, singles):
+                answers[key] = params
+
+        return self._merge_answers(queries, results, answers)
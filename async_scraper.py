@@ -0,0 +1,264 @@
+import time
+import asyncio
+
+from cache import ResponseCache
+from mrscraper import BaseAMGRScraper
+from rate_limiter import parse_retry_after
+from transport import RETRY_STATUSES, TransportMetrics, backoff_delay
+
+# aiohttp opsional, hanya dibutuhkan untuk scraper asyncio
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+class AsyncAMGRScraper(BaseAMGRScraper):
+    """
+    Versi asyncio dari AMGRScraper dengan perilaku get_options/search/_parse_results yang sama.
+
+    Semua request memakai satu aiohttp.ClientSession (connection pool bersama) dan
+    jumlah request bersamaan dibatasi semaphore. Timeout dan retry (backoff + Retry-After
+    untuk 429/5xx) sama dengan HTTPTransport; parsing HTML dan I/O disk cache response
+    dijalankan di thread pool agar tidak memblokir event loop. Gunakan sebagai async
+    context manager atau panggil close() ketika selesai.
+    """
+
+    def __init__(self, debug=False, catalog=None, max_concurrency=8, max_per_host=4, parser="auto", rate_limiter=None,
+                 response_cache=None, result_cache=None, instrumentation=None, capture=None,
+                 connect_timeout=5.0, read_timeout=30.0, max_retries=3, backoff_factor=0.5, backoff_max=30.0,
+                 retry_statuses=RETRY_STATUSES, executor=None):
+        """
+        Args:
+            max_concurrency: Jumlah request bersamaan (semua host)
+            max_per_host: Jumlah koneksi bersamaan per host
+            connect_timeout, read_timeout, max_retries, backoff_factor, backoff_max, retry_statuses:
+                Sama dengan argumen HTTPTransport
+            executor: Executor untuk parsing HTML (None = executor default event loop)
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("AsyncAMGRScraper membutuhkan aiohttp. Instal dengan: pip install aiohttp")
+
+        super().__init__(debug=debug, catalog=catalog, parser=parser, response_cache=response_cache,
+                         result_cache=result_cache, instrumentation=instrumentation, capture=capture)
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.rate_limiter = rate_limiter
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.executor = executor
+        self.metrics = TransportMetrics()
+        # ClientSession aiohttp dibuat saat pertama dipakai, di dalam event loop yang berjalan
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Tutup connection pool"""
+        if self._client is not None and not self._client.closed:
+            await self._client.close()
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None or self._client.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_per_host)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self._client = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=timeout)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _in_executor(self, func, *args):
+        """Jalankan pekerjaan CPU (parsing) di thread pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _request(self, method, extra_headers=None, data=None, raise_for_status=False):
+        """
+        Kirim request dengan retry dan kembalikan (status, headers, content)
+
+        Seperti AMGRScraper, status error hanya dijadikan exception jika raise_for_status
+        (halaman utama untuk katalog); halaman hasil pencarian di-parse apa pun statusnya.
+        """
+        # Banyak task berjalan bersamaan di satu thread, jadi span dicatat setelah selesai
+        started, start = time.time(), time.perf_counter()
+        try:
+            status, headers, content, attempts = await self._send(method, extra_headers, data, raise_for_status)
+        except BaseException as e:
+            self.instrumentation.record(f"http.{method.lower()}", started, time.perf_counter() - start,
+                                        e.__class__.__name__, url=self.base_url)
+            raise
+        self.instrumentation.record(f"http.{method.lower()}", started, time.perf_counter() - start,
+                                    url=self.base_url, status=status, attempts=attempts)
+        self.instrumentation.count("http.bytes_downloaded", len(content), method=method)
+        return status, headers, content
+
+    async def _send(self, method, extra_headers, data, raise_for_status):
+        """Versi asyncio dari HTTPTransport._send()"""
+        client = self._get_client()
+        rate_limiter = self.rate_limiter
+
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._semaphore:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire_async()
+                start = time.perf_counter()
+                try:
+                    async with client.request(method, self.base_url, headers=extra_headers, data=data) as response:
+                        self.metrics.record(time.perf_counter() - start)
+                        if rate_limiter is not None:
+                            await rate_limiter.feedback_async(response.status, response.headers.get("Retry-After"))
+
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        give_up = (
+                            response.status not in self.retry_statuses
+                            or attempt >= self.max_retries
+                            or (retry_after is not None and retry_after > self.backoff_max)
+                        )
+                        if give_up:
+                            if response.status in self.retry_statuses:
+                                self.metrics.record_error()
+                            if raise_for_status and response.status != 304:
+                                response.raise_for_status()
+                            content = await response.read()
+                            return response.status, response.headers, content, attempt + 1
+                        reason = f"HTTP {response.status}"
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    self.metrics.record(time.perf_counter() - start)
+                    if attempt >= self.max_retries:
+                        self.metrics.record_error()
+                        raise
+                    reason = e.__class__.__name__
+
+            # Tunggu di luar semaphore agar slot bisa dipakai request lain
+            delay = max(backoff_delay(attempt, self.backoff_factor, self.backoff_max), retry_after or 0)
+            attempt += 1
+            self.metrics.record_retry()
+            self.instrumentation.count("http.retries", method=method)
+            if self.debug:
+                print(f"Debug - {method} {self.base_url} gagal ({reason}), retry {attempt}/{self.max_retries} dalam {delay:.2f} detik")
+            await asyncio.sleep(delay)
+
+    async def get_page_source(self):
+        """Ambil source HTML dari halaman utama"""
+        _, _, content = await self._request("GET")
+        return content
+
+    async def _load_catalog(self, previous=None):
+        """Ambil halaman utama dan bangun entry katalog baru (dengan validasi kondisional)"""
+        started, start = time.time(), time.perf_counter()
+        extra_headers = self._conditional_headers(previous)
+
+        if self.debug:
+            print(f"Debug - Loading option catalog from main page (conditional={bool(extra_headers)})...")
+
+        status, headers, content = await self._request("GET", extra_headers=extra_headers, raise_for_status=True)
+        if status != 304:
+            self._capture_html("main_page", content, self.base_url)
+        entry = await self._in_executor(self._catalog_from_response, previous, status, headers, content)
+        self.instrumentation.record("catalog.load", started, time.perf_counter() - start,
+                                    conditional=previous is not None)
+        return entry
+
+    async def _get_catalog(self):
+        return await self.catalog.aget(self._load_catalog)
+
+    async def get_options(self, refresh=False):
+        """Ambil daftar pilihan untuk state, member, dan breed"""
+        if refresh:
+            self.catalog.invalidate()
+
+        entry = await self._get_catalog()
+        return {
+            'states': dict(entry['states']),
+            'members': dict(entry['members']),
+            'breeds': dict(entry['breeds'])
+        }
+
+    async def search(self, state=None, member=None, breed=None):
+        """Lakukan pencarian dengan filter yang disediakan"""
+        if not state and not member and not breed:
+            if self.debug:
+                print("Debug - No search parameters provided")
+            return {"header": [], "data": []}
+
+        catalog = await self._get_catalog()
+        data = self._build_form_data(catalog, state, member, breed)
+
+        if self.debug:
+            print(f"\nDebug - Data yang dikirim: {data}")
+
+        # Backend cache (SQLite/file system) melakukan I/O disk, jadi dijalankan di thread pool
+        if self.response_cache is not None:
+            cached = await self._in_executor(self.response_cache.get, self.base_url, data)
+            self._count_cache("response", cached is not None)
+            if cached is not None:
+                if self.debug:
+                    print("Debug - Response diambil dari cache")
+                return await self._in_executor(self._parse_results, cached)
+
+        status, _, content = await self._request("POST", data=data)
+
+        if self.debug:
+            print(f"Debug - Status code: {status}")
+        self._capture_html("response", content, ResponseCache.make_key(self.base_url, data))
+
+        if self.response_cache is not None and status == 200:
+            await self._in_executor(self.response_cache.set, self.base_url, data, content)
+
+        return await self._in_executor(self._parse_results, content)
+
+    async def search_many(self, queries):
+        """
+        Jalankan banyak pencarian secara bersamaan dan yield (query, result) sesuai urutan selesai.
+
+        Seperti AMGRScraper.search_many(), paling banyak 2 x max_concurrency query dibuat
+        sebagai task sekaligus dan diisi ulang setiap ada yang selesai, sehingga iterable
+        besar (misalnya crawl seluruh direktori) tidak menjadi ribuan task sekaligus. Task
+        yang belum selesai dibatalkan jika pemanggil berhenti lebih awal atau dibatalkan.
+        """
+        await self._get_catalog()
+
+        async def run(query):
+            try:
+                return query, await self.search(*query)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.debug:
+                    print(f"Debug - Query {query} gagal: {e}")
+                return query, {"header": [], "data": [], "error": f"{e.__class__.__name__}: {e}"}
+
+        query_iter = iter(queries)
+        max_pending = self.max_concurrency * 2
+        pending = set()
+        try:
+            while True:
+                # Isi antrian sampai batas
+                while len(pending) < max_pending:
+                    query = next(query_iter, None)
+                    if query is None:
+                        break
+                    pending.add(asyncio.ensure_future(run((tuple(query) + (None, None, None))[:3])))
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark AMGR Scraper tanpa akses jaringan
+
+Suite:
+    parse    waktu parse debug/response.html per backend parser dibanding parser heuristik
+    resolve  resolusi nama state/member/breed (tepat, huruf kecil, awalan, salah ketik)
+    e2e      search() lengkap melalui ReplayTransport: katalog, resolve, fetch, parse
+    scale    parse, get_options(), dan search_many() pada direktori sintetis (--rows)
+
+Semua input berasal dari debug/main_page.html dan debug/response.html (atau folder
+fixture hasil rekaman --record), sehingga angka bisa dibandingkan antar commit di CI.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+from mrscraper import AMGRScraper
+from result_parsers import PARSER_BACKENDS, StreamingResults
+from cache import ParsedResultCache
+from replay import FixtureStore, ReplayTransport
+from synthetic import SyntheticDirectory, SyntheticServer
+
+# Parser heuristik BeautifulSoup terlalu lambat untuk halaman yang lebih besar dari ini
+BS4_MAX_ROWS = 20000
+
+DEBUG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug")
+
+
+def load_html(name):
+    """Baca file HTML capture dari folder debug"""
+    with open(os.path.join(DEBUG_DIR, name), "rb") as f:
+        return f.read()
+
+
+def time_calls(func, arg, iterations):
+    """Jalankan func(arg) sebanyak iterations kali dan kembalikan daftar durasi (detik)"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(arg)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations):
+    """Throughput dan persentil (ms) dari daftar durasi dalam detik"""
+    ordered = sorted(durations)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "ops_per_sec": round(len(ordered) / sum(ordered), 1) if sum(ordered) else 0.0,
+        "p50_ms": round(percentile(0.50), 4),
+        "p95_ms": round(percentile(0.95), 4),
+        "p99_ms": round(percentile(0.99), 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def print_summaries(title, summaries):
+    print(f"\n{title}")
+    print(f"{'kasus':<16}{'ops/s':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}")
+    for name, summary in summaries.items():
+        print(f"{name:<16}{summary['ops_per_sec']:>12.1f}{summary['p50_ms']:>12.3f}"
+              f"{summary['p95_ms']:>12.3f}{summary['p99_ms']:>12.3f}")
+
+
+def baseline_store(directory):
+    """
+    FixtureStore dari capture debug/: GET ke URL direktori mendapat main_page.html dan
+    setiap POST pencarian mendapat response.html, apa pun isi form-nya
+    """
+    store = FixtureStore(directory, match_body=False)
+    base_url = AMGRScraper().base_url
+    store.put("GET", base_url, load_html("main_page.html"))
+    store.put("POST", base_url, load_html("response.html"))
+    return store
+
+
+def replay_scraper(store, **kwargs):
+    """AMGRScraper yang semua request-nya dilayani dari fixture"""
+    return AMGRScraper(transport=ReplayTransport(store, mode="replay", max_retries=0), **kwargs)
+
+
+def resolve_queries(options):
+    """Variasi nama opsi seperti yang diketik pengguna"""
+    queries = []
+    for field, names in (("state", list(options["states"])[1:6]),
+                         ("member", list(options["members"])[1:6]),
+                         ("breed", list(options["breeds"])[1:6])):
+        for name in names:
+            typo = name[:-2] + name[-1] + name[-2] if len(name) > 4 else name
+            for variant in (name, name.lower(), name[:max(3, len(name) // 2)], typo):
+                queries.append({field: variant})
+    return queries
+
+
+def bench_resolve(store, iterations):
+    """Waktu resolusi nama ke nilai form per variasi query"""
+    scraper = replay_scraper(store)
+    catalog = scraper._get_catalog()
+    queries = resolve_queries(scraper.get_options())
+    # Index dibangun sekali per katalog; pemanggilan pertama tidak ikut diukur
+    scraper._build_form_data(catalog, **queries[0])
+
+    kinds = {"exact": [], "lowercase": [], "prefix": [], "typo": []}
+    for _ in range(iterations):
+        for i, query in enumerate(queries):
+            start = time.perf_counter()
+            scraper._build_form_data(catalog, **query)
+            list(kinds.values())[i % 4].append(time.perf_counter() - start)
+
+    summaries = {kind: summarize(durations) for kind, durations in kinds.items()}
+    print_summaries(f"Resolve ({len(queries)} query x {iterations} iterasi)", summaries)
+    return summaries
+
+
+def bench_end_to_end(store, iterations):
+    """search() lengkap melalui ReplayTransport, dengan dan tanpa cache hasil parsing"""
+    queries = [{"state": "Kansas"}, {"state": "TX"}, {"member": "Dwight Elmore"}, {"breed": "savanna"}]
+    fields = {"state": "stateID", "member": "memberID", "breed": "breedID"}
+
+    # Setiap query harus ter-resolve; query yang gagal akan mengukur pencarian tanpa filter
+    scraper = replay_scraper(store)
+    catalog = scraper._get_catalog()
+    for query in queries:
+        (field, name), = query.items()
+        if fields[field] not in scraper._build_form_data(catalog, **query):
+            raise ValueError(f"Query benchmark {field}={name!r} tidak ter-resolve pada katalog fixture")
+
+    summaries = {}
+    for name, kwargs in (("cold_catalog", {}), ("warm", {}), ("warm_cached", {"result_cache": ParsedResultCache()})):
+        durations = []
+        scraper = replay_scraper(store, **kwargs)
+        if name != "cold_catalog":
+            scraper.get_options()
+        for _ in range(iterations):
+            for query in queries:
+                if name == "cold_catalog":
+                    scraper.catalog.invalidate()
+                start = time.perf_counter()
+                scraper.search(**query)
+                durations.append(time.perf_counter() - start)
+        summaries[name] = summarize(durations)
+    print_summaries(f"End-to-end search ({len(queries)} query x {iterations} iterasi)", summaries)
+    return summaries
+
+
+def bench_scale(sizes, iterations):
+    """Skala parse, katalog opsi, dan pencarian batch terhadap jumlah baris direktori"""
+    report = {}
+    print(f"\nSkala (direktori sintetis, {iterations} iterasi)")
+    print(f"{'baris':>10}  {'kasus':<16}{'median (ms)':>14}{'baris/s':>14}")
+    for rows in sizes:
+        directory = SyntheticDirectory(members=max(300, rows // 20), rows=rows)
+        html_content = directory.results_page()
+        cases = {}
+
+        backends = [name for name in ("bs4", *PARSER_BACKENDS) if name != "bs4" or rows <= BS4_MAX_ROWS]
+        for name in backends:
+            cases[f"parse_{name}"] = (time_calls(AMGRScraper(parser=name)._parse_results, html_content, iterations), rows)
+
+        def parse_stream(content):
+            chunks = (content[i:i + 8192] for i in range(0, len(content), 8192))
+            return sum(1 for _ in StreamingResults(chunks))
+        cases["parse_stream"] = (time_calls(parse_stream, html_content, iterations), rows)
+
+        with SyntheticServer(directory) as server:
+            scraper = AMGRScraper(max_per_host=8)
+            scraper.base_url = server.url
+
+            def load_options(_):
+                scraper.catalog.invalidate()
+                return scraper.get_options()
+            cases["get_options"] = (time_calls(load_options, None, iterations), len(directory.members))
+
+            # Satu pencarian per state, seperti crawl direktori
+            states = list(directory.options()["states"])
+
+            def search_states(_):
+                return sum(len(result.get("data", [])) for _, result in
+                           scraper.search_many([(state,) for state in states], max_workers=8))
+            cases["search_many"] = (time_calls(search_states, None, iterations), rows)
+
+        report[rows] = {}
+        for name, (durations, count) in cases.items():
+            median = statistics.median(durations)
+            report[rows][name] = {**summarize(durations), "rows_per_sec": round(count / median, 1)}
+            print(f"{rows:>10}  {name:<16}{median * 1000:>14.1f}{count / median:>14.0f}")
+    return report
+
+
+def bench_parsers(html_content, iterations):
+    """Bandingkan semua backend parser terhadap parser heuristik"""
+    baseline_scraper = AMGRScraper(parser="bs4")
+    expected = baseline_scraper._parse_results(html_content)
+
+    results = {"bs4": time_calls(baseline_scraper._parse_results, html_content, iterations)}
+    for name in PARSER_BACKENDS:
+        scraper = AMGRScraper(parser=name)
+        if scraper._parse_results(html_content) != expected:
+            print(f"PERINGATAN: output backend '{name}' berbeda dari parser heuristik")
+        results[name] = time_calls(scraper._parse_results, html_content, iterations)
+
+    # Parser streaming dengan potongan 8 KB seperti iter_content()
+    def parse_stream(content):
+        chunks = [content[i:i + 8192] for i in range(0, len(content), 8192)]
+        return StreamingResults(chunks).to_dict()
+
+    if parse_stream(html_content) != expected:
+        print("PERINGATAN: output parser streaming berbeda dari parser heuristik")
+    results["stream"] = time_calls(parse_stream, html_content, iterations)
+
+    # Cache hasil parsing: semua iterasi setelah yang pertama adalah cache hit
+    cached_scraper = AMGRScraper(result_cache=ParsedResultCache())
+    cached_scraper._parse_results(html_content)
+    results["cached"] = time_calls(cached_scraper._parse_results, html_content, iterations)
+
+    baseline = statistics.median(results["bs4"])
+    print(f"\nParse ({len(html_content)} bytes, {iterations} iterasi)")
+    print(f"{'backend':<12}{'median (ms)':>14}{'min (ms)':>12}{'speedup':>10}")
+    for name, durations in results.items():
+        median = statistics.median(durations)
+        print(f"{name:<12}{median * 1000:>14.3f}{min(durations) * 1000:>12.3f}{baseline / median:>9.1f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark AMGR Scraper')
+    parser.add_argument('--iterations', type=int, default=50, help='Jumlah pengulangan per backend')
+    parser.add_argument('--html', type=str, default='response.html', help='File HTML di folder debug')
+    parser.add_argument('--suite', choices=['parse', 'resolve', 'e2e', 'scale', 'all'], default='all',
+                        help='Suite yang dijalankan; all tidak termasuk scale (default: all)')
+    parser.add_argument('--rows', type=str, default='1000,10000,100000',
+                        help='Jumlah baris direktori sintetis untuk suite scale, dipisah koma (default: 1000,10000,100000)')
+    parser.add_argument('--fixtures', type=str,
+                        help='Folder fixture hasil --record; default capture di folder debug')
+    parser.add_argument('--json', type=str, dest='json_path', help='Simpan ringkasan hasil ke file JSON')
+    args = parser.parse_args()
+
+    report = {}
+    if args.suite in ('parse', 'all'):
+        results = bench_parsers(load_html(args.html), args.iterations)
+        report["parse"] = {name: summarize(durations) for name, durations in results.items()}
+
+    if args.suite in ('resolve', 'e2e', 'all'):
+        with tempfile.TemporaryDirectory() as directory:
+            store = FixtureStore(args.fixtures) if args.fixtures else baseline_store(directory)
+            if args.suite in ('resolve', 'all'):
+                report["resolve"] = bench_resolve(store, args.iterations)
+            if args.suite in ('e2e', 'all'):
+                report["e2e"] = bench_end_to_end(store, args.iterations)
+
+    if args.suite == 'scale':
+        sizes = [int(size) for size in args.rows.split(",") if size.strip()]
+        report["scale"] = bench_scale(sizes, args.iterations)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRingkasan disimpan ke {args.json_path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+"""
+Cache response HTTP dan hasil parsing untuk pencarian AMGR.
+
+Backend menyimpan pasangan key (string) -> value (bytes) dengan TTL per entry dan
+eviksi berdasarkan jumlah entry serta total ukuran. Tiga backend tersedia:
+memori (LRU), SQLite, dan filesystem. Semua backend aman dipakai banyak thread.
+"""
+import os
+import json
+import time
+import pickle
+import struct
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+# msgpack opsional, lebih ringkas dan cepat; fallback ke pickle protocol 5
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+class MemoryLRUBackend:
+    """Cache di memori proses dengan eviksi least-recently-used"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self._size += len(value)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._size -= len(item[1])
+
+
+class SQLiteBackend:
+    """Cache di file SQLite, bisa dipakai bersama oleh beberapa proses"""
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return bytes(value)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(value), len(value), expires_at, now),
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        while count > self.max_entries or size > self.max_bytes:
+            row = self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (row[0],))
+            count -= 1
+            size -= row[1]
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class FileSystemBackend:
+    """
+    Cache satu file per entry di sebuah folder; waktu akses file dipakai untuk eviksi LRU
+
+    Jumlah dan total ukuran entry disimpan di memori (dihitung sekali saat dibuat), sehingga
+    set() tidak perlu membaca isi folder. Folder hanya dipindai saat batas terlampaui dan
+    tidak ada lagi kandidat eviksi dari pemindaian sebelumnya, atau setiap RESCAN_INTERVAL
+    penulisan agar tetap sinkron dengan proses lain yang memakai folder yang sama.
+    """
+
+    # Header file: waktu kadaluarsa (double, 0 = tanpa TTL)
+    _HEADER = struct.Struct("<d")
+
+    # Jumlah set() sebelum jumlah dan ukuran dihitung ulang dari folder
+    RESCAN_INTERVAL = 1000
+
+    def __init__(self, directory: str, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Entry dari pemindaian terakhir, urut dari yang paling lama diakses: (mtime, ukuran, path)
+        self._candidates: deque = deque()
+        self._writes = 0
+        self._count = 0
+        self._bytes = 0
+        self._scan()
+
+    def _path(self, key: str) -> str:
+        # Key di-hash agar aman sebagai nama file
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".cache")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        if len(raw) < self._HEADER.size:
+            return None
+
+        (expires_at,) = self._HEADER.unpack_from(raw)
+        if expires_at and expires_at <= time.time():
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return raw[self._HEADER.size:]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl is not None else 0.0
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._HEADER.pack(expires_at))
+                f.write(value)
+            with self._lock:
+                previous = self._file_size(path)
+                os.replace(tmp_path, path)
+                if previous is None:
+                    self._count += 1
+                self._bytes += self._HEADER.size + len(value) - (previous or 0)
+                self._writes += 1
+                if self._writes % self.RESCAN_INTERVAL == 0:
+                    self._scan()
+                if self._over_limit():
+                    self._evict()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _file_size(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return None
+
+    def _over_limit(self) -> bool:
+        return self._count > self.max_entries or self._bytes > self.max_bytes
+
+    def _scan(self) -> None:
+        """Hitung ulang jumlah dan ukuran entry dari folder dan susun ulang kandidat eviksi"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".cache"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        self._candidates = deque(files)
+        self._count = len(files)
+        self._bytes = sum(item[1] for item in files)
+
+    def _evict(self) -> None:
+        rescanned = False
+        while self._over_limit():
+            if not self._candidates:
+                if rescanned:
+                    break
+                self._scan()
+                rescanned = True
+                continue
+            mtime, size, path = self._candidates.popleft()
+            try:
+                # Entry yang sudah dihapus atau diakses/ditulis ulang sejak pemindaian dilewati
+                if os.stat(path).st_mtime != mtime:
+                    continue
+                os.remove(path)
+            except OSError:
+                continue
+            self._count -= 1
+            self._bytes -= size
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        with self._lock:
+            size = self._file_size(path)
+            try:
+                os.remove(path)
+            except OSError:
+                return
+            self._count -= 1
+            self._bytes -= size or 0
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".cache"):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+            self._candidates.clear()
+            self._count = 0
+            self._bytes = 0
+
+
+def create_backend(spec: str):
+    """
+    Buat backend dari string konfigurasi
+
+    Args:
+        spec: "memory", "sqlite:<path>", atau "dir:<path>". Path tanpa awalan dianggap file SQLite.
+    """
+    kind, _, path = spec.partition(":")
+    if spec == "memory":
+        return MemoryLRUBackend()
+    if kind == "sqlite" and path:
+        return SQLiteBackend(path)
+    if kind == "dir" and path:
+        return FileSystemBackend(path)
+    return SQLiteBackend(spec)
+
+
+class ResponseCache:
+    """
+    Cache body response POST pencarian, dengan key dari form data yang dinormalisasi
+    (stateID/memberID/breedID dan field submit, diurutkan). Hanya response 200 yang disimpan.
+    """
+
+    def __init__(self, backend=None, ttl: Optional[float] = 3600):
+        """
+        Args:
+            backend: Backend penyimpanan; default MemoryLRUBackend
+            ttl: Umur entry dalam detik (None = tanpa batas waktu)
+        """
+        self.backend = backend if backend is not None else MemoryLRUBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(url: str, data: Dict[str, Any]) -> str:
+        """Key cache dari URL dan form data yang dinormalisasi"""
+        canonical = json.dumps(
+            sorted((str(name), "" if value is None else str(value)) for name, value in data.items()),
+            separators=(",", ":"),
+        )
+        return "post:" + hashlib.sha256(f"{url}\n{canonical}".encode("utf-8")).hexdigest()
+
+    def get(self, url: str, data: Dict[str, Any]) -> Optional[bytes]:
+        """Ambil body response dari cache, None jika tidak ada atau kadaluarsa"""
+        content = self.backend.get(self.make_key(url, data))
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+
+    def set(self, url: str, data: Dict[str, Any], content: bytes) -> None:
+        """Simpan body response ke cache"""
+        self.backend.set(self.make_key(url, data), content, self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# Naikkan jika format output parser berubah agar entry lama tidak dipakai
+PARSED_RESULT_VERSION = 1
+
+
+def dump_results(results: Dict[str, Any]) -> bytes:
+    """Serialisasi {"header", "data"} ke format biner ringkas (byte pertama menandai format)"""
+    if MSGPACK_AVAILABLE:
+        return b"m" + msgpack.packb(results, use_bin_type=True)
+    return b"p" + pickle.dumps(results, protocol=5)
+
+
+def load_results(payload: bytes) -> Dict[str, Any]:
+    """Kebalikan dump_results()"""
+    kind, body = payload[:1], payload[1:]
+    if kind == b"m":
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("Entry cache dibuat dengan msgpack, tetapi msgpack tidak terinstal")
+        return msgpack.unpackb(body, raw=False)
+    if kind == b"p":
+        # Hanya muat cache dari folder yang dipercaya; pickle bisa menjalankan kode
+        return pickle.loads(body)
+    raise ValueError("Format entry cache tidak dikenal")
+
+
+class TieredCache:
+    """
+    Cache dua tingkat: LRU di memori proses di depan backend persisten opsional
+    (SQLite atau folder). Entry yang ditemukan di disk dipromosikan ke memori.
+    """
+
+    def __init__(self, memory=None, disk=None, ttl: Optional[float] = None):
+        """
+        Args:
+            memory: Tier memori; default MemoryLRUBackend
+            disk: Tier persisten (SQLiteBackend/FileSystemBackend), None = hanya memori
+            ttl: Umur entry dalam detik (None = tanpa batas waktu)
+        """
+        self.memory = memory if memory is not None else MemoryLRUBackend()
+        self.disk = disk
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, decode: Optional[Callable[[bytes], Any]] = None) -> Any:
+        """
+        Ambil entry dari memori, lalu disk
+
+        Args:
+            decode: Fungsi pengubah bytes ke nilai; entry yang gagal di-decode dihapus dan dianggap miss
+        """
+        tier = "memory"
+        payload = self.memory.get(key)
+        if payload is None and self.disk is not None:
+            tier = "disk"
+            payload = self.disk.get(key)
+            if payload is not None:
+                self.memory.set(key, payload, self.ttl)
+
+        value = payload
+        if payload is not None and decode is not None:
+            try:
+                value = decode(payload)
+            except Exception:
+                self.delete(key)
+                value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            elif tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+        return value
+
+    def set(self, key: str, payload: bytes) -> None:
+        self.memory.set(key, payload, self.ttl)
+        if self.disk is not None:
+            self.disk.set(key, payload, self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.memory_hits + self.disk_hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+            }
+
+
+class ParsedResultCache:
+    """
+    Cache hasil _parse_results() dengan key hash SHA-256 dari body HTML, sehingga HTML
+    yang identik tidak di-parse ulang. Terdiri dari tier memori (LRU, dibatasi byte)
+    dan tier disk opsional (FileSystemBackend, dibatasi byte).
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 32 * 1024 * 1024,
+        directory: Optional[str] = None,
+        disk_bytes: int = 512 * 1024 * 1024,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            memory_bytes: Batas ukuran tier memori
+            directory: Folder tier disk (None = hanya memori)
+            disk_bytes: Batas ukuran tier disk
+            ttl: Umur entry dalam detik (None = tanpa batas; key sudah berbasis isi)
+        """
+        self.tiers = TieredCache(
+            memory=MemoryLRUBackend(max_entries=1 << 30, max_bytes=memory_bytes),
+            disk=FileSystemBackend(directory, max_entries=1 << 30, max_bytes=disk_bytes) if directory else None,
+            ttl=ttl,
+        )
+
+    @staticmethod
+    def make_key(html_content) -> str:
+        if isinstance(html_content, str):
+            html_content = html_content.encode("utf-8")
+        return f"parsed:v{PARSED_RESULT_VERSION}:" + hashlib.sha256(html_content).hexdigest()
+
+    def get(self, html_content) -> Optional[Dict[str, Any]]:
+        """Ambil hasil parsing untuk HTML ini, None jika belum pernah di-parse"""
+        return self.tiers.get(self.make_key(html_content), load_results)
+
+    def set(self, html_content, results: Dict[str, Any]) -> None:
+        """Simpan hasil parsing untuk HTML ini"""
+        self.tiers.set(self.make_key(html_content), dump_results(results))
+
+    def stats(self) -> Dict[str, int]:
+        return self.tiers.stats()
@@ -0,0 +1,147 @@
+import os
+import re
+import json
+from typing import Any, Dict, List, Tuple
+
+from option_catalog import write_json_atomic
+
+CHECKPOINT_VERSION = 1
+
+
+def row_key(header: List[str], row: List[str]) -> str:
+    """
+    Kunci stabil untuk satu baris peternak: gabungan Name, Farm, dan Phone yang dinormalisasi.
+    State sengaja tidak dipakai agar peternak yang muncul di beberapa state dianggap sama.
+    """
+    def normalize(value):
+        return re.sub(r"\s+", " ", value).strip().casefold()
+
+    columns = [header.index(name) for name in ("Name", "Farm", "Phone") if name in header]
+    if not columns:
+        # Header tidak dikenal: pakai semua kolom kecuali Action dan State
+        columns = [i for i, name in enumerate(header) if name not in ("Action", "State")] or range(len(row))
+
+    return "|".join(normalize(row[i]) if i < len(row) else "" for i in columns)
+
+
+class DirectoryCrawler:
+    """
+    Crawl seluruh direktori AMGR dengan menelusuri setiap state (dan opsional setiap breed)
+    dari katalog opsi. Baris duplikat digabung berdasarkan row_key(), dan progres disimpan
+    ke file checkpoint setelah setiap query sehingga crawl yang terputus bisa dilanjutkan.
+    """
+
+    def __init__(self, scraper, checkpoint_path: str, include_breeds: bool = False, max_workers: int = 4):
+        """
+        Args:
+            scraper: Instance AMGRScraper yang dipakai untuk pencarian
+            checkpoint_path: Lokasi file JSON checkpoint
+            include_breeds: Jika True, telusuri juga setiap breed untuk mencatat breed tiap peternak
+            max_workers: Jumlah pencarian paralel
+        """
+        self.scraper = scraper
+        self.checkpoint_path = checkpoint_path
+        self.include_breeds = include_breeds
+        self.max_workers = max_workers
+        self.state = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        empty = {
+            "version": CHECKPOINT_VERSION,
+            "include_breeds": self.include_breeds,
+            "header": [],
+            "completed": [],
+            "records": {}
+        }
+        if not os.path.exists(self.checkpoint_path):
+            return empty
+
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Versi checkpoint tidak didukung: {state.get('version')}")
+
+        # Mode breed bisa diaktifkan saat melanjutkan; query state yang sudah selesai tetap dilewati
+        state["include_breeds"] = state.get("include_breeds") or self.include_breeds
+        return state
+
+    def _save_checkpoint(self) -> None:
+        write_json_atomic(self.checkpoint_path, self.state)
+
+    def plan(self) -> List[Tuple[str, str]]:
+        """Daftar query (jenis, nama opsi) yang perlu dijalankan untuk crawl penuh"""
+        options = self.scraper.get_options()
+        queries = [("state", name) for name in options["states"]]
+        if self.state["include_breeds"]:
+            queries += [("breed", name) for name in options["breeds"]]
+        return queries
+
+    def pending(self) -> List[Tuple[str, str]]:
+        """Query yang belum selesai menurut checkpoint"""
+        completed = {tuple(item) for item in self.state["completed"]}
+        return [query for query in self.plan() if query not in completed]
+
+    def _merge(self, kind: str, value: str, result: Dict[str, Any]) -> int:
+        """Gabungkan hasil satu query ke records, kembalikan jumlah baris baru"""
+        header = result.get("header") or self.state["header"]
+        if not self.state["header"] and header:
+            self.state["header"] = header
+
+        records = self.state["records"]
+        added = 0
+        for row in result.get("data", []):
+            key = row_key(header, row)
+            record = records.get(key)
+            if record is None:
+                record = records[key] = {"row": row, "breeds": []}
+                added += 1
+            if kind == "breed" and value not in record["breeds"]:
+                record["breeds"].append(value)
+        return added
+
+    def run(self, on_progress=None) -> Dict[str, Any]:
+        """
+        Jalankan crawl sampai semua query selesai (melewati yang sudah ada di checkpoint)
+
+        Args:
+            on_progress: Callback opsional (query, jumlah baris baru, error) setelah setiap query
+
+        Returns:
+            Hasil crawl dalam format {"header": [...], "data": [...]}
+        """
+        todo = self.pending()
+        queries = [(value, None, None) if kind == "state" else (None, None, value) for kind, value in todo]
+        kinds = {query: kind for query, (kind, _) in zip(queries, todo)}
+
+        for query, result in self.scraper.search_many(queries, max_workers=self.max_workers):
+            kind = kinds[query]
+            value = query[0] if kind == "state" else query[2]
+            error = result.get("error")
+
+            added = 0
+            if not error:
+                added = self._merge(kind, value, result)
+                self.state["completed"].append([kind, value])
+                self._save_checkpoint()
+
+            if on_progress:
+                on_progress((kind, value), added, error)
+
+        return self.results()
+
+    def results(self) -> Dict[str, Any]:
+        """Hasil crawl terdeduplikasi dari checkpoint saat ini"""
+        header = list(self.state["header"])
+        records = self.state["records"].values()
+
+        if self.state["include_breeds"]:
+            header.append("Breeds")
+            data = [record["row"] + [", ".join(record["breeds"])] for record in records]
+        else:
+            data = [record["row"] for record in records]
+
+        return {
+            "header": header,
+            "data": data
+        }
@@ -0,0 +1,263 @@
+"""
+Capture HTML debug di thread latar belakang.
+
+Pemanggil (AMGRScraper) hanya memasukkan body response ke antrean; kompresi, penulisan
+file, dan rotasi dikerjakan oleh satu thread writer sehingga tidak menambah latensi
+request. Jika antrean penuh, capture dibuang (dihitung di `dropped`) daripada menunggu.
+
+Setiap capture menjadi satu file <jenis>-<waktu>-<hash query>.html.gz (atau .html.zst /
+.html), sehingga query yang berjalan bersamaan tidak saling menimpa. Folder dibatasi
+total ukuran, jumlah file, dan umur file; file tertua dihapus lebih dulu.
+"""
+import os
+import re
+import time
+import gzip
+import queue
+import atexit
+import hashlib
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# zstandard opsional, kompresi lebih cepat dan lebih kecil dari gzip
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Folder default; terpisah dari debug/main_page.html dan debug/response.html yang dipakai pengujian
+DEFAULT_DIRECTORY = os.path.join("debug", "captures")
+
+# Batas default folder capture
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_MAX_FILES = 1000
+
+# Jumlah capture yang boleh menunggu ditulis
+DEFAULT_QUEUE_SIZE = 256
+
+# Level kompresi (cukup cepat untuk dipakai terus-menerus)
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+EXTENSIONS = {"gzip": ".html.gz", "zstd": ".html.zst", "none": ".html"}
+
+# Nama file capture: <jenis>-<YYYYmmdd-HHMMSS-ffffff>-<hash>.<ekstensi>
+CAPTURE_PATTERN = re.compile(r"^[a-z_]+-\d{8}-\d{6}-\d{6}-[0-9a-f]{12}\.html(\.gz|\.zst)?$")
+
+_STOP = object()
+
+# Capture bersama untuk scraper mode debug yang tidak diberi capture sendiri (lihat default_capture())
+_default_capture: Optional["DebugCapture"] = None
+_default_lock = threading.Lock()
+
+
+def query_hash(key: str) -> str:
+    """Hash pendek untuk nama file capture"""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+class DebugCapture:
+    """Penulis capture HTML asinkron dengan kompresi, rotasi ukuran, dan retensi umur"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, compression: str = "gzip",
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES, max_files: Optional[int] = DEFAULT_MAX_FILES,
+                 max_age: Optional[float] = None, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            directory: Folder capture (dibuat oleh thread writer)
+            compression: "gzip", "zstd" (butuh zstandard), atau "none"
+            max_bytes: Batas total ukuran folder, None = tanpa batas
+            max_files: Batas jumlah file capture, None = tanpa batas
+            max_age: Umur maksimum file dalam detik, None = tanpa batas
+            queue_size: Jumlah capture yang boleh menunggu ditulis
+        """
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Kompresi tidak dikenal: {compression} (pilih {', '.join(EXTENSIONS)})")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ImportError("Kompresi zstd membutuhkan zstandard. Instal dengan: pip install zstandard")
+
+        self.directory = directory
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_age = max_age
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        # File capture yang ada di folder, urut dari yang tertua: (mtime, ukuran, path)
+        self._files: deque = deque()
+        self._total_bytes = 0
+        self.written = 0
+        self.dropped = 0
+        self.removed = 0
+        self.bytes_written = 0
+        self.errors = 0
+
+    def capture(self, kind: str, content: bytes, key: str = "") -> Optional[str]:
+        """
+        Jadwalkan penulisan satu body response; tidak pernah menunggu disk
+
+        Args:
+            kind: Jenis halaman, misalnya "main_page" atau "response"
+            content: Body response apa adanya
+            key: Identitas query (misalnya key cache response) untuk hash di nama file
+
+        Returns:
+            Path file yang akan ditulis, atau None jika capture dibuang (antrean penuh/ditutup)
+        """
+        if self._closed:
+            return None
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.directory, f"{kind}-{timestamp}-{query_hash(key)}{EXTENSIONS[self.compression]}")
+
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((path, content))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return None
+        return path
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="debug-capture", daemon=True)
+                self._thread.start()
+                # Capture yang masih di antrean tetap ditulis saat program selesai
+                atexit.register(self.close)
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(content, compresslevel=GZIP_LEVEL)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+        return content
+
+    def _scan(self) -> None:
+        """Muat file capture yang sudah ada agar batas folder berlaku lintas proses"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and CAPTURE_PATTERN.match(entry.name):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        self._files = deque(files)
+        self._total_bytes = sum(size for _, size, _ in files)
+
+    def _write(self, path: str, content: bytes) -> None:
+        body = self._compress(content)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        self._files.append((time.time(), len(body), path))
+        self._total_bytes += len(body)
+        with self._lock:
+            self.written += 1
+            self.bytes_written += len(body)
+
+    def _prune(self) -> None:
+        """Hapus file tertua sampai batas ukuran, jumlah, dan umur terpenuhi (file terbaru selalu disimpan)"""
+        oldest_allowed = time.time() - self.max_age if self.max_age is not None else None
+        while len(self._files) > 1:
+            mtime, size, path = self._files[0]
+            if not ((self.max_bytes is not None and self._total_bytes > self.max_bytes)
+                    or (self.max_files is not None and len(self._files) > self.max_files)
+                    or (oldest_allowed is not None and mtime < oldest_allowed)):
+                break
+            self._files.popleft()
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self.removed += 1
+
+    def _run(self) -> None:
+        try:
+            self._scan()
+        except OSError:
+            with self._lock:
+                self.errors += 1
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+                self._prune()
+            except OSError:
+                # Capture debug tidak boleh menghentikan scraper; kegagalan cukup dihitung
+                with self._lock:
+                    self.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Tunggu sampai semua capture di antrean selesai ditulis"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Tulis sisa antrean lalu hentikan thread writer"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "removed": self.removed,
+                "bytes_written": self.bytes_written,
+                "errors": self.errors,
+                "pending": self._queue.qsize(),
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def default_capture() -> DebugCapture:
+    """
+    Capture default (folder DEFAULT_DIRECTORY) yang dipakai bersama oleh semua scraper mode
+    debug, sehingga hanya ada satu thread writer dan satu hook atexit per proses. Dibuat
+    saat pertama diminta; thread writer baru berjalan saat capture pertama.
+    """
+    global _default_capture
+    with _default_lock:
+        if _default_capture is None:
+            _default_capture = DebugCapture()
+        return _default_capture
+
+
+def read_capture(path: str) -> bytes:
+    """Baca isi capture (didekompresi sesuai ekstensi)"""
+    with open(path, "rb") as f:
+        body = f.read()
+    if path.endswith(".gz"):
+        return gzip.decompress(body)
+    if path.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise ImportError("Membaca capture zstd membutuhkan zstandard. Instal dengan: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(body, max_output_size=256 * 1024 * 1024)
+    return body
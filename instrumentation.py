@@ -0,0 +1,280 @@
+"""
+Instrumentasi terstruktur: span berdurasi dan counter.
+
+Default-nya NOOP sehingga tidak ada biaya selain satu pemanggilan method. Instrumentation
+meneruskan setiap span yang selesai dan setiap counter ke exporter:
+
+    JSONLinesExporter     satu objek JSON per baris (file atau stream)
+    PrometheusExporter    agregasi di memori, dirender ke format teks Prometheus
+    OpenTelemetryExporter meneruskan ke tracer/meter OpenTelemetry (opsional)
+
+Nama span yang dipakai: http.get, http.post, catalog.load, form.analyze, resolve,
+parse.results, llm.call. Counter: http.bytes_downloaded, http.retries, rows.parsed,
+cache.hits, cache.misses (label cache=response|result|nl), nl.rule_hits.
+"""
+import os
+import re
+import json
+import time
+import threading
+import itertools
+from contextlib import contextmanager
+from typing import Any, Dict, IO, Optional, Tuple, Union
+
+# OpenTelemetry opsional, hanya dibutuhkan untuk OpenTelemetryExporter
+try:
+    from opentelemetry import trace as otel_trace, metrics as otel_metrics
+    from opentelemetry.trace import Status, StatusCode
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+# Batas bucket histogram durasi span (detik)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Span:
+    """Satu operasi berdurasi; atribut boleh ditambah selama span berjalan"""
+
+    __slots__ = ("name", "span_id", "parent_id", "thread", "start", "duration", "error", "attributes")
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.duration = 0.0
+        self.error = None
+        self.attributes = attributes
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Span kosong yang dipakai ulang oleh NoopInstrumentation"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopInstrumentation:
+    """Instrumentasi default: semua pemanggilan diabaikan"""
+
+    enabled = False
+
+    def span(self, name: str, **attributes):
+        return _NOOP_SPAN
+
+    def record(self, name: str, start: float, duration: float, error: Optional[str] = None, **attributes) -> None:
+        pass
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        pass
+
+
+NOOP = NoopInstrumentation()
+
+
+class Instrumentation(NoopInstrumentation):
+    """Pencatat span dan counter yang meneruskan ke satu atau beberapa exporter; aman dipakai banyak thread"""
+
+    enabled = True
+
+    def __init__(self, *exporters):
+        self.exporters = list(exporters)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span = Span(name, next(self._ids), stack[-1].span_id if stack else None, attributes)
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = e.__class__.__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            stack.pop()
+            for exporter in self.exporters:
+                exporter.export_span(span)
+
+    def record(self, name: str, start: float, duration: float, error: Optional[str] = None, **attributes) -> None:
+        """
+        Catat span yang sudah selesai (start = time.time() saat mulai), misalnya dari task
+        asyncio yang berjalan bersamaan di satu thread sehingga tidak bisa memakai span()
+        """
+        span = Span(name, next(self._ids), None, attributes)
+        span.start = start
+        span.duration = duration
+        span.error = error
+        for exporter in self.exporters:
+            exporter.export_span(span)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        for exporter in self.exporters:
+            exporter.export_count(name, value, labels)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            close = getattr(exporter, "close", None)
+            if close is not None:
+                close()
+
+
+class JSONLinesExporter:
+    """Tulis setiap span dan counter sebagai satu baris JSON"""
+
+    def __init__(self, target: Union[str, IO[str]]):
+        """
+        Args:
+            target: Path file (ditambahkan di akhir file) atau stream teks yang sudah terbuka
+        """
+        self._lock = threading.Lock()
+        self._owned = isinstance(target, (str, os.PathLike))
+        self._stream = open(target, "a", encoding="utf-8") if self._owned else target
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def export_span(self, span: Span) -> None:
+        self._write({
+            "type": "span",
+            "name": span.name,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "thread": span.thread,
+            "start": round(span.start, 6),
+            "duration_ms": round(span.duration * 1000, 3),
+            "error": span.error,
+            "attributes": span.attributes,
+        })
+
+    def export_count(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        self._write({"type": "counter", "name": name, "value": value, "labels": labels, "time": round(time.time(), 6)})
+
+    def close(self) -> None:
+        if self._owned:
+            self._stream.close()
+
+
+def _metric_name(namespace: str, name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", f"{namespace}_{name}")
+
+
+def _label_text(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class PrometheusExporter:
+    """
+    Agregasi span (histogram durasi per nama span) dan counter di memori, dirender ke format
+    teks Prometheus. Atribut span tidak dijadikan label agar kardinalitas tetap kecil.
+    """
+
+    def __init__(self, namespace: str = "amgr"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple, list] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+
+    def export_span(self, span: Span) -> None:
+        key = (("span", span.name), ("error", span.error or ""))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Jumlah per bucket, lalu total count dan sum
+                histogram = self._histograms[key] = [0] * len(DURATION_BUCKETS) + [0, 0.0]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += span.duration
+
+    def export_count(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        key = tuple(sorted((key, str(label)) for key, label in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def render(self) -> str:
+        """Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4)"""
+        lines = []
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+
+        metric = _metric_name(self.namespace, "span_duration_seconds")
+        lines += [f"# HELP {metric} Durasi span instrumentasi", f"# TYPE {metric} histogram"]
+        for labels, values in sorted(histograms.items()):
+            for bound, count in zip(DURATION_BUCKETS, values):
+                lines.append(f"{metric}_bucket{_label_text(labels + (('le', repr(bound)),))} {count}")
+            lines.append(f"{metric}_bucket{_label_text(labels + (('le', '+Inf'),))} {values[-2]}")
+            lines.append(f"{metric}_count{_label_text(labels)} {values[-2]}")
+            lines.append(f"{metric}_sum{_label_text(labels)} {values[-1]:.6f}")
+
+        for name, series in sorted(counters.items()):
+            metric = _metric_name(self.namespace, name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{metric}{_label_text(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Tulis render() ke file, misalnya untuk textfile collector node_exporter"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+class OpenTelemetryExporter:
+    """Teruskan span dan counter ke OpenTelemetry API (provider dikonfigurasi oleh aplikasi)"""
+
+    def __init__(self, tracer=None, meter=None):
+        if not OTEL_AVAILABLE:
+            raise ImportError("OpenTelemetryExporter membutuhkan opentelemetry-api. Instal dengan: pip install opentelemetry-api")
+        self.tracer = tracer or otel_trace.get_tracer("amgr-scraper")
+        self.meter = meter or otel_metrics.get_meter("amgr-scraper")
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def export_span(self, span: Span) -> None:
+        start_ns = int(span.start * 1e9)
+        attributes = {key: value for key, value in span.attributes.items() if isinstance(value, (str, bool, int, float))}
+        otel_span = self.tracer.start_span(span.name, start_time=start_ns, attributes=attributes)
+        if span.error:
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        otel_span.end(end_time=start_ns + int(span.duration * 1e9))
+
+    def export_count(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = self.meter.create_counter(name)
+        counter.add(value, {key: str(label) for key, label in labels.items()})
@@ -1,11 +1,30 @@
 #!/usr/bin/env python3
-import requests
 from bs4 import BeautifulSoup
 import json
 import argparse
 import sys
 import re
 import os
+import hashlib
+import atexit
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+
+from option_catalog import OptionCatalog, CatalogStore
+from crawler import DirectoryCrawler
+from result_parsers import get_parser_backend, StreamingResults
+from records import iter_stream_records
+from transport import HTTPTransport
+from replay import FixtureStore, ReplayTransport
+from instrumentation import NOOP, Instrumentation, JSONLinesExporter, PrometheusExporter
+from profiling import NO_PROFILE, ProfileSession
+from debug_capture import DebugCapture, default_capture, DEFAULT_DIRECTORY as CAPTURE_DIRECTORY
+from rate_limiter import RateLimiter
+from cache import ResponseCache, ParsedResultCache, TieredCache, create_backend
+from resolver import ResolverCache
+from pipeline import QueryPipeline
 
 # Import python-dotenv untuk membaca file .env
 try:
@@ -23,33 +42,74 @@ try:
 except ImportError:
     NLP_AVAILABLE = False
 
-class AMGRScraper:
-    def __init__(self, debug=False):
+class BaseAMGRScraper:
+    """
+    Bagian scraper yang tidak melakukan I/O jaringan: katalog opsi, resolusi nama ke form
+    data, parsing hasil, cache, instrumentasi, dan capture debug. Dipakai bersama oleh
+    AMGRScraper (requests, thread) dan AsyncAMGRScraper (aiohttp, asyncio).
+    """
+    def __init__(self, debug=False, catalog=None, parser="auto", response_cache=None, result_cache=None,
+                 instrumentation=None, capture=None):
         self.base_url = "https://www.amgr.org/frm_directorySearch.cfm"
-        self.session = requests.Session()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
         self.debug = debug
+        # Span dan counter (default no-op)
+        self.instrumentation = instrumentation if instrumentation is not None else NOOP
+        # Katalog opsi form, bisa dibagikan antar instance scraper
+        self.catalog = catalog if catalog is not None else OptionCatalog()
+        # Backend parser cepat untuk tabel hasil (None = hanya parser heuristik BeautifulSoup)
+        self.parser = parser
+        self._fast_parser = get_parser_backend(parser)
+        # Cache response POST pencarian (None = selalu ke server)
+        self.response_cache = response_cache
+        # Cache hasil parsing berdasarkan hash body HTML (None = selalu parse)
+        self.result_cache = result_cache
+        # Index fuzzy nama state/member/breed untuk entry katalog terakhir
+        self._resolvers = ResolverCache()
+        # Sesi profiling aktif (lihat profile())
+        self._profiler = NO_PROFILE
+        # Capture HTML response di thread latar belakang (mode debug selalu menyimpan capture,
+        # memakai satu capture default bersama jika tidak diberikan)
+        if capture is None and debug:
+            capture = default_capture()
+        self.capture = capture
+    
+    @contextmanager
+    def profile(self, output_prefix="profile/amgr", **kwargs):
+        """
+        Profil semua pencarian di dalam blok with: cProfile (.pstats), stack sampling
+        (.collapsed untuk flamegraph), dan alokasi memori fase parse (.txt).
         
-        # Buat folder debug jika belum ada
-        if self.debug and not os.path.exists("debug"):
-            os.makedirs("debug")
+            with scraper.profile("profile/kansas") as session:
+                scraper.search(state="Kansas")
+            print(session.report())
+        
+        kwargs diteruskan ke ProfileSession (sample_interval, allocations). Hanya satu
+        sesi yang boleh aktif; sesi bertumpuk menimbulkan RuntimeError.
+        """
+        session = ProfileSession(output_prefix, **kwargs)
+        with session:
+            self._profiler = session
+            try:
+                yield session
+            finally:
+                self._profiler = NO_PROFILE
     
-    def get_page_source(self):
-        """Ambil source HTML dari halaman utama"""
-        response = self.session.get(self.base_url, headers=self.headers)
+    def _capture_html(self, kind, content, key=""):
+        """Jadwalkan penyimpanan HTML ke folder capture (ditulis oleh thread writer)"""
+        if self.capture is None:
+            return
+        path = self.capture.capture(kind, content, key)
         if self.debug:
-            with open("debug/main_page.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-            print("Debug - HTML main page disimpan ke debug/main_page.html")
-        return response.content
+            if path is None:
+                print("Debug - Antrean capture penuh, HTML tidak disimpan")
+            else:
+                print(f"Debug - HTML dijadwalkan ke {path}")
     
-    def analyze_form_structure(self, html_content=None):
-        """Analisis struktur form pada halaman"""
-        if not html_content:
-            html_content = self.get_page_source()
-        
+    def analyze_form_structure(self, html_content):
+        """Analisis struktur form pada HTML halaman utama"""
         soup = BeautifulSoup(html_content, 'html.parser')
         
         if self.debug:
@@ -141,12 +201,9 @@ class AMGRScraper:
         
         return form_elements
     
-    def get_options(self):
-        """Ambil daftar pilihan untuk state, member, dan breed"""
-        html_content = self.get_page_source()
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Analisis struktur form
+    def _build_catalog_entry(self, html_content):
+        """Bangun entry katalog (opsi dan tombol submit) dari HTML halaman utama"""
+        # Analisis struktur form, cukup sekali untuk opsi dan tombol submit
         form_elements = self.analyze_form_structure(html_content)
         
         states = {}
@@ -177,6 +234,15 @@ class AMGRScraper:
                 if option_text and not option_text.startswith("-- Select"):
                     breeds[option_text] = option.get('value')
         
+        # Simpan nama dan nilai tombol submit agar search() tidak perlu parse ulang
+        submit = None
+        submit_input = form_elements.get('submit_input')
+        if submit_input and submit_input.get('name'):
+            submit = {
+                'name': submit_input.get('name'),
+                'value': submit_input.get('value', 'Submit')
+            }
+        
         if self.debug:
             print(f"Debug - States found: {len(states)}")
             print(f"Debug - Members found: {len(members)}")
@@ -193,119 +259,126 @@ class AMGRScraper:
         return {
             'states': states,
             'members': members,
-            'breeds': breeds
+            'breeds': breeds,
+            'submit': submit
         }
     
-    def search(self, state=None, member=None, breed=None):
-        """Lakukan pencarian dengan filter yang disediakan"""
-        # Cek parameter yang diberikan
-        if not state and not member and not breed:
+    def _conditional_headers(self, previous):
+        """Header validasi ulang kondisional dari entry katalog lama"""
+        extra_headers = {}
+        if previous:
+            if previous.get('etag'):
+                extra_headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                extra_headers['If-Modified-Since'] = previous['last_modified']
+        return extra_headers
+    
+    def _catalog_from_response(self, previous, status_code, headers, content):
+        """Bangun entry katalog dari response, memakai ulang entry lama bila halaman tidak berubah"""
+        # Server menyatakan halaman tidak berubah
+        if previous and status_code == 304:
             if self.debug:
-                print("Debug - No search parameters provided")
-            return {"header": [], "data": []}
+                print("Debug - Catalog not modified (304), reusing stored options")
+            return dict(previous)
         
-        # Dapatkan opsi tersedia beserta form elements
-        options = self.get_options()
-        form_elements = self.analyze_form_structure()
-        
-        # Buat form data
-        data = {}
+        # Fallback ketika server tidak mengirim validator: bandingkan hash konten
+        content_hash = hashlib.sha256(content).hexdigest()
+        if previous and previous.get('content_hash') == content_hash:
+            if self.debug:
+                print("Debug - Catalog content hash unchanged, skipping parse")
+            entry = dict(previous)
+        else:
+            with self.instrumentation.span("form.analyze", bytes=len(content)):
+                entry = self._build_catalog_entry(content)
         
-        # Cari nilai state
-        if state and options['states']:
-            # Cek state langsung
-            if state in options['states']:
-                data['stateID'] = options['states'][state]
-                if self.debug:
-                    print(f"Debug - Using state value: {state} -> {options['states'][state]}")
-            else:
-                # Cari state berdasarkan substring
-                matched = False
-                for state_name, state_value in options['states'].items():
-                    if state.lower() in state_name.lower():
-                        data['stateID'] = state_value
-                        if self.debug:
-                            print(f"Debug - Found state by partial match: {state} -> {state_name} ({state_value})")
-                        matched = True
-                        break
-                
-                if not matched and self.debug:
-                    print(f"Debug - State '{state}' not found in available options")
-        
-        # Cari nilai member
-        if member and options['members']:
-            # Cek member langsung
-            if member in options['members']:
-                data['memberID'] = options['members'][member]
+        entry['etag'] = headers.get('ETag')
+        entry['last_modified'] = headers.get('Last-Modified')
+        entry['content_hash'] = content_hash
+        return entry
+    
+    def _build_form_data(self, catalog, state=None, member=None, breed=None):
+        """Buat form data pencarian dari katalog opsi"""
+        with self.instrumentation.span("resolve"):
+            data = {}
+            # Index dibangun sekali per entry katalog, bukan setiap pencarian
+            resolver = self._resolvers.get(catalog)
+            
+            fields = (
+                ('stateID', 'State', state, resolver.states),
+                ('memberID', 'Member', member, resolver.members),
+                ('breedID', 'Breed', breed, resolver.breeds),
+            )
+            for field, label, query, index in fields:
+                if not query or not len(index):
+                    continue
+                match = index.resolve(query)
+                if match is None:
+                    if self.debug:
+                        print(f"Debug - {label} '{query}' not found in available options")
+                        suggestions = index.candidates(query, limit=3)
+                        if suggestions:
+                            print(f"Debug - Closest {label.lower()} options: {[(m.name, m.score) for m in suggestions]}")
+                    continue
+                data[field] = match.value
                 if self.debug:
-                    print(f"Debug - Using member value: {member} -> {options['members'][member]}")
-            else:
-                # Cari member berdasarkan substring
-                matched = False
-                for member_name, member_value in options['members'].items():
-                    if member.lower() in member_name.lower():
-                        data['memberID'] = member_value
-                        if self.debug:
-                            print(f"Debug - Found member by partial match: {member} -> {member_name} ({member_value})")
-                        matched = True
-                        break
-                
-                if not matched and self.debug:
-                    print(f"Debug - Member '{member}' not found in available options")
-        
-        # Cari nilai breed
-        if breed and options['breeds']:
-            # Cek breed langsung
-            if breed in options['breeds']:
-                data['breedID'] = options['breeds'][breed]
+                    print(f"Debug - Resolved {label.lower()}: {query} -> {match.name} ({match.value}, score {match.score})")
+            
+            # Jika tidak ada filter yang berhasil ditambahkan, 
+            # pastikan form tetap terkirim
+            if not data:
+                data = {'submit': 'Submit'}
+            
+            # Tambahkan nilai submit button jika ada
+            submit = catalog.get('submit')
+            if submit:
+                data[submit['name']] = submit['value']
                 if self.debug:
-                    print(f"Debug - Using breed value: {breed} -> {options['breeds'][breed]}")
-            else:
-                # Cari breed berdasarkan substring
-                matched = False
-                for breed_name, breed_value in options['breeds'].items():
-                    if breed.lower() in breed_name.lower():
-                        data['breedID'] = breed_value
-                        if self.debug:
-                            print(f"Debug - Found breed by partial match: {breed} -> {breed_name} ({breed_value})")
-                        matched = True
-                        break
-                
-                if not matched and self.debug:
-                    print(f"Debug - Breed '{breed}' not found in available options")
-        
-        # Jika tidak ada filter yang berhasil ditambahkan, 
-        # pastikan form tetap terkirim
-        if not data:
-            data = {'submit': 'Submit'}
+                    print(f"Debug - Adding submit button: {submit['name']}={submit['value']}")
+            
+            return data
+    
+    def _parse_results(self, html_content):
+        """Parse hasil pencarian, melewati parsing jika HTML yang sama sudah ada di cache"""
+        if self.result_cache is None:
+            return self._parse_html(html_content)
         
-        # Tambahkan nilai submit button jika ada
-        submit_input = form_elements.get('submit_input')
-        if submit_input and submit_input.get('name'):
-            submit_name = submit_input.get('name')
-            submit_value = submit_input.get('value', 'Submit')
-            data[submit_name] = submit_value
+        results = self.result_cache.get(html_content)
+        self._count_cache("result", results is not None)
+        if results is not None:
             if self.debug:
-                print(f"Debug - Adding submit button: {submit_name}={submit_value}")
+                print(f"Debug - Parsed result diambil dari cache: {len(results['data'])} rows")
+            return results
         
-        if self.debug:
-            print(f"\nDebug - Data yang dikirim: {data}")
-        
-        # Kirim request
-        response = self.session.post(self.base_url, data=data, headers=self.headers)
-        
-        if self.debug:
-            print(f"Debug - Status code: {response.status_code}")
-            print(f"Debug - Response URL: {response.url}")
-            with open("debug/response.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
-            print("Debug - HTML response disimpan ke debug/response.html")
+        results = self._parse_html(html_content)
+        self.result_cache.set(html_content, results)
+        return results
+    
+    def _count_cache(self, cache, hit):
+        self.instrumentation.count("cache.hits" if hit else "cache.misses", cache=cache)
+    
+    def _parse_html(self, html_content):
+        """Parse hasil pencarian, memakai backend cepat jika ada dan heuristik sebagai fallback"""
+        with self._profiler.track_allocations("parse"), \
+                self.instrumentation.span("parse.results", bytes=len(html_content)) as span:
+            results = None
+            if self._fast_parser is not None:
+                results = self._fast_parser(html_content)
+                if results is not None:
+                    span.set(backend=self.parser)
+                    if self.debug:
+                        print(f"Debug - Parsed with '{self.parser}' backend: {len(results['data'])} rows, headers={results['header']}")
+                elif self.debug:
+                    print("Debug - Result table not found by fast parser, falling back to heuristic parser")
+            
+            if results is None:
+                span.set(backend="bs4")
+                results = self._parse_results_heuristic(html_content)
+            span.set(rows=len(results['data']))
         
-        # Parse hasil search
-        results = self._parse_results(response.content)
+        self.instrumentation.count("rows.parsed", len(results['data']))
         return results
     
-    def _parse_results(self, html_content):
+    def _parse_results_heuristic(self, html_content):
         """Parse hasil pencarian dari HTML untuk mencari tabel hasil"""
         soup = BeautifulSoup(html_content, 'html.parser')
         
@@ -408,6 +481,230 @@ class AMGRScraper:
             "data": data
         }
 
+class AMGRScraper(BaseAMGRScraper):
+    """Scraper sinkron: requests.Session lewat HTTPTransport, pencarian paralel dengan thread pool"""
+    
+    def __init__(self, debug=False, catalog=None, max_per_host=4, parser="auto", transport=None, rate_limiter=None,
+                 response_cache=None, result_cache=None, instrumentation=None, capture=None):
+        # Lapisan HTTP dengan timeout, retry, dan pool sesuai batas konkurensi per host.
+        # rate_limiter dipakai transport default dan bisa dibagikan antar scraper.
+        if transport is None:
+            transport = HTTPTransport(pool_maxsize=max_per_host, rate_limiter=rate_limiter, debug=debug,
+                                      instrumentation=instrumentation)
+        elif instrumentation is not None and not transport.instrumentation.enabled:
+            transport.instrumentation = instrumentation
+        self.transport = transport
+        # Span dan counter (default no-op, sama dengan transport)
+        super().__init__(debug=debug, catalog=catalog, parser=parser, response_cache=response_cache,
+                         result_cache=result_cache, capture=capture,
+                         instrumentation=instrumentation if instrumentation is not None else transport.instrumentation)
+        # Batas request bersamaan per host (dipakai saat search_many berjalan paralel)
+        self.max_per_host = max_per_host
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """requests.Session yang dipakai transport"""
+        return self.transport.session
+    
+    @session.setter
+    def session(self, session):
+        self.transport.session = session
+    
+    def _host_slot(self, url):
+        """Semaphore pembatas jumlah request bersamaan ke host dari URL"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_semaphores[host] = semaphore
+        return semaphore
+    
+    def _fetch_main_page(self, extra_headers=None):
+        """Kirim GET ke halaman utama dan kembalikan objek response"""
+        headers = dict(self.headers, **(extra_headers or {}))
+        with self._host_slot(self.base_url):
+            response = self.transport.get(self.base_url, headers=headers)
+        if response.status_code != 304:
+            self._capture_html("main_page", response.content, self.base_url)
+        return response
+    
+    def get_page_source(self):
+        """Ambil source HTML dari halaman utama"""
+        return self._fetch_main_page().content
+    
+    def analyze_form_structure(self, html_content=None):
+        """Analisis struktur form pada halaman (diambil dari situs jika html_content kosong)"""
+        if not html_content:
+            html_content = self.get_page_source()
+        return super().analyze_form_structure(html_content)
+    
+    def _load_catalog(self, previous=None):
+        """
+        Ambil halaman utama dan bangun entry katalog baru.
+        Jika ada entry lama, lakukan validasi ulang kondisional (ETag/Last-Modified)
+        dan lewati parsing bila konten halaman tidak berubah.
+        """
+        with self.instrumentation.span("catalog.load", conditional=previous is not None):
+            extra_headers = self._conditional_headers(previous)
+            
+            if self.debug:
+                print(f"Debug - Loading option catalog from main page (conditional={bool(extra_headers)})...")
+            
+            response = self._fetch_main_page(extra_headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            
+            return self._catalog_from_response(previous, response.status_code, response.headers, response.content)
+    
+    def _get_catalog(self):
+        """Ambil entry katalog, memuat dari situs hanya jika belum ada atau kadaluarsa"""
+        return self.catalog.get(self._load_catalog)
+    
+    def get_options(self, refresh=False):
+        """Ambil daftar pilihan untuk state, member, dan breed"""
+        if refresh:
+            self.catalog.invalidate()
+        
+        entry = self._get_catalog()
+        
+        # Kembalikan salinan agar katalog bersama tidak ikut berubah
+        return {
+            'states': dict(entry['states']),
+            'members': dict(entry['members']),
+            'breeds': dict(entry['breeds'])
+        }
+    
+    def search(self, state=None, member=None, breed=None, stream=False):
+        """
+        Lakukan pencarian dengan filter yang disediakan.
+        
+        Dengan stream=True, body response dibaca bertahap dan yang dikembalikan adalah
+        StreamingResults: iterasi menghasilkan baris begitu tiap <tr> selesai, dan
+        atribut header berisi header tabel. Panggil close() jika berhenti lebih awal.
+        """
+        # Cek parameter yang diberikan
+        if not state and not member and not breed:
+            if self.debug:
+                print("Debug - No search parameters provided")
+            if stream:
+                return StreamingResults([])
+            return {"header": [], "data": []}
+        
+        # Dapatkan opsi dan tombol submit dari katalog (tanpa request jika masih segar)
+        catalog = self._get_catalog()
+        
+        # Buat form data
+        data = self._build_form_data(catalog, state, member, breed)
+        
+        if self.debug:
+            print(f"\nDebug - Data yang dikirim: {data}")
+        
+        if stream:
+            # Pakai response dari cache jika query yang sama pernah dikirim
+            if self.response_cache is not None:
+                cached = self.response_cache.get(self.base_url, data)
+                self._count_cache("response", cached is not None)
+                if cached is not None:
+                    if self.debug:
+                        print("Debug - Response diambil dari cache")
+                    return StreamingResults([cached])
+            
+            with self._host_slot(self.base_url):
+                response = self.transport.post(self.base_url, data=data, headers=self.headers, stream=True)
+            if self.debug:
+                print(f"Debug - Status code: {response.status_code}")
+                print("Debug - Streaming response, HTML tidak di-capture")
+            return StreamingResults.from_response(response)
+        
+        # Parse hasil search
+        results = self._parse_results(self._fetch_results_page(data))
+        return results
+    
+    def _fetch_results_page(self, data):
+        """Kirim form pencarian dan kembalikan body HTML hasil (dari cache jika ada)"""
+        # Pakai response dari cache jika query yang sama pernah dikirim
+        if self.response_cache is not None:
+            cached = self.response_cache.get(self.base_url, data)
+            self._count_cache("response", cached is not None)
+            if cached is not None:
+                if self.debug:
+                    print("Debug - Response diambil dari cache")
+                return cached
+        
+        # Kirim request
+        with self._host_slot(self.base_url):
+            response = self.transport.post(self.base_url, data=data, headers=self.headers)
+        
+        if self.debug:
+            print(f"Debug - Status code: {response.status_code}")
+            print(f"Debug - Response URL: {response.url}")
+        self._capture_html("response", response.content, ResponseCache.make_key(self.base_url, data))
+        
+        if self.response_cache is not None and response.status_code == 200:
+            self.response_cache.set(self.base_url, data, response.content)
+        
+        return response.content
+    
+    def iter_results(self, state=None, member=None, breed=None):
+        """
+        Generator BreederRecord untuk pencarian yang diberikan.
+        
+        Response dibaca secara streaming sehingga tidak ada list baris besar yang dibangun;
+        setiap record berisi kolom hasil plus farm_name dan farm_code yang sudah dipisah.
+        """
+        with self.search(state, member, breed, stream=True) as results:
+            yield from iter_stream_records(results.header, results)
+    
+    def search_many(self, queries, max_workers=8):
+        """
+        Jalankan banyak pencarian secara paralel dengan thread pool terbatas.
+        
+        queries berisi tuple (state, member, breed); elemen yang tidak dipakai boleh None.
+        Hasil di-yield sesuai urutan selesai sebagai pasangan (query, result). Jika
+        sebuah pencarian gagal, result berisi key 'error' dan pencarian lain tetap jalan.
+        """
+        query_iter = iter(queries)
+        max_pending = max_workers * 2
+        
+        # Muat katalog sekali sebelum worker mulai agar tidak ada GET ganda
+        self._get_catalog()
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Worker milik search_many ikut diprofil jika ada sesi profiling aktif
+        search = self._profiler.wrap(self.search)
+        pending = {}
+        try:
+            while True:
+                # Isi antrian sampai batas agar iterable besar tidak disubmit sekaligus
+                while len(pending) < max_pending:
+                    query = next(query_iter, None)
+                    if query is None:
+                        break
+                    query = (tuple(query) + (None, None, None))[:3]
+                    pending[executor.submit(search, *query)] = query
+                
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    query = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if self.debug:
+                            print(f"Debug - Query {query} gagal: {e}")
+                        result = {"header": [], "data": [], "error": f"{e.__class__.__name__}: {e}"}
+                    yield query, result
+        finally:
+            # Batalkan query yang belum jalan jika pemanggil berhenti lebih awal
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
 def interactive_mode():
     """Mode interaktif untuk script"""
     print("=" * 50)
@@ -435,9 +732,17 @@ def interactive_mode():
             print("Melanjutkan dengan mode interaktif reguler...")
         else:
             try:
+                # Kosakata opsi situs untuk analisis tanpa LLM
+                try:
+                    vocabulary = scraper.get_options()
+                except Exception:
+                    vocabulary = None
+                
                 # Dapatkan API key dari environment variable
                 api_key = os.environ.get("OPENAI_API_KEY")
-                if not api_key:
+                if not api_key and vocabulary is not None:
+                    print("\nCatatan: OPENAI_API_KEY tidak ditemukan, perintah dianalisis secara offline berdasarkan nama opsi situs.")
+                elif not api_key:
                     print("\nError: OPENAI_API_KEY tidak ditemukan di environment variables.")
                     
                     if not DOTENV_LOADED:
@@ -455,7 +760,7 @@ def interactive_mode():
                 
                 if use_nl:
                     # Inisialisasi NLP processor
-                    processor = NLPProcessor(api_key=api_key)
+                    processor = NLPProcessor(api_key=api_key, vocabulary=vocabulary)
                     
                     # Minta input natural language
                     nl_query = input("\nMasukkan perintah pencarian dalam bahasa alami: ")
@@ -560,25 +865,80 @@ def interactive_mode():
     print("\nHasil pencarian:")
     print(json.dumps(results, indent=2))
 
-def main():
-    # Cek apakah ada argumen yang diberikan
-    if len(sys.argv) == 1:
-        # Jika tidak ada argumen, jalankan mode interaktif
-        interactive_mode()
-        return
+def crawl_mode(scraper, args):
+    """Mode crawl seluruh direktori dengan checkpoint yang bisa dilanjutkan"""
+    crawler = DirectoryCrawler(
+        scraper,
+        checkpoint_path=args.checkpoint,
+        include_breeds=args.crawl_breeds,
+        max_workers=args.workers
+    )
     
-    # Jika ada argumen lain, jalankan mode command line seperti biasa
-    parser = argparse.ArgumentParser(description='AMGR Directory Scraper')
-    parser.add_argument('--state', type=str, help='State filter')
-    parser.add_argument('--member', type=str, help='Member filter')
-    parser.add_argument('--breed', type=str, help='Breed filter')
-    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    todo = crawler.pending()
+    print(f"Crawl direktori: {len(todo)} query tersisa, {len(crawler.state['records'])} peternak dari checkpoint {args.checkpoint}")
     
-    # Tambahkan opsi untuk Natural Language Processing
-    parser.add_argument('--nl', '--natural-language', type=str, dest='nl_query', 
-                        help='Perintah pencarian dalam bahasa alami')
+    def on_progress(query, added, error):
+        kind, value = query
+        if error:
+            print(f"  [gagal] {kind}={value}: {error} (akan diulang saat crawl dilanjutkan)")
+        else:
+            print(f"  [selesai] {kind}={value}: {added} peternak baru")
     
-    args = parser.parse_args()
+    results = crawler.run(on_progress=on_progress)
+    remaining = len(crawler.pending())
+    print(f"Total peternak unik: {len(results['data'])}, query belum selesai: {remaining}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Hasil crawl disimpan ke {args.output}")
+    else:
+        print(json.dumps(results, indent=2))
+    
+    if remaining:
+        sys.exit(1)
+
+def serve_mode(scraper, args, nl_transport=None, metrics=None):
+    """Mode layanan HTTP dengan scraper, katalog opsi, dan cache NL yang tetap hangat"""
+    from server import AMGRService, create_server
+    
+    service = AMGRService(scraper, metrics=metrics)
+    try:
+        options = service.warm()
+        print(f"Katalog opsi dimuat: {len(options['states'])} state, {len(options['members'])} member, {len(options['breeds'])} breed")
+    except Exception as e:
+        # Katalog dicoba lagi saat request pertama
+        options = None
+        print(f"Peringatan: gagal memuat katalog opsi ({e})")
+    
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not NLP_AVAILABLE:
+        print("Catatan: nlp_processor tidak tersedia, endpoint /nl-search dinonaktifkan.")
+    elif api_key or options is not None:
+        nl_cache = None
+        if args.nl_cache:
+            nl_cache = TieredCache(disk=create_backend(args.nl_cache))
+        service.pipeline.processor = NLPProcessor(api_key=api_key, cache=nl_cache, vocabulary=options,
+                                                  transport=nl_transport, instrumentation=scraper.instrumentation)
+        if not api_key:
+            print("Catatan: OPENAI_API_KEY tidak ditemukan, /nl-search hanya mengenali nama opsi situs.")
+    else:
+        print("Catatan: OPENAI_API_KEY dan katalog opsi tidak tersedia, endpoint /nl-search dinonaktifkan.")
+    
+    server = create_server(service, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Melayani http://{host}:{port} (endpoint: /search, /nl-search, /health, /metrics). Tekan Ctrl+C untuk berhenti.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServer dihentikan.")
+    finally:
+        server.server_close()
+
+def search_mode(scraper, args, nl_transport=None, instrumentation=None):
+    """Mode pencarian tunggal dengan parameter langsung atau perintah bahasa alami"""
+    pipeline = QueryPipeline(scraper)
+    result = None
     
     # Proses perintah bahasa alami jika ada
     if args.nl_query:
@@ -587,9 +947,20 @@ def main():
             sys.exit(1)
         
         try:
-            # Dapatkan API key dari env
+            # Dapatkan API key dari env; tanpa key, hanya analisis berbasis aturan yang tersedia
             api_key = os.environ.get("OPENAI_API_KEY")
+            vocabulary = None
             if not api_key:
+                # Mode offline butuh kosakata opsi situs sebelum analisis dimulai
+                try:
+                    vocabulary = scraper.get_options()
+                except Exception as e:
+                    if args.debug:
+                        print(f"Debug - Gagal mengambil kosakata opsi: {e}")
+            
+            if not api_key and vocabulary is not None:
+                print("Catatan: OPENAI_API_KEY tidak ditemukan, perintah dianalisis secara offline berdasarkan nama opsi situs.")
+            elif not api_key:
                 print("Error: OPENAI_API_KEY tidak ditemukan di environment variables.")
                 
                 if not DOTENV_LOADED:
@@ -604,16 +975,21 @@ def main():
                 print("  Untuk Linux/Mac: export OPENAI_API_KEY=your-api-key-here")
                 sys.exit(1)
             
-            # Inisialisasi NLP Processor
-            processor = NLPProcessor(api_key=api_key)
+            # Inisialisasi NLP Processor, dengan tier disk jika --nl-cache diberikan
+            nl_cache = None
+            if args.nl_cache:
+                nl_cache = TieredCache(disk=create_backend(args.nl_cache))
+            pipeline.processor = NLPProcessor(api_key=api_key, cache=nl_cache, vocabulary=vocabulary,
+                                              transport=nl_transport, instrumentation=instrumentation)
             
+            # Katalog opsi diambil bersamaan dengan analisis LLM, lalu langsung dicari
             print(f"Menganalisis perintah: \"{args.nl_query}\"")
-            params = processor.parse_command(args.nl_query)
+            result = pipeline.run(nl_query=args.nl_query)
             
             # Set parameter dari hasil analisis NLP
-            args.state = params.get('state')
-            args.member = params.get('member')
-            args.breed = params.get('breed')
+            args.state = result.params.get('state')
+            args.member = result.params.get('member')
+            args.breed = result.params.get('breed')
             
             print("Hasil analisis:")
             print(f"- State: {args.state or 'tidak dispesifikasikan'}")
@@ -624,8 +1000,7 @@ def main():
         except Exception as e:
             print(f"Error saat memproses perintah bahasa alami: {e}")
             print("Melanjutkan dengan parameter yang diberikan secara langsung (jika ada).")
-    
-    scraper = AMGRScraper(debug=args.debug)
+            result = None
     
     print("Insert Link:", scraper.base_url)
     
@@ -636,10 +1011,181 @@ def main():
     if args.breed:
         print(f"Command: Select Breed: \"{args.breed}\"")
     
-    results = scraper.search(args.state, args.member, args.breed)
+    if result is None:
+        result = pipeline.run(state=args.state, member=args.member, breed=args.breed)
+    
+    if args.timings:
+        print(f"Timing (ms): {json.dumps(result.timings)}")
     
     # Tampilkan hasil dalam format JSON
-    print(json.dumps(results, indent=2))
+    print(json.dumps(result.results, indent=2))
+
+def main():
+    # Cek apakah ada argumen yang diberikan
+    if len(sys.argv) == 1:
+        # Jika tidak ada argumen, jalankan mode interaktif
+        interactive_mode()
+        return
+    
+    # Jika ada argumen lain, jalankan mode command line seperti biasa
+    parser = argparse.ArgumentParser(description='AMGR Directory Scraper')
+    parser.add_argument('command', nargs='?', choices=['serve'],
+                        help='"serve" untuk menjalankan layanan HTTP JSON (/search, /nl-search)')
+    parser.add_argument('--state', type=str, help='State filter')
+    parser.add_argument('--member', type=str, help='Member filter')
+    parser.add_argument('--breed', type=str, help='Breed filter')
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--parser', type=str, default='auto',
+                        help='Backend parser hasil: auto, lxml, selectolax, atau bs4 (default: auto)')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='Batas waktu baca response dalam detik (default: 30)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Jumlah retry untuk error koneksi dan status 5xx (default: 3)')
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help='Batas request per detik ke amgr.org, 0 untuk tanpa batas (default: 2)')
+    parser.add_argument('--rate-state', type=str,
+                        help='File status rate limiter untuk berbagi kuota antar proses')
+    parser.add_argument('--response-cache', type=str, default=os.environ.get("AMGR_RESPONSE_CACHE"),
+                        help='Cache response pencarian: path file SQLite, "sqlite:PATH", "dir:PATH", atau "memory" '
+                             '(default: env AMGR_RESPONSE_CACHE)')
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help='Umur cache response pencarian dalam detik (default: 3600)')
+    parser.add_argument('--result-cache', type=str,
+                        help='Folder cache hasil parsing (HTML identik tidak di-parse ulang)')
+    parser.add_argument('--nl-cache', type=str, default=os.environ.get("AMGR_NL_CACHE"),
+                        help='Cache persisten hasil analisis bahasa alami: path file SQLite, "sqlite:PATH", atau "dir:PATH" '
+                             '(default: env AMGR_NL_CACHE)')
+    parser.add_argument('--catalog-cache', type=str, default=os.environ.get("AMGR_CATALOG_CACHE"),
+                        help='File JSON untuk menyimpan katalog opsi antar proses (default: env AMGR_CATALOG_CACHE)')
+    
+    # Tambahkan opsi untuk Natural Language Processing
+    parser.add_argument('--nl', '--natural-language', type=str, dest='nl_query', 
+                        help='Perintah pencarian dalam bahasa alami')
+    
+    # Opsi crawl seluruh direktori
+    parser.add_argument('--crawl-all', action='store_true',
+                        help='Crawl seluruh direktori dengan menelusuri setiap state')
+    parser.add_argument('--crawl-breeds', action='store_true',
+                        help='Saat crawl, telusuri juga setiap breed untuk mencatat breed tiap peternak')
+    parser.add_argument('--checkpoint', type=str, default='crawl_checkpoint.json',
+                        help='File checkpoint crawl (default: crawl_checkpoint.json)')
+    parser.add_argument('--output', type=str, help='Simpan hasil crawl ke file JSON')
+    parser.add_argument('--timings', action='store_true', help='Tampilkan durasi setiap tahap pencarian')
+    parser.add_argument('--workers', type=int, default=4, help='Jumlah pencarian paralel saat crawl')
+    parser.add_argument('--record', type=str, metavar='DIR',
+                        help='Rekam semua response HTTP (amgr.org dan OpenAI) ke folder fixture')
+    parser.add_argument('--replay', type=str, metavar='DIR',
+                        help='Putar ulang response dari folder fixture tanpa akses jaringan')
+    parser.add_argument('--trace', type=str, metavar='PATH',
+                        help='Tulis span (HTTP, parse, resolve, LLM) dan counter ke file JSON lines')
+    parser.add_argument('--metrics', type=str, metavar='PATH',
+                        help='Tulis metrik format Prometheus ke file saat program selesai')
+    parser.add_argument('--profile', type=str, nargs='?', const='profile/amgr', metavar='PREFIX',
+                        help='Profil pencarian/crawl: tulis PREFIX.pstats, PREFIX.collapsed (flamegraph), '
+                             'dan PREFIX.txt (default PREFIX: profile/amgr)')
+    parser.add_argument('--capture', type=str, nargs='?', const=CAPTURE_DIRECTORY, metavar='DIR',
+                        help=f'Simpan HTML setiap response (terkompresi, dirotasi) tanpa mode debug '
+                             f'(default DIR: {CAPTURE_DIRECTORY}; mode debug selalu menyimpan capture)')
+    parser.add_argument('--capture-compression', type=str, default='gzip', choices=['gzip', 'zstd', 'none'],
+                        help='Kompresi file capture (default: gzip; zstd butuh zstandard)')
+    parser.add_argument('--capture-max-mb', type=float, default=100,
+                        help='Batas total ukuran folder capture dalam MB; file tertua dihapus (default: 100)')
+    parser.add_argument('--capture-max-age', type=float, metavar='HOURS',
+                        help='Hapus capture yang lebih tua dari sekian jam (default: tanpa batas)')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Alamat layanan HTTP mode serve (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port layanan HTTP mode serve (default: 8000)')
+    
+    args = parser.parse_args()
+    
+    catalog = None
+    if args.catalog_cache:
+        catalog = OptionCatalog(store=CatalogStore(args.catalog_cache))
+    
+    response_cache = None
+    if args.response_cache:
+        response_cache = ResponseCache(create_backend(args.response_cache), ttl=args.cache_ttl)
+    
+    result_cache = None
+    if args.result_cache:
+        result_cache = ParsedResultCache(directory=args.result_cache)
+    
+    fixtures = None
+    if args.record and args.replay:
+        parser.error("--record dan --replay tidak bisa dipakai bersamaan")
+    elif args.record or args.replay:
+        fixtures = FixtureStore(args.record or args.replay)
+    
+    # Instrumentasi hanya aktif jika ada exporter; mode serve selalu menyediakan /metrics
+    exporters = []
+    if args.trace:
+        exporters.append(JSONLinesExporter(args.trace))
+    metrics = None
+    if args.metrics or args.command == 'serve':
+        metrics = PrometheusExporter()
+        exporters.append(metrics)
+    instrumentation = Instrumentation(*exporters) if exporters else None
+    
+    def finish_instrumentation():
+        if args.metrics:
+            metrics.write(args.metrics)
+        if instrumentation is not None:
+            instrumentation.close()
+    atexit.register(finish_instrumentation)
+    
+    rate_limiter = None
+    # Response dari fixture tidak perlu dibatasi lajunya
+    if args.rate > 0 and not args.replay:
+        rate_limiter = RateLimiter(rate=args.rate, state_path=args.rate_state)
+    
+    def build_transport(**kwargs):
+        if fixtures is not None:
+            return ReplayTransport(fixtures, mode="record" if args.record else "replay", **kwargs)
+        return HTTPTransport(**kwargs)
+    
+    # Satu writer capture dipakai bersama oleh semua scraper
+    capture = None
+    if args.capture or args.debug:
+        try:
+            capture = DebugCapture(args.capture or CAPTURE_DIRECTORY, compression=args.capture_compression,
+                                   max_bytes=int(args.capture_max_mb * 1024 * 1024),
+                                   max_age=args.capture_max_age * 3600 if args.capture_max_age else None)
+        except ImportError as e:
+            parser.error(str(e))
+    
+    # Transport OpenAI hanya perlu dibuat sendiri saat merekam/memutar ulang fixture
+    nl_transport = build_transport(read_timeout=60, pool_maxsize=8) if fixtures is not None else None
+    
+    def build_scraper(max_per_host=4):
+        transport = build_transport(read_timeout=args.timeout, max_retries=args.retries,
+                                    pool_maxsize=max_per_host, rate_limiter=rate_limiter, debug=args.debug)
+        return AMGRScraper(debug=args.debug, catalog=catalog, max_per_host=max_per_host,
+                           parser=args.parser, transport=transport, response_cache=response_cache,
+                           result_cache=result_cache, instrumentation=instrumentation, capture=capture)
+    
+    if args.command == 'serve':
+        serve_mode(build_scraper(max_per_host=args.workers), args, nl_transport, metrics)
+        return
+    
+    # --profile membungkus seluruh crawl atau pencarian
+    @contextmanager
+    def profiling(scraper):
+        if not args.profile:
+            yield
+            return
+        with scraper.profile(args.profile) as session:
+            yield
+        files = ", ".join(session.paths.values())
+        print(f"Profil disimpan ({session.elapsed:.2f} detik, {session.sampler.samples} sampel): {files}")
+    
+    if args.crawl_all:
+        scraper = build_scraper(max_per_host=args.workers)
+        with profiling(scraper):
+            crawl_mode(scraper, args)
+        return
+    
+    scraper = build_scraper()
+    with profiling(scraper):
+        search_mode(scraper, args, nl_transport, instrumentation)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,34 +1,20 @@
 import os
 import json
+import hashlib
+import threading
 import requests
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
-class NLPProcessor:
-    def __init__(self, api_key: Optional[str] = None):
-        """
-        Inisialisasi NLP Processor untuk mengubah bahasa alami ke parameter scraping
-        
-        Args:
-            api_key: OpenAI API key. Jika None, akan mencoba mengambil dari env OPENAI_API_KEY
-        """
-        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OpenAI API key diperlukan. Berikan sebagai parameter atau atur env OPENAI_API_KEY")
-        
-        self.api_url = "https://api.openai.com/v1/chat/completions"
-        self.model = "gpt-4.1-mini"  
-        
-    def parse_command(self, query: str) -> Dict[str, Any]:
-        """
-        Mengubah query bahasa alami menjadi parameter scraping
-        
-        Args:
-            query: Perintah dalam bahasa alami
-            
-        Returns:
-            Dictionary berisi parameter scraping (state, member, breed)
-        """
-        system_prompt = """
+from cache import TieredCache, MemoryLRUBackend
+from transport import HTTPTransport
+from instrumentation import NOOP
+from rule_extractor import RuleExtractor
+from resolver import CatalogResolver
+
+# Naikkan setiap kali SYSTEM_PROMPT diubah agar hasil cache lama tidak dipakai lagi
+PROMPT_VERSION = 2
+
+SYSTEM_PROMPT = """
         Kamu adalah asisten yang membantu mengubah perintah bahasa alami menjadi parameter untuk web scraping pada website AMGR Directory.
         
         Tugas kamu adalah mengekstrak parameter berikut dari perintah pengguna:
@@ -49,72 +35,549 @@ class NLPProcessor:
         Perintah: "Cari peternak American Red di Alabama"
         Output: {"state": "Alabama", "member": null, "breed": "American Red"}
         """
+
+
+# Skema jawaban parse_command(); jika kosakata diketahui, state dan breed dibatasi enum
+COMMAND_SCHEMA_NAME = "search_command"
+
+# Jumlah maksimum nilai enum per field di skema (daftar member biasanya terlalu panjang)
+MAX_ENUM_VALUES = 200
+
+
+def nullable_string(values=None) -> Dict[str, Any]:
+    """Skema JSON untuk string (opsional dibatasi daftar nilai) atau null"""
+    if values and len(values) <= MAX_ENUM_VALUES:
+        return {"anyOf": [{"type": "string", "enum": sorted(values)}, {"type": "null"}]}
+    return {"type": ["string", "null"]}
+
+
+def command_response_format(vocabulary: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
+    """response_format structured output untuk satu perintah"""
+    vocabulary = vocabulary or {}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": COMMAND_SCHEMA_NAME,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "state": nullable_string(vocabulary.get("states")),
+                    "member": nullable_string(vocabulary.get("members")),
+                    "breed": nullable_string(vocabulary.get("breeds")),
+                },
+                "required": ["state", "member", "breed"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+# Tambahan instruksi untuk parse_commands(): banyak perintah dalam satu request
+BATCH_INSTRUCTIONS = """
+        Kamu akan menerima array JSON berisi objek {"id", "query"}. Analisis setiap query secara
+        terpisah dan kembalikan objek {"results": [...]} dengan satu elemen per query berisi
+        id yang sama serta state, member, dan breed.
+        """
+
+BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "batch_commands",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "state": {"type": ["string", "null"]},
+                            "member": {"type": ["string", "null"]},
+                            "breed": {"type": ["string", "null"]},
+                        },
+                        "required": ["id", "state", "member", "breed"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Perkiraan token per query dalam batch: pembungkus JSON di input, dan jawaban di output
+BATCH_ITEM_OVERHEAD = 10
+BATCH_OUTPUT_TOKENS_PER_QUERY = 40
+
+EMPTY_PARAMS = {"state": None, "member": None, "breed": None}
+
+
+def estimate_tokens(text: str) -> int:
+    """Perkiraan kasar jumlah token (sekitar 4 karakter per token)"""
+    return len(text) // 4 + 1
+
+
+def normalize_query(query: str) -> str:
+    """Samakan penulisan query (huruf besar/kecil, spasi, tanda baca di ujung) untuk key cache"""
+    return " ".join(query.casefold().split()).strip(" .,!?")
+
+
+class BaseNLPProcessor:
+    """
+    Bagian NLP processor yang tidak melakukan I/O jaringan: prompt dan skema jawaban,
+    ekstraktor aturan, validasi terhadap kosakata opsi, cache hasil, dan pembagian batch.
+    Dipakai bersama oleh NLPProcessor (requests, thread) dan AsyncNLPProcessor (aiohttp, asyncio).
+    """
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[TieredCache] = None,
+                 vocabulary: Optional[Dict[str, Dict[str, str]]] = None,
+                 max_batch_tokens: int = 2000, max_batch_size: int = 50, max_concurrency: int = 8,
+                 instrumentation=None):
+        """
+        Args:
+            api_key: OpenAI API key. Jika None, akan mencoba mengambil dari env OPENAI_API_KEY
+            cache: Cache hasil parse_command; default LRU di memori. Beri TieredCache dengan
+                   tier disk agar hasil dipakai ulang antar proses.
+            vocabulary: Hasil AMGRScraper.get_options(). Jika diberikan, query yang jelas
+                        dianalisis tanpa LLM, dan API key menjadi opsional (mode offline).
+            max_batch_tokens: Perkiraan batas token input per request parse_commands()
+            max_batch_size: Jumlah query maksimum per request parse_commands()
+            max_concurrency: Jumlah request API bersamaan maksimum (untuk banyak thread/task)
+            instrumentation: Penerima span llm.call dan counter cache/rule (default no-op)
+        """
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        if not self.api_key and vocabulary is None:
+            raise ValueError("OpenAI API key diperlukan. Berikan sebagai parameter atau atur env OPENAI_API_KEY")
+        
+        self.extractor = None
+        self.resolver = None
+        self.response_format = command_response_format()
+        # Sidik kosakata untuk key cache (kosong jika kosakata belum diketahui)
+        self._vocabulary_hash = ""
+        if vocabulary is not None:
+            self.set_vocabulary(vocabulary)
+        self.rule_hits = 0
+        self.corrections = 0
+        
+        self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.model = "gpt-4.1-mini"  
+        self.cache = cache if cache is not None else TieredCache(MemoryLRUBackend(max_entries=1024))
+        self.instrumentation = instrumentation if instrumentation is not None else NOOP
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+    
+    def set_vocabulary(self, vocabulary: Dict[str, Dict[str, str]]) -> None:
+        """
+        Ganti kosakata opsi situs (misalnya setelah katalog opsi diperbarui). Dipakai oleh
+        ekstraktor berbasis aturan, skema jawaban, dan validasi jawaban LLM.
+        """
+        self.extractor = RuleExtractor(vocabulary)
+        self.resolver = CatalogResolver(vocabulary)
+        self.response_format = command_response_format(vocabulary)
+        names = [sorted(vocabulary.get(field) or {}) for field in ("states", "members", "breeds")]
+        self._vocabulary_hash = hashlib.sha256(json.dumps(names, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    
+    def _cache_key(self, query: str) -> str:
+        """Key cache dari query yang dinormalisasi, nama model, versi prompt, dan kosakata opsi"""
+        raw = json.dumps([normalize_query(query), self.model, PROMPT_VERSION, self._vocabulary_hash],
+                         ensure_ascii=False)
+        return "nl:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
         
-        headers = {
+    def _local_result(self, query: str) -> Optional[Dict[str, Any]]:
+        """Hasil tanpa memanggil API: ekstraktor berbasis aturan, lalu cache"""
+        # Query yang menyebut opsi situs secara jelas tidak perlu ke API
+        if self.extractor is not None:
+            params = self.extractor.extract(query)
+            if params is not None:
+                self.rule_hits += 1
+                self.instrumentation.count("nl.rule_hits")
+                return params
+        
+        # Query yang sama (setelah normalisasi) tidak perlu ke API lagi
+        params = self.cache.get(self._cache_key(query), json.loads)
+        if params is not None and self.resolver is not None:
+            # Entry cache tetap divalidasi: cache bisa dibagikan atau ditulis sebelum opsi situs berubah
+            params, problems = self._validate(params)
+            if problems:
+                params = None
+        self.instrumentation.count("cache.hits" if params is not None else "cache.misses", cache="nl")
+        return params
+    
+    def _remember(self, query: str, params: Dict[str, Any]) -> None:
+        self.cache.set(self._cache_key(query), json.dumps(params, ensure_ascii=False).encode("utf-8"))
+    
+    def _request_headers(self) -> Dict[str, str]:
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
-        
+    
+    def _payload(self, messages, **options) -> Dict[str, Any]:
         payload = {
             "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": query}
-            ],
+            "messages": messages,
             "temperature": 0.2,  # Nilai rendah untuk konsistensi
         }
+        payload.update(options)
+        return payload
+    
+    @staticmethod
+    def _command_messages(query: str):
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": query}
+        ]
+    
+    def _validate(self, params: Any):
+        """
+        Periksa parameter dari LLM terhadap kosakata opsi situs
         
+        Returns:
+            Tuple (parameter yang valid dengan nama opsi resmi, daftar masalah). Nilai yang
+            tidak valid diganti None agar tidak pernah dikirim ke scraper.
+        """
+        if not isinstance(params, dict):
+            return dict(EMPTY_PARAMS), ["jawaban harus berupa objek JSON dengan state, member, dan breed"]
+        
+        indexes = {}
+        if self.resolver is not None:
+            indexes = {"state": self.resolver.states, "member": self.resolver.members, "breed": self.resolver.breeds}
+        
+        clean, problems = dict(EMPTY_PARAMS), []
+        for field in EMPTY_PARAMS:
+            value = params.get(field)
+            if value is None:
+                continue
+            if not isinstance(value, str) or not value.strip():
+                problems.append(f"{field} harus berupa string atau null")
+                continue
+            index = indexes.get(field)
+            if index is None or not len(index):
+                clean[field] = value.strip()
+                continue
+            match = index.resolve(value)
+            if match is None:
+                suggestions = ", ".join(m.name for m in index.candidates(value, limit=3)) or "-"
+                problems.append(f"{field} '{value}' tidak ada di daftar opsi situs (yang mirip: {suggestions})")
+                continue
+            clean[field] = match.name
+        return clean, problems
+    
+    def _check_choice(self, choice: Dict[str, Any]):
+        """Decode dan validasi jawaban satu perintah; kembalikan (parameter, masalah)"""
+        message = choice.get("message") or {}
+        if message.get("refusal"):
+            return dict(EMPTY_PARAMS), [f"model menolak menjawab: {message['refusal']}"]
         try:
-            response = requests.post(self.api_url, headers=headers, json=payload)
+            params = json.loads(message.get("content") or "")
+        except json.JSONDecodeError:
+            return dict(EMPTY_PARAMS), ["jawaban bukan JSON yang valid"]
+        return self._validate(params)
+    
+    @staticmethod
+    def _correction_messages(messages, choice: Dict[str, Any], problems: List[str]):
+        """Pesan lanjutan yang meminta model memperbaiki jawabannya (satu kali)"""
+        return messages + [
+            {"role": "assistant", "content": (choice.get("message") or {}).get("content") or ""},
+            {"role": "user", "content": "Jawaban tersebut tidak valid: " + "; ".join(problems)
+                                        + ". Perbaiki jawabanmu; gunakan null jika parameter tidak bisa ditentukan."},
+        ]
+    
+    def _revalidation_messages(self, query: str, params: Dict[str, Any], problems: List[str]):
+        """Pesan koreksi untuk parameter yang dianalisis sebelum kosakata tersedia (lihat revalidate())"""
+        previous = {"message": {"content": json.dumps(params, ensure_ascii=False)}}
+        return self._correction_messages(self._command_messages(query), previous, problems)
+    
+    def _finish_command(self, query: str, params: Dict[str, Any], problems: List[str],
+                        remember: bool = True) -> Dict[str, Any]:
+        if problems:
+            # Nilai yang tetap tidak valid sudah dibuang oleh _validate(); hasil sebagian ini
+            # tidak disimpan di cache agar query yang sama dianalisis ulang lain kali
+            print(f"Peringatan: sebagian hasil analisis dibuang ({'; '.join(problems)})")
+        elif remember:
+            self._remember(query, params)
+        return params
+    
+    def _split_batches(self, queries: List[str]) -> List[List[str]]:
+        """Bagi query ke batch yang muat dalam batas token input dan jumlah query"""
+        batches, current, tokens = [], [], 0
+        for query in queries:
+            cost = estimate_tokens(query) + BATCH_ITEM_OVERHEAD
+            if current and (tokens + cost > self.max_batch_tokens or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(query)
+            tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+    
+    @staticmethod
+    def _batch_request(queries: List[str]):
+        """Pesan dan opsi request untuk satu batch"""
+        items = [{"id": i, "query": query} for i, query in enumerate(queries)]
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT + BATCH_INSTRUCTIONS},
+            {"role": "user", "content": json.dumps(items, ensure_ascii=False)}
+        ]
+        options = {
+            "response_format": BATCH_RESPONSE_FORMAT,
+            "max_tokens": BATCH_OUTPUT_TOKENS_PER_QUERY * len(queries) + 50,
+        }
+        return messages, options
+    
+    def _decode_batch(self, queries: List[str], choice: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Petakan jawaban batch kembali ke query
+        
+        Returns:
+            Mapping query -> parameter, atau None jika jawaban terpotong karena batas token
+        """
+        if choice.get("finish_reason") == "length" and len(queries) > 1:
+            return None
+        results = {}
+        for item in json.loads(choice["message"]["content"]).get("results", []):
+            index = item.get("id")
+            if isinstance(index, int) and 0 <= index < len(queries):
+                params, problems = self._validate(item)
+                # Jawaban yang tidak valid dianalisis ulang lewat parse_command() (dengan koreksi)
+                if not problems:
+                    results[queries[index]] = params
+        return results
+    
+    def _pending_queries(self, queries: List[str]):
+        """
+        Jawab query yang bisa dijawab tanpa API
+        
+        Returns:
+            Tuple (hasil per query atau None, mapping query ternormalisasi -> satu query perwakilan)
+        """
+        results: List[Optional[Dict[str, Any]]] = [self._local_result(query) for query in queries]
+        pending: Dict[str, str] = {}
+        for query, result in zip(queries, results):
+            if result is None:
+                pending.setdefault(normalize_query(query), query)
+        return results, pending
+    
+    @staticmethod
+    def _merge_answers(queries, results, answers) -> List[Dict[str, Any]]:
+        return [
+            result if result is not None else dict(answers.get(normalize_query(query), EMPTY_PARAMS))
+            for query, result in zip(queries, results)
+        ]
+    
+    def _collect_answers(self, pending, answered, unreachable, answers, remember=True) -> None:
+        """Isi answers dari jawaban batch; query dari batch yang gagal di transport mendapat EMPTY_PARAMS"""
+        for key, query in pending.items():
+            if query in answered:
+                if remember:
+                    self._remember(query, answered[query])
+                answers[key] = answered[query]
+            elif query in unreachable:
+                answers[key] = dict(EMPTY_PARAMS)
+
+    def get_api_usage(self) -> Dict[str, Any]:
+        """Mendapatkan informasi penggunaan API"""
+        # Implementasi sederhana untuk menampilkan penggunaan API
+        return {
+            "model": self.model,
+            "status": "active" if self.api_key else "offline",
+            "rule_hits": self.rule_hits,
+            "corrections": self.corrections,
+            "cache": self.cache.stats()
+        }
+
+
+class NLPProcessor(BaseNLPProcessor):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[TieredCache] = None,
+                 vocabulary: Optional[Dict[str, Dict[str, str]]] = None,
+                 transport: Optional[HTTPTransport] = None,
+                 max_batch_tokens: int = 2000, max_batch_size: int = 50, max_concurrency: int = 8,
+                 instrumentation=None):
+        """
+        Inisialisasi NLP Processor untuk mengubah bahasa alami ke parameter scraping
+        
+        Args:
+            api_key, cache, vocabulary, max_batch_tokens, max_batch_size, max_concurrency:
+                Lihat BaseNLPProcessor
+            transport: HTTPTransport untuk request ke API; default session dengan connection pool
+            instrumentation: Penerima span llm.call dan counter cache/rule (default no-op)
+        """
+        # Satu session untuk semua request agar koneksi ke API dipakai ulang; transport
+        # juga memberi timeout dan retry dengan backoff untuk 429/5xx
+        if transport is None:
+            transport = HTTPTransport(read_timeout=60, pool_maxsize=max_concurrency, instrumentation=instrumentation)
+        elif instrumentation is not None and not transport.instrumentation.enabled:
+            transport.instrumentation = instrumentation
+        super().__init__(api_key=api_key, cache=cache, vocabulary=vocabulary, max_batch_tokens=max_batch_tokens,
+                         max_batch_size=max_batch_size, max_concurrency=max_concurrency,
+                         instrumentation=instrumentation if instrumentation is not None else transport.instrumentation)
+        self.transport = transport
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+    
+    def _chat(self, messages, **options) -> Dict[str, Any]:
+        """
+        Kirim satu request chat completions lewat session bersama
+        
+        Returns:
+            choices[0] dari respons API (berisi message dan finish_reason)
+        """
+        with self.instrumentation.span("llm.call", model=self.model, messages=len(messages)) as span:
+            with self._slots:
+                response = self.transport.post(self.api_url, headers=self._request_headers(),
+                                               json=self._payload(messages, **options))
             response.raise_for_status()
             result = response.json()
+            usage = result.get("usage") or {}
+            span.set(prompt_tokens=usage.get("prompt_tokens"), completion_tokens=usage.get("completion_tokens"))
+        return result["choices"][0]
+    
+    def parse_command(self, query: str, remember: bool = True) -> Dict[str, Any]:
+        """
+        Mengubah query bahasa alami menjadi parameter scraping
+        
+        Jawaban LLM diminta dalam format JSON schema dan divalidasi terhadap kosakata
+        opsi situs. Jika tidak valid, model diminta memperbaiki sekali; nilai yang tetap
+        tidak valid diganti None.
+        
+        Args:
+            query: Perintah dalam bahasa alami
+            remember: Simpan hasil di cache. False untuk hasil sementara yang dianalisis
+                      sebelum kosakata tersedia (divalidasi kemudian dengan revalidate())
             
-            # Ambil teks respons dan parse sebagai JSON
-            response_text = result["choices"][0]["message"]["content"]
-            
-            # Coba parse langsung jika sudah dalam format JSON
-            try:
-                parsed_params = json.loads(response_text)
-            except json.JSONDecodeError:
-                # Jika bukan format JSON, coba ekstrak bagian JSON dari teks
-                import re
-                json_match = re.search(r'{.*}', response_text, re.DOTALL)
-                if json_match:
-                    parsed_params = json.loads(json_match.group(0))
-                else:
-                    raise ValueError(f"Tidak dapat mengekstrak JSON dari respons: {response_text}")
-            
-            return parsed_params
+        Returns:
+            Dictionary berisi parameter scraping (state, member, breed)
+        """
+        local = self._local_result(query)
+        if local is not None:
+            return local
+        
+        if not self.api_key:
+            print("Perintah tidak dapat dianalisis tanpa OpenAI API key (mode offline hanya mengenali nama opsi situs)")
+            return dict(EMPTY_PARAMS)
+        
+        try:
+            messages = self._command_messages(query)
+            choice = self._chat(messages, response_format=self.response_format)
+            params, problems = self._check_choice(choice)
+            if problems:
+                self.corrections += 1
+                choice = self._chat(self._correction_messages(messages, choice, problems),
+                                    response_format=self.response_format)
+                params, problems = self._check_choice(choice)
+            return self._finish_command(query, params, problems, remember)
             
         except requests.exceptions.RequestException as e:
             print(f"Error saat menghubungi OpenAI API: {e}")
-            return {"state": None, "member": None, "breed": None}
+            return dict(EMPTY_PARAMS)
         except Exception as e:
             print(f"Error saat memproses respons: {e}")
-            return {"state": None, "member": None, "breed": None}
-
-    def get_api_usage(self) -> Dict[str, Any]:
-        """Mendapatkan informasi penggunaan API"""
-        # Implementasi sederhana untuk menampilkan penggunaan API
-        return {
-            "model": self.model,
-            "status": "active"
-        }
+            return dict(EMPTY_PARAMS)
+    
+    def revalidate(self, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validasi ulang parameter yang dianalisis sebelum kosakata tersedia (misalnya oleh
+        QueryPipeline selagi katalog opsi masih diambil). Nilai yang tidak valid membuat
+        model diminta memperbaiki sekali dengan skema yang sudah berisi daftar opsi; nilai
+        yang tetap tidak valid diganti None. Hasil yang valid disimpan di cache dengan key
+        kosakata saat ini.
+        """
+        clean, problems = self._validate(params)
+        if problems and self.api_key:
+            self.corrections += 1
+            try:
+                choice = self._chat(self._revalidation_messages(query, params, problems),
+                                    response_format=self.response_format)
+                clean, problems = self._check_choice(choice)
+            except requests.exceptions.RequestException as e:
+                print(f"Error saat menghubungi OpenAI API: {e}")
+            except Exception as e:
+                print(f"Error saat memproses respons: {e}")
+        return self._finish_command(query, clean, problems)
+    
+    def _parse_batch(self, queries: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analisis beberapa query dalam satu request. Jika jawaban terpotong karena batas
+        token, batch dibelah dua dan dikirim ulang.
+        
+        Returns:
+            Mapping query -> parameter untuk query yang berhasil dianalisis
+        """
+        messages, options = self._batch_request(queries)
+        results = self._decode_batch(queries, self._chat(messages, **options))
+        if results is None:
+            middle = len(queries) // 2
+            results = self._parse_batch(queries[:middle])
+            results.update(self._parse_batch(queries[middle:]))
+        return results
+    
+    def parse_commands(self, queries: List[str], remember: bool = True) -> List[Dict[str, Any]]:
+        """
+        Mengubah banyak query bahasa alami sekaligus, dengan sesedikit mungkin request API
+        
+        Query yang bisa dijawab tanpa API (aturan atau cache) tidak dikirim, query duplikat
+        hanya dikirim sekali, dan sisanya dikemas ke beberapa batch sesuai batas token.
+        
+        Args:
+            queries: Daftar perintah dalam bahasa alami
+            remember: Simpan hasil di cache (lihat parse_command())
+            
+        Returns:
+            Daftar parameter (state, member, breed) dengan urutan yang sama seperti queries
+        """
+        results, pending = self._pending_queries(queries)
+        
+        answers: Dict[str, Dict[str, Any]] = {}
+        if pending and not self.api_key:
+            print(f"{len(pending)} perintah tidak dapat dianalisis tanpa OpenAI API key")
+        elif pending:
+            answered: Dict[str, Dict[str, Any]] = {}
+            unreachable = set()
+            for batch in self._split_batches(list(pending.values())):
+                try:
+                    answered.update(self._parse_batch(batch))
+                except requests.exceptions.RequestException as e:
+                    # API tidak bisa dihubungi: jangan ulangi satu per satu (transport sudah retry)
+                    print(f"Error saat menghubungi OpenAI API: {e}")
+                    unreachable.update(batch)
+                except Exception as e:
+                    print(f"Error saat memproses respons batch: {e}")
+            self._collect_answers(pending, answered, unreachable, answers, remember)
+            
+            # Tidak ada di jawaban batch: analisis satu per satu
+            for key, query in pending.items():
+                if key not in answers:
+                    answers[key] = self.parse_command(query, remember)
+        
+        return self._merge_answers(queries, results, answers)
 
 
 if __name__ == "__main__":
     # Demo sederhana untuk testing
     import sys
     
-    if len(sys.argv) > 1:
+    # Mode batch: python nlp_processor.py --batch queries.txt (satu perintah per baris)
+    batch_file = None
+    if len(sys.argv) > 2 and sys.argv[1] == "--batch":
+        batch_file = sys.argv[2]
+    elif len(sys.argv) > 1:
         query = " ".join(sys.argv[1:])
     else:
         query = input("Masukkan perintah pencarian: ")
     
     try:
         processor = NLPProcessor()
-        result = processor.parse_command(query)
+        if batch_file:
+            with open(batch_file, "r", encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()]
+            result = [dict(params, query=q) for q, params in zip(queries, processor.parse_commands(queries))]
+        else:
+            result = processor.parse_command(query)
         print(json.dumps(result, indent=2, ensure_ascii=False))
     except ValueError as e:
         print(f"Error: {e}")
-        print("Pastikan API key sudah diatur dengan benar") 
\ No newline at end of file
+        print("Pastikan API key sudah diatur dengan benar")
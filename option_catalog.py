@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Jeda antar pengecekan load katalog yang sedang berjalan dari event loop (detik)
+ASYNC_WAIT_POLL_INTERVAL = 0.005
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Tulis data JSON secara atomik (tulis ke file sementara lalu rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CatalogStore:
+    """
+    Penyimpanan katalog opsi di disk (file JSON) agar proses baru tidak perlu
+    mengunduh dan mem-parse ulang halaman direktori.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Lokasi file JSON tempat katalog disimpan
+        """
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Baca entry katalog dari disk, None jika belum ada atau rusak"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or not all(key in entry for key in ("states", "members", "breeds")):
+            return None
+        return entry
+
+    def save(self, entry: Dict[str, Any]) -> None:
+        """Tulis entry katalog ke disk"""
+        write_json_atomic(self.path, entry)
+
+
+class OptionCatalog:
+    """
+    Katalog opsi form (state, member, breed, dan tombol submit) yang dibangun
+    sekali lalu dipakai ulang oleh banyak pencarian.
+
+    Satu instance dapat dibagikan ke beberapa AMGRScraper sehingga halaman
+    direktori hanya diambil dan di-parse sekali selama TTL masih berlaku.
+    Jika diberi CatalogStore, katalog juga dimuat dari dan disimpan ke disk.
+    """
+
+    def __init__(self, ttl: Optional[float] = 3600, store: Optional[CatalogStore] = None):
+        """
+        Args:
+            ttl: Umur katalog dalam detik sebelum divalidasi ulang. None berarti tidak pernah kadaluarsa.
+            store: Penyimpanan persisten opsional untuk katalog
+        """
+        self.ttl = ttl
+        self.store = store
+        self._entry: Optional[Dict[str, Any]] = None
+        self._store_checked = False
+        self._stale = False
+        # Lock hanya untuk perubahan state singkat (_entry, _stale, _loading, _generation);
+        # tidak pernah dipegang selama loader berjalan
+        self._lock = threading.Lock()
+        # Event milik load yang sedang berjalan (dari thread maupun task asyncio), None jika tidak ada
+        self._loading: Optional[threading.Event] = None
+        # Dinaikkan oleh invalidate(); hasil load yang dimulai sebelum invalidate tidak dipasang
+        self._generation = 0
+
+    def _is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        if entry is None or self._stale:
+            return False
+        if self.ttl is None:
+            return True
+        # Pakai waktu wall-clock karena entry bisa berasal dari proses sebelumnya
+        return (time.time() - entry.get("fetched_at", 0)) < self.ttl
+
+    def is_fresh(self) -> bool:
+        """Cek apakah katalog sudah dimuat dan belum kadaluarsa"""
+        return self._is_fresh(self._entry)
+
+    def _load_from_store(self) -> None:
+        # Muat dari disk sekali per proses sebelum menghubungi situs (hanya oleh pemegang load)
+        if not self._store_checked:
+            self._store_checked = True
+            if self.store is not None and self._entry is None:
+                entry = self.store.load()
+                with self._lock:
+                    if self._entry is None:
+                        self._entry = entry
+
+    def _claim(self):
+        """
+        Tentukan peran pemanggil: (entry, None, None) jika katalog masih segar, (None, event, None)
+        jika load lain sedang berjalan dan perlu ditunggu, atau (None, None, generation) jika
+        pemanggil ini yang harus memuat
+        """
+        with self._lock:
+            if self._is_fresh(self._entry):
+                return self._entry, None, None
+            if self._loading is not None:
+                return None, self._loading, None
+            self._loading = threading.Event()
+            return None, None, self._generation
+
+    def _finish(self, generation: int, entry: Optional[Dict[str, Any]]) -> bool:
+        """Pasang entry hasil load (jika tidak di-invalidate selama load) lalu bangunkan penunggu"""
+        installed = False
+        with self._lock:
+            if entry is not None and generation == self._generation:
+                entry["fetched_at"] = time.time()
+                self._entry = entry
+                self._stale = False
+                installed = True
+            loading, self._loading = self._loading, None
+        loading.set()
+        return installed
+
+    def get(self, loader: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Kembalikan isi katalog, memanggil loader hanya jika katalog kosong atau kadaluarsa
+
+        Args:
+            loader: Fungsi yang menerima entry lama (atau None) dan mengembalikan entry baru.
+                Entry lama dipakai untuk validasi ulang kondisional (ETag/Last-Modified).
+
+        Returns:
+            Dictionary berisi 'states', 'members', 'breeds', dan 'submit'
+        """
+        while True:
+            entry, waiting, generation = self._claim()
+            if entry is not None:
+                return entry
+            if waiting is not None:
+                # Thread atau task lain sedang memuat, pakai hasilnya
+                waiting.wait()
+                continue
+
+            new_entry = None
+            try:
+                self._load_from_store()
+                if self._is_fresh(self._entry):
+                    return self._entry
+                new_entry = loader(self._entry)
+            finally:
+                installed = self._finish(generation, new_entry)
+            if installed and self.store is not None:
+                self.store.save(new_entry)
+            return new_entry
+
+    async def aget(self, loader: Callable[[Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Versi asyncio dari get(): hanya satu pemanggil (thread atau task) yang memuat katalog,
+        pemanggil lain menunggu hasilnya
+
+        Tidak ada lock yang dipegang selama loader berjalan; task lain menunggu load yang
+        sedang berjalan dengan asyncio.sleep sehingga event loop tidak pernah terblokir.
+
+        Args:
+            loader: Coroutine function yang menerima entry lama (atau None) dan mengembalikan entry baru
+        """
+        while True:
+            entry, waiting, generation = self._claim()
+            if entry is not None:
+                return entry
+            if waiting is not None:
+                while not waiting.is_set():
+                    await asyncio.sleep(ASYNC_WAIT_POLL_INTERVAL)
+                continue
+
+            # Baca/tulis file JSON store di thread pool agar event loop tidak menunggu disk
+            loop = asyncio.get_running_loop()
+            new_entry = None
+            try:
+                await loop.run_in_executor(None, self._load_from_store)
+                if self._is_fresh(self._entry):
+                    return self._entry
+                new_entry = await loader(self._entry)
+            finally:
+                installed = self._finish(generation, new_entry)
+            if installed and self.store is not None:
+                await loop.run_in_executor(None, self.store.save, new_entry)
+            return new_entry
+
+    def invalidate(self, hard: bool = False) -> None:
+        """
+        Tandai katalog kadaluarsa sehingga pemanggilan get() berikutnya memuat ulang
+
+        Args:
+            hard: Jika True, entry lama dibuang sehingga tidak ada validasi kondisional
+                dan halaman diunduh serta di-parse ulang sepenuhnya
+        """
+        # Tidak menunggu load yang sedang berjalan; hasil load itu tidak akan dipasang
+        with self._lock:
+            self._generation += 1
+            self._stale = True
+            if hard:
+                self._entry = None
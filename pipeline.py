@@ -0,0 +1,195 @@
+"""
+Pipeline pencarian end-to-end: analisis bahasa alami -> resolve opsi -> fetch -> parse.
+
+Tahap yang tidak saling bergantung dijalankan tumpang tindih: katalog opsi diambil
+bersamaan dengan panggilan LLM, dan pada mode batch parsing hasil satu query berjalan
+sementara query berikutnya masih di-fetch. Setiap tahap mencatat durasinya.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+EMPTY_PARAMS = {"state": None, "member": None, "breed": None}
+
+
+class StageTimer:
+    """Pencatat durasi per tahap (detik), aman dipakai banyak thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """Durasi per tahap dalam milidetik"""
+        with self._lock:
+            return {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()}
+
+
+class PipelineResult(NamedTuple):
+    """Hasil satu query: parameter yang dipakai, hasil pencarian, dan durasi tahap (ms)"""
+    params: Dict[str, Optional[str]]
+    results: Dict[str, Any]
+    timings: Dict[str, float]
+
+
+class QueryPipeline:
+    """
+    Menjalankan query (bahasa alami atau parameter langsung) melalui AMGRScraper dengan
+    tahap-tahap yang tumpang tindih.
+    """
+
+    def __init__(self, scraper, processor=None, max_workers: int = 4):
+        """
+        Args:
+            scraper: AMGRScraper yang dipakai untuk katalog, fetch, dan parse
+            processor: NLPProcessor untuk query bahasa alami (opsional)
+            max_workers: Jumlah fetch bersamaan pada mode batch
+        """
+        self.scraper = scraper
+        self.processor = processor
+        self.max_workers = max_workers
+
+    def _warm_catalog(self, timer: StageTimer):
+        with timer.stage("catalog"):
+            return self.scraper.get_options()
+
+    def _share_vocabulary(self, options) -> None:
+        # Kosakata untuk ekstraktor aturan dan validasi query berikutnya
+        if self.processor is not None and self.processor.extractor is None:
+            self.processor.set_vocabulary(options)
+
+    def _parse_queries(self, executor, nl_queries: List[str], timer: StageTimer) -> List[Dict[str, Optional[str]]]:
+        """
+        Analisis query bahasa alami sambil mengambil katalog opsi di thread lain
+
+        Jika katalog sudah segar (misalnya dari cache disk), kosakata langsung dipakai sehingga
+        ekstraktor aturan bisa melewati LLM. Jika belum, panggilan LLM tidak menunggu katalog;
+        hasilnya tidak disimpan di cache dan divalidasi ulang (dengan satu koreksi bila perlu)
+        setelah katalog tiba, sehingga nilai di luar daftar opsi tidak pernah dicari.
+        Tanpa API key, analisis harus menunggu katalog karena hanya aturan yang tersedia.
+        """
+        if self.processor is None:
+            raise ValueError("Query bahasa alami membutuhkan NLPProcessor")
+
+        catalog_future = executor.submit(self._warm_catalog, timer)
+        # Tanpa kosakata jawaban LLM belum bisa divalidasi
+        provisional = self.processor.extractor is None
+        if self.scraper.catalog.is_fresh() or not self.processor.api_key:
+            self._share_vocabulary(catalog_future.result())
+            provisional = False
+
+        with timer.stage("nl"):
+            if len(nl_queries) == 1:
+                params = [self.processor.parse_command(nl_queries[0], remember=not provisional)]
+            else:
+                params = self.processor.parse_commands(nl_queries, remember=not provisional)
+
+        # Katalog dibutuhkan tahap resolve; biasanya sudah selesai selama LLM bekerja
+        with timer.stage("catalog_wait"):
+            self._share_vocabulary(catalog_future.result())
+
+        if provisional:
+            with timer.stage("nl"):
+                checked: Dict[str, Dict[str, Optional[str]]] = {}
+                for query, result in zip(nl_queries, params):
+                    if query not in checked:
+                        checked[query] = self.processor.revalidate(query, result)
+                params = [dict(checked[query]) for query in nl_queries]
+        return params
+
+    def _fetch(self, params, timer: StageTimer):
+        catalog = self.scraper._get_catalog()
+        with timer.stage("resolve"):
+            data = self.scraper._build_form_data(catalog, params.get("state"), params.get("member"), params.get("breed"))
+        with timer.stage("fetch"):
+            return self.scraper._fetch_results_page(data)
+
+    def _parse(self, content, timer: StageTimer):
+        with timer.stage("parse"):
+            return self.scraper._parse_results(content)
+
+    def run(self, nl_query: Optional[str] = None, state=None, member=None, breed=None) -> PipelineResult:
+        """Jalankan satu query; nl_query diutamakan jika diberikan"""
+        queries = [nl_query] if nl_query else [{"state": state, "member": member, "breed": breed}]
+        return self.run_many(queries)[0]
+
+    def run_many(self, queries: Iterable) -> List[PipelineResult]:
+        """
+        Jalankan banyak query. Setiap item boleh berupa string bahasa alami atau dictionary
+        parameter (state/member/breed). Fetch berjalan paralel (max_workers) dan parsing
+        berjalan di thread sendiri begitu sebuah halaman selesai di-fetch.
+
+        Returns:
+            PipelineResult per query dengan urutan yang sama seperti input. timings berisi
+            tahap bersama (catalog, nl, catalog_wait), tahap query itu (resolve, fetch, parse),
+            dan total waktu seluruh batch.
+        """
+        queries = list(queries)
+        shared = StageTimer()
+        timers = [StageTimer() for _ in queries]
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers + 1) as fetch_pool, \
+                ThreadPoolExecutor(max_workers=1) as parse_pool:
+            nl_indexes = [i for i, query in enumerate(queries) if isinstance(query, str)]
+            params: List[Dict[str, Optional[str]]] = [
+                None if isinstance(query, str) else {**EMPTY_PARAMS, **query} for query in queries
+            ]
+            if nl_indexes:
+                parsed = self._parse_queries(fetch_pool, [queries[i] for i in nl_indexes], shared)
+                for i, result in zip(nl_indexes, parsed):
+                    params[i] = result
+            elif any(any(query_params.values()) for query_params in params):
+                # Katalog sekali untuk semua query sebelum fetch paralel dimulai
+                self._warm_catalog(shared)
+
+            parse_futures = [None] * len(queries)
+            # Thread pool milik pipeline ikut diprofil jika scraper sedang dalam sesi profiling
+            profiled = self.scraper._profiler.wrap
+
+            def fetch_then_queue(i):
+                # Parse diantrekan ke thread parse begitu fetch selesai, tidak menunggu fetch lain
+                content = self._fetch(params[i], timers[i])
+                parse_futures[i] = parse_pool.submit(profiled(self._parse), content, timers[i])
+
+            fetch_futures = []
+            for i, query_params in enumerate(params):
+                if any(query_params.values()):
+                    fetch_futures.append((i, fetch_pool.submit(profiled(fetch_then_queue), i)))
+            errors = {}
+            for i, future in fetch_futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[i] = e
+
+            outputs = []
+            for i, query_params in enumerate(params):
+                results = {"header": [], "data": []}
+                try:
+                    if i in errors:
+                        raise errors[i]
+                    if parse_futures[i] is not None:
+                        results = parse_futures[i].result()
+                except Exception as e:
+                    # Sama seperti search_many(): satu query gagal tidak menggagalkan batch
+                    results = {"header": [], "data": [], "error": f"{e.__class__.__name__}: {e}"}
+                timings = {**shared.snapshot(), **timers[i].snapshot()}
+                outputs.append(PipelineResult(query_params, results, timings))
+
+        total = round((time.perf_counter() - start) * 1000, 3)
+        return [result._replace(timings={**result.timings, "total": total}) for result in outputs]
@@ -0,0 +1,323 @@
+"""
+Profiling satu pencarian atau satu batch run.
+
+ProfileSession menjalankan tiga pengukuran sekaligus dan menulis hasilnya dengan awalan
+path yang sama:
+
+    <prefix>.pstats     cProfile (deterministik) untuk thread yang membuka sesi dan tugas
+                        worker milik sesi (dibungkus wrap(), misalnya worker
+                        QueryPipeline/search_many), digabung; buka dengan `python -m pstats`
+                        atau snakeviz. Sejak Python 3.12 cProfile memakai sys.monitoring
+                        yang berlaku untuk seluruh proses: hanya satu profiler yang bisa
+                        aktif dan profiler itu mencatat semua thread, jadi wrap() tidak
+                        membuat profiler per thread
+    <prefix>.collapsed  stack hasil sampling semua thread, satu baris per stack
+                        ("thread;fungsi;fungsi jumlah"), input untuk flamegraph.pl/speedscope
+    <prefix>.txt        ringkasan: fungsi teratas (cumulative) dan alokasi memori fase parse
+
+Alokasi memori hanya dilacak (tracemalloc) selama fase parse karena tracemalloc
+memperlambat semua alokasi dan akan mengaburkan waktu fase lain. Lokasi alokasi diambil
+dari snapshot di akhir setiap jendela fase parse lalu digabung.
+
+Hanya satu sesi yang boleh aktif dalam satu proses. Sebelum Python 3.12 thread lain
+(writer DebugCapture, thread server) tidak diprofil cProfile.
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+# Interval sampling stack (detik)
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Jumlah frame yang disimpan tracemalloc per alokasi
+TRACEMALLOC_FRAMES = 10
+
+# Jumlah baris pada ringkasan teks
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+# Python 3.12+: cProfile berjalan di atas sys.monitoring, satu profiler untuk semua thread
+# (profiler kedua yang di-enable menimbulkan ValueError)
+SHARED_PROFILER = sys.version_info >= (3, 12)
+
+# Sesi yang sedang aktif (hanya satu per proses)
+_active_session: Optional["ProfileSession"] = None
+_active_lock = threading.Lock()
+
+
+class NoProfile:
+    """Pengganti ProfileSession saat profiling tidak aktif"""
+
+    def track_allocations(self, phase: str):
+        return nullcontext()
+
+    def wrap(self, func: Callable) -> Callable:
+        return func
+
+
+NO_PROFILE = NoProfile()
+
+
+class StackSampler:
+    """Ambil stack semua thread secara berkala dari thread latar belakang"""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class AllocationTracker:
+    """
+    Alokasi memori selama fase yang dilacak; aman untuk fase yang berjalan bersamaan di
+    beberapa thread. Satu jendela dimulai saat fase pertama masuk dan selesai saat fase
+    terakhir keluar: tracemalloc hanya aktif di dalam jendela, dan di akhir jendela
+    alokasi yang masih hidup (snapshot, atau selisih terhadap snapshot awal jika
+    tracemalloc sudah aktif sebelumnya) ditambahkan ke sites. Alokasi thread lain yang
+    terjadi selama jendela terbuka (misalnya fetch paralel) ikut terhitung.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = 0
+        self._started_here = False
+        # Snapshot awal jendela jika tracemalloc sudah aktif sebelum jendela dimulai
+        self._baseline = None
+        self.calls: Counter = Counter()
+        self.peak: Dict[str, int] = {}
+        self.sites: Counter = Counter()
+
+    @contextmanager
+    def track(self, phase: str):
+        with self._lock:
+            if self._active == 0:
+                self._started_here = not tracemalloc.is_tracing()
+                if self._started_here:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+                    self._baseline = None
+                else:
+                    self._baseline = tracemalloc.take_snapshot()
+                tracemalloc.reset_peak()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.calls[phase] += 1
+                _, peak = tracemalloc.get_traced_memory()
+                self.peak[phase] = max(self.peak.get(phase, 0), peak)
+                if self._active == 0:
+                    self._close_window()
+
+    def _close_window(self) -> None:
+        # Alokasi fase yang masih hidup setelah fase selesai (misalnya list baris hasil)
+        exclude = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        snapshot = tracemalloc.take_snapshot().filter_traces(exclude)
+        if self._baseline is None:
+            for stat in snapshot.statistics("lineno"):
+                frame = stat.traceback[0]
+                self.sites[f"{frame.filename}:{frame.lineno}"] += stat.size
+        else:
+            for stat in snapshot.compare_to(self._baseline.filter_traces(exclude), "lineno"):
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    self.sites[f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+            self._baseline = None
+        if self._started_here:
+            tracemalloc.stop()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "peak_bytes": dict(self.peak),
+            "top_sites": [{"site": site, "bytes": size} for site, size in self.sites.most_common(TOP_ALLOCATIONS)],
+        }
+
+
+class ProfileSession:
+    """Context manager yang memprofil semua yang dijalankan di dalamnya"""
+
+    def __init__(self, output_prefix: str, sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 allocations: bool = True):
+        """
+        Args:
+            output_prefix: Awalan path file hasil (folder dibuat otomatis)
+            sample_interval: Interval sampling stack untuk file .collapsed (detik)
+            allocations: Lacak alokasi memori fase parse dengan tracemalloc
+        """
+        self.output_prefix = output_prefix
+        self.profiler = cProfile.Profile()
+        # Profiler per thread worker yang menjalankan tugas hasil wrap()
+        self._thread_profilers: List[cProfile.Profile] = []
+        self._local = threading.local()
+        self._profilers_lock = threading.Lock()
+        self._owner = None
+        self.sampler = StackSampler(sample_interval)
+        self.allocations = AllocationTracker() if allocations else None
+        self.paths: Dict[str, str] = {}
+        self.elapsed = 0.0
+        self._start = None
+
+    def track_allocations(self, phase: str):
+        """Context manager untuk fase yang alokasinya dilacak (dipanggil oleh AMGRScraper)"""
+        if self.allocations is None:
+            return nullcontext()
+        return self.allocations.track(phase)
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Bungkus tugas yang dijalankan di thread worker milik sesi (misalnya executor
+        search_many): profiler thread itu aktif hanya selama tugas berjalan dan dimatikan
+        di thread yang sama, sehingga stats() tidak membaca profiler yang masih berjalan.
+
+        Pada Python 3.12+ (SHARED_PROFILER) profiler sesi sudah mencatat semua thread,
+        jadi func dikembalikan apa adanya.
+        """
+        if SHARED_PROFILER:
+            return func
+
+        def profiled(*args, **kwargs):
+            if threading.get_ident() == self._owner:
+                # Thread pembuka sesi sudah diprofil oleh self.profiler
+                return func(*args, **kwargs)
+            profiler = getattr(self._local, "profiler", None)
+            if profiler is None:
+                profiler = self._local.profiler = cProfile.Profile()
+                with self._profilers_lock:
+                    self._thread_profilers.append(profiler)
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+        return profiled
+
+    def __enter__(self):
+        global _active_session
+        with _active_lock:
+            if _active_session is not None:
+                raise RuntimeError("Sesi profiling lain sedang aktif; sesi tidak boleh bertumpuk")
+            _active_session = self
+        self._owner = threading.get_ident()
+        self._start = time.perf_counter()
+        self.sampler.start()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global _active_session
+        try:
+            self.profiler.disable()
+            self.sampler.stop()
+            self.elapsed = time.perf_counter() - self._start
+            self.write()
+        finally:
+            with _active_lock:
+                _active_session = None
+        return False
+
+    def stats(self, stream=None) -> pstats.Stats:
+        """Statistik cProfile gabungan semua thread"""
+        stats = pstats.Stats(self.profiler, stream=stream)
+        with self._profilers_lock:
+            profilers = list(self._thread_profilers)
+        for profiler in profilers:
+            try:
+                stats.add(profiler)
+            except TypeError:
+                # Profiler yang belum mencatat fungsi apa pun tidak punya statistik
+                pass
+        return stats
+
+    def _top_functions(self) -> str:
+        stream = io.StringIO()
+        self.stats(stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        return stream.getvalue()
+
+    def report(self) -> Dict[str, Any]:
+        """Ringkasan sesi (durasi, jumlah sampel, alokasi fase parse, path file)"""
+        return {
+            "elapsed_seconds": round(self.elapsed, 6),
+            "samples": self.sampler.samples,
+            "allocations": self.allocations.summary() if self.allocations is not None else None,
+            "files": dict(self.paths),
+        }
+
+    def write(self) -> None:
+        directory = os.path.dirname(self.output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.paths = {
+            "pstats": f"{self.output_prefix}.pstats",
+            "collapsed": f"{self.output_prefix}.collapsed",
+            "report": f"{self.output_prefix}.txt",
+        }
+        self.stats().dump_stats(self.paths["pstats"])
+        self.sampler.write_collapsed(self.paths["collapsed"])
+
+        lines: List[str] = [
+            f"Durasi: {self.elapsed:.3f} detik, {self.sampler.samples} sampel stack "
+            f"(interval {self.sampler.interval * 1000:.1f} ms)",
+            "",
+        ]
+        if self.allocations is not None:
+            summary = self.allocations.summary()
+            lines.append("Alokasi memori fase parse (tracemalloc):")
+            for phase, calls in summary["calls"].items():
+                lines.append(f"  {phase}: {calls} panggilan, puncak {summary['peak_bytes'][phase] / 1024:.1f} KiB")
+            for site in summary["top_sites"]:
+                lines.append(f"  {site['bytes'] / 1024:>10.1f} KiB  {site['site']}")
+            lines.append("")
+        lines.append(f"Fungsi teratas (cProfile, {1 + len(self._thread_profilers)} thread):")
+        lines.append(self._top_functions())
+        with open(self.paths["report"], "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Lock file antar proses hanya tersedia di POSIX
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Status yang menandakan server meminta klien memperlambat
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Ubah header Retry-After (detik atau HTTP-date) menjadi jumlah detik menunggu"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket yang membatasi jumlah request per detik ke satu situs.
+
+    Aman dipakai banyak thread (acquire) dan task asyncio (acquire_async). Jika diberi
+    state_path, status bucket disimpan di file dengan flock sehingga beberapa proses
+    berbagi kuota yang sama. Laju turun setengah setiap kali server membalas 429/503
+    (dan berhenti total selama Retry-After), lalu naik perlahan lagi setelah request sukses.
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 4,
+        min_rate: float = 0.1,
+        recovery: float = 0.05,
+        state_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            rate: Laju maksimum (request per detik)
+            burst: Jumlah token maksimum yang boleh menumpuk
+            min_rate: Laju terendah saat server sering membalas 429/503
+            recovery: Kenaikan laju (request per detik) setiap request sukses
+            state_path: File status bersama untuk koordinasi antar proses (POSIX)
+        """
+        if state_path and not FCNTL_AVAILABLE:
+            raise RuntimeError("Rate limiter antar proses membutuhkan fcntl (hanya tersedia di POSIX)")
+
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._state = {"tokens": float(burst), "updated": time.time(), "rate": rate, "blocked_until": 0.0}
+
+    def _locked_state(self, update):
+        """Jalankan update(state, now) di bawah lock thread (dan lock file jika ada)"""
+        with self._lock:
+            if not self.state_path:
+                return update(self._state, time.time())
+
+            fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.read(fd, 4096)
+                try:
+                    state = json.loads(raw) if raw else dict(self._state)
+                except ValueError:
+                    state = dict(self._state)
+                result = update(state, time.time())
+                payload = json.dumps(state).encode("utf-8")
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, payload)
+                return result
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    async def _locked_state_async(self, update):
+        """
+        Versi asyncio dari _locked_state(): dengan state_path, flock bisa menunggu proses
+        lain sehingga dijalankan di thread pool agar event loop tidak terblokir
+        """
+        if not self.state_path:
+            return self._locked_state(update)
+        return await asyncio.get_running_loop().run_in_executor(None, self._locked_state, update)
+
+    def _take(self, state, now) -> float:
+        """Ambil satu token; kembalikan 0 jika berhasil atau lama menunggu sebelum mencoba lagi"""
+        if now < state["blocked_until"]:
+            return state["blocked_until"] - now
+
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * state["rate"])
+        state["updated"] = now
+
+        if state["tokens"] >= 1.0:
+            state["tokens"] -= 1.0
+            return 0.0
+        return (1.0 - state["tokens"]) / state["rate"]
+
+    def acquire(self) -> None:
+        """Tunggu (blocking) sampai satu request boleh dikirim"""
+        while True:
+            wait = self._locked_state(self._take)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Versi asyncio dari acquire(), menunggu tanpa memblokir event loop"""
+        while True:
+            wait = await self._locked_state_async(self._take)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def _feedback_update(self, status_code: int, retry_after: Optional[str]):
+        delay = parse_retry_after(retry_after)
+
+        def update(state, now):
+            if status_code in THROTTLE_STATUSES:
+                state["rate"] = max(self.min_rate, state["rate"] / 2)
+                state["tokens"] = min(state["tokens"], 0.0)
+                if delay:
+                    state["blocked_until"] = max(state["blocked_until"], now + delay)
+            elif status_code < 400:
+                state["rate"] = min(self.max_rate, state["rate"] + self.recovery)
+
+        return update
+
+    def feedback(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """
+        Sesuaikan laju berdasarkan response server
+
+        Args:
+            status_code: Status HTTP response
+            retry_after: Nilai header Retry-After jika ada
+        """
+        self._locked_state(self._feedback_update(status_code, retry_after))
+
+    async def feedback_async(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Versi asyncio dari feedback()"""
+        await self._locked_state_async(self._feedback_update(status_code, retry_after))
+
+    @property
+    def current_rate(self) -> float:
+        """Laju saat ini (request per detik) setelah penyesuaian adaptif"""
+        return self._locked_state(lambda state, now: state["rate"])
@@ -0,0 +1,67 @@
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Format kolom Farm: "<nama farm> - <kode farm>", contoh "Anderson Boer Goat Acres - SBA1"
+FARM_CODE_PATTERN = re.compile(r"^(?P<name>.*?)\s+-\s+(?P<code>[A-Za-z0-9]+)$")
+
+
+class BreederRecord(NamedTuple):
+    """Satu baris hasil pencarian dalam bentuk tuple bernama yang ringkas"""
+    state: str
+    name: str
+    farm: str
+    phone: str
+    website: str
+    action: str
+    farm_name: Optional[str]
+    farm_code: Optional[str]
+
+
+def _collapse(value: str) -> str:
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def split_farm(farm: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Pisahkan nama dan kode farm
+
+    Returns:
+        Tuple (farm_name, farm_code); (None, None) jika farm kosong atau "-"
+    """
+    farm = _collapse(farm)
+    if not farm or farm == "-":
+        return None, None
+    match = FARM_CODE_PATTERN.match(farm)
+    if match:
+        return match.group("name") or None, match.group("code")
+    return farm, None
+
+
+def record_factory(header: List[str]) -> Callable[[List[str]], BreederRecord]:
+    """
+    Buat fungsi konversi baris -> BreederRecord untuk header tertentu.
+    Indeks kolom dihitung sekali sehingga konversi per baris murah.
+    """
+    positions = {column.strip().lower(): i for i, column in enumerate(header)}
+    fields = ("state", "name", "farm", "phone", "website", "action")
+    indexes = [positions.get(field) for field in fields]
+
+    def make_record(row: List[str]) -> BreederRecord:
+        values = [row[i] if i is not None and i < len(row) else "" for i in indexes]
+        return BreederRecord(*values, *split_farm(values[2]))
+
+    return make_record
+
+
+def iter_records(results: Dict[str, Any]) -> Iterator[BreederRecord]:
+    """Ubah hasil {"header": [...], "data": [...]} menjadi BreederRecord satu per satu"""
+    make_record = record_factory(results.get("header", []))
+    for row in results.get("data", []):
+        yield make_record(row)
+
+
+def iter_stream_records(header: List[str], rows: Iterable[List[str]]) -> Iterator[BreederRecord]:
+    """Ubah baris dari sumber streaming menjadi BreederRecord"""
+    make_record = record_factory(header)
+    for row in rows:
+        yield make_record(row)
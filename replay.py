@@ -0,0 +1,179 @@
+"""
+Transport rekam/putar ulang untuk AMGRScraper dan NLPProcessor.
+
+Mode "record" meneruskan request ke jaringan dan menyimpan setiap response ke folder
+fixture; mode "replay" hanya melayani dari folder itu (tanpa jaringan), sehingga
+pengujian dan benchmark bisa diulang dengan hasil yang sama. Mode "auto" memutar
+ulang jika fixture ada dan merekam jika belum.
+
+Setiap fixture terdiri dari <key>.json (metode, URL, status, header) dan <key>.body
+(isi response apa adanya, misalnya HTML yang bisa dibuka langsung).
+"""
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from transport import HTTPTransport
+
+MODES = ("record", "replay", "auto")
+
+# Header response yang disimpan; header lain (cookie, tanggal) tidak relevan saat replay
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+class FixtureNotFound(requests.exceptions.RequestException):
+    """Tidak ada fixture untuk request ini pada mode replay"""
+
+
+def request_key(method: str, url: str, params=None, data=None, json_body=None, match_body: bool = True) -> str:
+    """
+    Key fixture untuk satu request
+
+    Header (misalnya Authorization atau If-None-Match) tidak ikut dihitung. Dengan
+    match_body=False, semua request dengan metode dan URL yang sama memakai satu fixture.
+    """
+    parts = [method.upper(), url]
+    if params:
+        parts.append(urlencode(sorted(dict(params).items())))
+    if match_body:
+        if isinstance(data, dict):
+            parts.append(urlencode(sorted(data.items())))
+        elif data is not None:
+            parts.append(data.decode("utf-8") if isinstance(data, bytes) else str(data))
+        if json_body is not None:
+            parts.append(json.dumps(json_body, sort_keys=True, ensure_ascii=False))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+class FixtureStore:
+    """Folder berisi pasangan file <key>.json dan <key>.body"""
+
+    def __init__(self, directory: str, match_body: bool = True):
+        """
+        Args:
+            directory: Folder fixture (dibuat saat merekam)
+            match_body: Bedakan fixture berdasarkan isi form/JSON request
+        """
+        self.directory = directory
+        self.match_body = match_body
+        self._lock = threading.Lock()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def key(self, method: str, url: str, **kwargs) -> str:
+        return request_key(method, url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"),
+                           match_body=self.match_body)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._paths(key)[0])
+
+    def load(self, key: str) -> Optional[requests.Response]:
+        """Response dari fixture, atau None jika belum direkam"""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.headers = CaseInsensitiveDict(meta.get("headers") or {})
+        response.url = meta["url"]
+        response.encoding = meta.get("encoding")
+        response.reason = meta.get("reason")
+        # Konten sudah lengkap di memori; iter_content() memotongnya seperti response streaming
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def save(self, key: str, method: str, url: str, response: requests.Response) -> None:
+        """Simpan response; ditulis ke file sementara lalu diganti agar pembaca tidak melihat file setengah jadi"""
+        meta = {
+            "method": method.upper(),
+            "url": url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "encoding": response.encoding,
+            "headers": {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+        }
+        meta_path, body_path = self._paths(key)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            for path, mode, content in ((body_path, "wb", response.content),
+                                        (meta_path, "w", json.dumps(meta, indent=2, ensure_ascii=False))):
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+
+    def put(self, method: str, url: str, body: bytes, status: int = 200,
+            headers: Optional[Dict[str, str]] = None, **request) -> str:
+        """Tambahkan fixture secara manual, misalnya dari file capture debug/"""
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers or {"Content-Type": "text/html; charset=utf-8"})
+        response._content = body
+        response.encoding = "utf-8"
+        key = self.key(method, url, **request)
+        self.save(key, method, url, response)
+        return key
+
+
+class ReplaySession(requests.Session):
+    """requests.Session yang merekam atau memutar ulang response dari FixtureStore"""
+
+    def __init__(self, store: FixtureStore, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"Mode fixture tidak dikenal: {mode} (pilih {', '.join(MODES)})")
+        super().__init__()
+        self.store = store
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+
+    def request(self, method, url, **kwargs) -> Any:
+        key = self.store.key(method, url, **kwargs)
+        if self.mode != "record":
+            response = self.store.load(key)
+            if response is not None:
+                self.replayed += 1
+                return response
+            if self.mode == "replay":
+                raise FixtureNotFound(f"Fixture untuk {method.upper()} {url} tidak ditemukan di {self.store.directory}")
+
+        response = super().request(method, url, **kwargs)
+        if kwargs.get("stream"):
+            # Konten dibaca penuh agar bisa disimpan; iter_content() tetap berfungsi
+            response.content
+        self.store.save(key, method, url, response)
+        self.recorded += 1
+        return response
+
+
+class ReplayTransport(HTTPTransport):
+    """HTTPTransport (timeout, retry, metrik) dengan session rekam/putar ulang"""
+
+    def __init__(self, store: FixtureStore, mode: str = "replay", **kwargs):
+        """
+        Args:
+            store: FixtureStore tempat fixture disimpan
+            mode: "record", "replay", atau "auto"
+            **kwargs: Diteruskan ke HTTPTransport
+        """
+        super().__init__(**kwargs)
+        session = ReplaySession(store, mode)
+        # Pakai adapter dengan ukuran pool yang sama untuk request yang diteruskan ke jaringan
+        for prefix, adapter in self.session.adapters.items():
+            session.mount(prefix, adapter)
+        self.session = session
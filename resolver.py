@@ -0,0 +1,251 @@
+"""
+Resolver nama state/member/breed ke nilai opsi form AMGR.
+
+Index dibangun sekali per katalog opsi: key yang sudah di-casefold, alias (singkatan
+state seperti "KS" dan kode breed seperti "AB"), serta index trigram untuk mencari
+kandidat. Alias pendek hanya cocok jika query persis sama termasuk huruf kapitalnya
+(aturan yang sama dengan RuleExtractor), agar kata biasa seperti "in" atau "or" tidak
+menjadi Indiana atau Oregon. Kandidat diberi skor dari kecocokan token (termasuk edit distance) dan
+kemiripan trigram, lalu yang terbaik dikembalikan bersama skornya.
+"""
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Singkatan dua huruf USPS untuk state yang ada di form AMGR
+STATE_ABBREVIATIONS = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "PR": "Puerto Rico", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont",
+    "VA": "Virginia", "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "Washington DC": "District of Columbia",
+}
+
+# Format opsi breed: "(AB) - American Boer"
+BREED_CODE_PATTERN = re.compile(r"^\((?P<code>[A-Za-z0-9]+)\)\s*-\s*(?P<name>.+)$")
+
+# Skor minimum agar hasil fuzzy dianggap cocok
+DEFAULT_THRESHOLD = 0.6
+
+# Jumlah kandidat dari index trigram yang diberi skor lengkap
+MAX_CANDIDATES = 16
+
+# Alias sepanjang ini atau kurang hanya cocok persis (case-sensitive) dengan seluruh query
+SHORT_ALIAS_LENGTH = 2
+
+# Panjang minimum query yang dinilai sebagai awalan nama ("kans" -> "kansas")
+MIN_PREFIX_LENGTH = 3
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    """Casefold, buang aksen dan tanda baca, rapikan spasi"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().replace("&", " and ")
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def trigrams(text: str) -> set:
+    """Trigram dari teks yang sudah dinormalisasi, dengan padding agar awal kata ikut terhitung"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance; berhenti lebih awal dan mengembalikan limit + 1 jika melewati limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def token_similarity(query: str, token: str) -> float:
+    """Kemiripan satu token query dengan satu token opsi (1.0 = sama persis)"""
+    if query == token:
+        return 1.0
+    if len(query) >= MIN_PREFIX_LENGTH and token.startswith(query):
+        # Awalan kata ("kans" -> "kansas"), makin lengkap makin tinggi
+        return 0.8 + 0.15 * len(query) / len(token)
+    longest = max(len(query), len(token))
+    if longest < 4:
+        return 0.0
+    # Toleransi salah ketik: 1 huruf untuk kata pendek, 2 untuk kata panjang
+    limit = 1 if longest < 8 else 2
+    # Setiap edit mengubah paling banyak dua huruf pada selisih himpunan huruf
+    if len(set(query) ^ set(token)) > 2 * limit:
+        return 0.0
+    distance = edit_distance(query, token, limit)
+    if distance > limit:
+        return 0.0
+    return 0.9 - 0.1 * distance
+
+
+class Match(NamedTuple):
+    """Hasil resolusi: nama opsi asli, nilai form, dan skor 0..1"""
+    name: str
+    value: str
+    score: float
+
+
+class OptionIndex:
+    """Index untuk satu dropdown (state, member, atau breed)"""
+
+    def __init__(self, options: Dict[str, str], aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            options: Mapping nama opsi -> nilai form
+            aliases: Mapping alias -> nama opsi (misalnya "KS" -> "Kansas")
+        """
+        self._names: List[str] = []
+        self._values: List[str] = []
+        self._keys: List[str] = []
+        self._tokens: List[List[str]] = []
+        self._grams: List[set] = []
+        self._exact: Dict[str, int] = {}
+        # Alias pendek seperti ditulis aslinya ("KS", "AB"), dicocokkan case-sensitive
+        self._short_aliases: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for name, value in options.items():
+            key = normalize(name)
+            if not key:
+                continue
+            index = len(self._names)
+            self._names.append(name)
+            self._values.append(value)
+            self._keys.append(key)
+            self._tokens.append(key.split())
+            grams = trigrams(key)
+            self._grams.append(grams)
+            self._exact.setdefault(key, index)
+            for gram in grams:
+                self._postings[gram].append(index)
+
+        for alias, name in (aliases or {}).items():
+            index = self._exact.get(normalize(name))
+            if index is None:
+                continue
+            if len(alias) <= SHORT_ALIAS_LENGTH:
+                self._short_aliases.setdefault(alias, index)
+            else:
+                self._exact.setdefault(normalize(alias), index)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _match(self, index: int, score: float) -> Match:
+        return Match(self._names[index], self._values[index], round(score, 4))
+
+    def _score(self, index: int, query: str, query_tokens: List[str], query_grams: set, shared: int) -> float:
+        tokens = self._tokens[index]
+        if len(query) >= MIN_PREFIX_LENGTH and self._keys[index].startswith(query):
+            # Awalan utuh dari nama opsi
+            return 0.85 + 0.1 * len(query) / len(self._keys[index])
+
+        matched = set()
+        total = 0.0
+        for query_token in query_tokens:
+            best, best_position = 0.0, None
+            if query_token in tokens:
+                best, best_position = 1.0, tokens.index(query_token)
+            else:
+                for position, token in enumerate(tokens):
+                    similarity = token_similarity(query_token, token)
+                    if similarity > best:
+                        best, best_position = similarity, position
+            total += best
+            if best_position is not None:
+                matched.add(best_position)
+        token_score = total / len(query_tokens)
+        coverage = len(matched) / len(tokens)
+        dice = 2 * shared / (len(query_grams) + len(self._grams[index]))
+        return 0.6 * token_score + 0.25 * dice + 0.15 * coverage
+
+    def candidates(self, query: str, limit: int = 5) -> List[Match]:
+        """Kandidat terbaik untuk query, diurutkan dari skor tertinggi"""
+        short = self._short_aliases.get(query.strip())
+        if short is not None:
+            return [self._match(short, 1.0)]
+        key = normalize(query)
+        if not key:
+            return []
+        exact = self._exact.get(key)
+        if exact is not None:
+            return [self._match(exact, 1.0)]
+
+        query_grams = trigrams(key)
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in query_grams))
+        # Hanya kandidat dengan trigram bersama terbanyak yang dihitung skornya
+        ranked = shared.most_common(MAX_CANDIDATES)
+
+        query_tokens = key.split()
+        scored = [
+            (self._score(index, key, query_tokens, query_grams, count), index)
+            for index, count in ranked
+        ]
+        # Skor sama: pilih nama terpendek, lalu urutan asli di dropdown
+        scored.sort(key=lambda item: (-item[0], len(self._keys[item[1]]), item[1]))
+        return [self._match(index, score) for score, index in scored[:limit]]
+
+    def resolve(self, query: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[Match]:
+        """Opsi terbaik untuk query, atau None jika skornya di bawah threshold"""
+        best = self.candidates(query, limit=1)
+        if best and best[0].score >= threshold:
+            return best[0]
+        return None
+
+
+def breed_aliases(breeds: Iterable[str]) -> Dict[str, str]:
+    """Alias kode dan nama breed tanpa kode, misalnya "AB" dan "American Boer" -> "(AB) - American Boer" """
+    aliases = {}
+    for name in breeds:
+        match = BREED_CODE_PATTERN.match(name)
+        if match:
+            aliases[match.group("code")] = name
+            aliases[match.group("name")] = name
+    return aliases
+
+
+class CatalogResolver:
+    """Index untuk ketiga dropdown dari satu entry katalog opsi"""
+
+    def __init__(self, catalog: Dict):
+        self.states = OptionIndex(catalog.get("states") or {}, STATE_ABBREVIATIONS)
+        self.members = OptionIndex(catalog.get("members") or {})
+        breeds = catalog.get("breeds") or {}
+        self.breeds = OptionIndex(breeds, breed_aliases(breeds))
+
+
+class ResolverCache:
+    """Simpan satu CatalogResolver per entry katalog; dibangun ulang hanya jika entry berganti"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._resolver = None
+
+    def get(self, catalog: Dict) -> CatalogResolver:
+        with self._lock:
+            if self._catalog is not catalog:
+                self._resolver = CatalogResolver(catalog)
+                self._catalog = catalog
+            return self._resolver
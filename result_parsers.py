@@ -0,0 +1,297 @@
+"""
+Backend parser cepat untuk halaman hasil pencarian AMGR.
+
+Setiap backend langsung menuju tabel hasil (table#example) dan menghasilkan
+{"header": [...], "data": [...]} yang identik dengan parser heuristik
+BeautifulSoup di AMGRScraper. Jika struktur tabel tidak sesuai yang diharapkan,
+backend mengembalikan None sehingga pemanggil kembali ke parser heuristik.
+"""
+import codecs
+from collections import deque
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Backend berbasis C bersifat opsional
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    # selectolax < 0.3.13 belum punya backend lexbor
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+RESULT_TABLE_ID = "example"
+
+
+def _build_results(headers: List[str], rows: List[List[str]]) -> Dict[str, Any]:
+    """Terapkan aturan baris yang sama dengan parser heuristik"""
+    data = []
+    for row_data in rows:
+        # Hanya tambahkan jika row data tidak kosong
+        if row_data and any(cell for cell in row_data):
+            # Jika kolom pertama adalah Action dan nilainya kosong, isi dengan "navigate_pagination"
+            if headers and headers[0] == "Action" and not row_data[0]:
+                row_data[0] = "navigate_pagination"
+            data.append(row_data)
+
+    return {
+        "header": headers,
+        "data": data
+    }
+
+
+def parse_results_lxml(html_content) -> Optional[Dict[str, Any]]:
+    """Parse tabel hasil dengan lxml"""
+    document = lxml.html.fromstring(html_content)
+    tables = document.xpath(f'//table[@id="{RESULT_TABLE_ID}"]')
+    if not tables:
+        return None
+    table = tables[0]
+
+    headers = [cell.text_content().strip() for cell in table.xpath('./thead//th')]
+    bodies = table.xpath('./tbody')
+    if not headers or not bodies:
+        return None
+
+    rows = [
+        [cell.text_content().strip() for cell in row.iter('td')]
+        for row in bodies[0].iter('tr')
+    ]
+    return _build_results(headers, rows)
+
+
+def parse_results_selectolax(html_content) -> Optional[Dict[str, Any]]:
+    """Parse tabel hasil dengan selectolax (lexbor)"""
+    if isinstance(html_content, bytes):
+        html_content = html_content.decode("utf-8", errors="replace")
+
+    table = SelectolaxParser(html_content).css_first(f'table#{RESULT_TABLE_ID}')
+    if table is None:
+        return None
+
+    headers = [cell.text(deep=True).strip() for cell in table.css('thead th')]
+    body = table.css_first('tbody')
+    if not headers or body is None:
+        return None
+
+    rows = [
+        [cell.text(deep=True).strip() for cell in row.css('td')]
+        for row in body.css('tr')
+    ]
+    return _build_results(headers, rows)
+
+
+# Urutan prioritas untuk backend "auto"
+PARSER_BACKENDS: Dict[str, Callable[[Any], Optional[Dict[str, Any]]]] = {}
+if LXML_AVAILABLE:
+    PARSER_BACKENDS["lxml"] = parse_results_lxml
+if SELECTOLAX_AVAILABLE:
+    PARSER_BACKENDS["selectolax"] = parse_results_selectolax
+
+
+def get_parser_backend(name: str = "auto") -> Optional[Callable[[Any], Optional[Dict[str, Any]]]]:
+    """
+    Pilih fungsi parser cepat berdasarkan nama
+
+    Args:
+        name: "auto" (backend tercepat yang terinstal), "lxml", "selectolax", atau "bs4"
+
+    Returns:
+        Fungsi parser, atau None jika memakai parser heuristik BeautifulSoup
+    """
+    if name == "bs4":
+        return None
+    if name == "auto":
+        return next(iter(PARSER_BACKENDS.values()), None)
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Parser backend '{name}' tidak tersedia. Pilihan: auto, bs4, {', '.join(PARSER_BACKENDS) or '-'}")
+    return PARSER_BACKENDS[name]
+
+
+class StreamingResultParser(HTMLParser):
+    """
+    Tokenizer inkremental untuk table#example. Potongan HTML dimasukkan lewat feed()
+    dan setiap baris hasil tersedia begitu tag </tr>-nya tertutup, tanpa membangun DOM.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.header: List[str] = []
+        self.header_complete = False
+        self.table_complete = False
+        self._rows = deque()
+        self._table_depth = 0       # Kedalaman tabel di dalam table#example (1 = tabel hasil)
+        self._section = None        # 'thead' atau 'tbody'
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._cell_tag = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif not self.table_complete and dict(attrs).get("id") == RESULT_TABLE_ID:
+                self._table_depth = 1
+            return
+
+        if self._table_depth != 1:
+            return
+
+        if tag in ("thead", "tbody"):
+            self._section = tag
+        elif tag == "tr":
+            self._close_row()
+            self._row = []
+        elif tag in ("td", "th"):
+            self._close_cell()
+            self._cell = []
+            self._cell_tag = tag
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._table_depth:
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._close_row()
+                self.header_complete = True
+                self.table_complete = True
+            return
+
+        if self._table_depth != 1:
+            return
+
+        if tag in ("td", "th"):
+            self._close_cell()
+        elif tag == "tr":
+            self._close_row()
+        elif tag == "thead":
+            self._close_row()
+            self.header_complete = True
+            self._section = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _close_cell(self):
+        if self._cell is None:
+            return
+        text = "".join(self._cell).strip()
+        if self._section == "thead":
+            if self._cell_tag == "th":
+                self.header.append(text)
+        elif self._cell_tag == "td" and self._row is not None:
+            self._row.append(text)
+        self._cell = None
+        self._cell_tag = None
+
+    def _close_row(self):
+        self._close_cell()
+        row, self._row = self._row, None
+        if row is None or self._section != "tbody":
+            return
+        self.header_complete = True
+        # Aturan yang sama dengan parser heuristik
+        if row and any(cell for cell in row):
+            if self.header and self.header[0] == "Action" and not row[0]:
+                row[0] = "navigate_pagination"
+            self._rows.append(row)
+
+    def pop_rows(self) -> Iterator[List[str]]:
+        """Ambil baris yang sudah lengkap sejak pemanggilan terakhir"""
+        while self._rows:
+            yield self._rows.popleft()
+
+
+def _charset_from_content_type(content_type: Optional[str]) -> str:
+    for part in (content_type or "").split(";"):
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"\'')
+    return "utf-8"
+
+
+class StreamingResults:
+    """
+    Hasil pencarian yang dibaca secara streaming. Iterasi menghasilkan baris (list string)
+    begitu tersedia; atribut header terisi sebelum baris pertama di-yield.
+    Body response tidak pernah disimpan utuh, dan pembacaan berhenti setelah tabel hasil selesai.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str = "utf-8", close: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            chunks: Potongan body response (bytes)
+            encoding: Encoding body
+            close: Fungsi untuk menutup koneksi ketika streaming selesai
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._parser = StreamingResultParser()
+        self._close = close
+        self._exhausted = False
+
+    @classmethod
+    def from_response(cls, response, chunk_size: int = 8192) -> "StreamingResults":
+        """Bungkus requests.Response yang dibuat dengan stream=True"""
+        encoding = _charset_from_content_type(response.headers.get("Content-Type"))
+        return cls(response.iter_content(chunk_size=chunk_size), encoding=encoding, close=response.close)
+
+    def _read_chunk(self) -> bool:
+        """Masukkan satu potongan ke parser, False jika stream sudah habis"""
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None or self._parser.table_complete:
+            self._parser.feed(self._decoder.decode(b"", final=True))
+            self._parser.close()
+            self.close()
+            return False
+        self._parser.feed(self._decoder.decode(chunk))
+        if self._parser.table_complete:
+            # Sisa halaman setelah tabel hasil tidak perlu diunduh
+            self.close()
+        return True
+
+    @property
+    def header(self) -> List[str]:
+        """Header tabel hasil (membaca stream seperlunya sampai header lengkap)"""
+        while not self._parser.header_complete and self._read_chunk():
+            pass
+        return self._parser.header
+
+    def __iter__(self) -> Iterator[List[str]]:
+        while True:
+            yield from self._parser.pop_rows()
+            if not self._read_chunk():
+                break
+        yield from self._parser.pop_rows()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Kumpulkan seluruh baris ke format {"header": [...], "data": [...]}"""
+        data = list(self)
+        return {
+            "header": self.header,
+            "data": data
+        }
+
+    def close(self) -> None:
+        """Tutup koneksi yang mendasari stream"""
+        self._exhausted = True
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
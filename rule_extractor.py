@@ -0,0 +1,129 @@
+"""
+Ekstraksi parameter pencarian tanpa LLM.
+
+Token query dicocokkan dengan kosakata state/member/breed dari AMGRScraper.get_options()
+memakai trie per token (longest match). Jika semua token habis terjelaskan oleh
+kosakata atau kata pengisi, hasilnya dianggap pasti dan LLM tidak perlu dipanggil.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from resolver import STATE_ABBREVIATIONS, breed_aliases, normalize
+
+# Kata umum dalam perintah pencarian yang tidak membawa parameter
+FILLER_WORDS = frozenset("""
+    cari carikan mencari tampilkan tunjukkan perlihatkan lihat daftar semua seluruh tolong saya mau ingin
+    peternak peternakan breeder breeders peternaknya di dari yang dengan untuk pada bernama nama jenis ras
+    breed breeds kambing negara bagian state anggota member farm farms ranch
+    dan and find search show list all any in from of with named the a an goat goats please me
+""".split())
+
+# Penanda node terminal di trie
+_END = ""
+
+_ABBREVIATION = re.compile(r"\b[A-Z]{2}\b")
+
+FIELDS = ("state", "member", "breed")
+
+
+class PhraseTrie:
+    """Trie frasa per token; setiap frasa menyimpan daftar (field, nama opsi)"""
+
+    def __init__(self):
+        self._root: Dict = {}
+        self.max_length = 0
+
+    def add(self, phrase: str, field: str, name: str) -> None:
+        tokens = phrase.split()
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        targets = node.setdefault(_END, [])
+        if (field, name) not in targets:
+            targets.append((field, name))
+        self.max_length = max(self.max_length, len(tokens))
+
+    def longest_match(self, tokens: List[str], start: int) -> Tuple[int, Optional[List[Tuple[str, str]]]]:
+        """Frasa terpanjang yang dimulai di tokens[start]; kembalikan (jumlah token, target)"""
+        node = self._root
+        length, targets = 0, None
+        for i in range(start, min(len(tokens), start + self.max_length)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _END in node:
+                length, targets = i - start + 1, node[_END]
+        return length, targets
+
+
+class RuleExtractor:
+    """Ekstraktor parameter berbasis kosakata opsi situs"""
+
+    def __init__(self, options: Dict[str, Dict[str, str]]):
+        """
+        Args:
+            options: Hasil AMGRScraper.get_options() ({'states', 'members', 'breeds'})
+        """
+        self.trie = PhraseTrie()
+        states = options.get('states') or {}
+        members = options.get('members') or {}
+        breeds = options.get('breeds') or {}
+
+        for name in states:
+            self.trie.add(normalize(name), "state", name)
+        for name in members:
+            self.trie.add(normalize(name), "member", name)
+        for name in breeds:
+            self.trie.add(normalize(name), "breed", name)
+        for alias, name in breed_aliases(breeds).items():
+            # Kode breed ("AB") terlalu mudah bentrok dengan kata biasa, hanya nama breed yang dipakai
+            if len(alias) > 2:
+                self.trie.add(normalize(alias), "breed", name)
+
+        # Singkatan state hanya dikenali jika ditulis dengan huruf kapital ("KS", bukan "ks")
+        self._abbreviations = {
+            abbreviation.lower(): name
+            for abbreviation, name in STATE_ABBREVIATIONS.items()
+            if len(abbreviation) == 2 and name in states
+        }
+
+    def extract(self, query: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Ekstrak state, member, dan breed dari query
+
+        Returns:
+            Dictionary parameter jika setiap token query terjelaskan tanpa ambigu,
+            None jika query perlu dianalisis LLM
+        """
+        tokens = normalize(query).split()
+        uppercase = {match.lower() for match in _ABBREVIATION.findall(query)}
+        params: Dict[str, Optional[str]] = {field: None for field in FIELDS}
+
+        i = 0
+        while i < len(tokens):
+            length, targets = self.trie.longest_match(tokens, i)
+            if length:
+                if len(targets) > 1:
+                    # Frasa yang sama cocok dengan beberapa opsi
+                    return None
+                field, name = targets[0]
+                i += length
+            elif tokens[i] in uppercase and tokens[i] in self._abbreviations:
+                field, name = "state", self._abbreviations[tokens[i]]
+                i += 1
+            elif tokens[i] in FILLER_WORDS:
+                i += 1
+                continue
+            else:
+                # Ada kata yang tidak dikenal, misalnya nama belakang saja
+                return None
+
+            if params[field] is not None and params[field] != name:
+                return None
+            params[field] = name
+
+        if not any(params.values()):
+            return None
+        return params
@@ -0,0 +1,202 @@
+"""
+Mode layanan HTTP: satu AMGRScraper yang tetap hangat (session, katalog opsi, dan
+cache NL) melayani banyak request JSON secara bersamaan.
+
+Endpoint:
+    GET/POST /search      parameter state, member, breed
+    GET/POST /nl-search   parameter query (perintah bahasa alami)
+    GET      /health      status layanan dan metrik transport
+    GET      /metrics     metrik instrumentasi dalam format teks Prometheus
+"""
+import json
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from cache import ResponseCache
+from pipeline import QueryPipeline
+
+# Batas ukuran body request JSON
+MAX_BODY_BYTES = 64 * 1024
+
+
+class InFlightCoalescer:
+    """
+    Gabungkan pemanggilan identik yang sedang berjalan: pemanggil pertama mengerjakan,
+    pemanggil lain dengan key yang sama menunggu dan menerima hasil yang sama.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def run(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns:
+            Tuple (hasil, True jika hasil diambil dari pemanggilan lain yang sedang berjalan)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AMGRService:
+    """Logika layanan di atas QueryPipeline, terpisah dari lapisan HTTP"""
+
+    def __init__(self, scraper, processor=None, metrics=None):
+        """
+        Args:
+            scraper: AMGRScraper yang dipakai bersama oleh semua request
+            processor: NLPProcessor untuk /nl-search (None = endpoint tidak tersedia)
+            metrics: PrometheusExporter untuk /metrics (None = endpoint tidak tersedia)
+        """
+        self.scraper = scraper
+        self.metrics = metrics
+        self.pipeline = QueryPipeline(scraper, processor)
+        self.coalescer = InFlightCoalescer()
+
+    @property
+    def processor(self):
+        return self.pipeline.processor
+
+    def warm(self) -> Dict[str, Dict[str, str]]:
+        """Ambil katalog opsi sekali di awal agar request pertama tidak menunggu"""
+        options = self.scraper.get_options()
+        if self.processor is not None and self.processor.extractor is None:
+            self.processor.set_vocabulary(options)
+        return options
+
+    @staticmethod
+    def _response(result, coalesced: bool) -> Dict[str, Any]:
+        return {
+            "params": result.params,
+            "results": result.results,
+            "timings": result.timings,
+            "coalesced": coalesced,
+        }
+
+    def search(self, state=None, member=None, breed=None) -> Dict[str, Any]:
+        """Pencarian dengan parameter langsung; query yang menghasilkan form sama digabung"""
+        catalog = self.scraper._get_catalog()
+        data = self.scraper._build_form_data(catalog, state, member, breed)
+        key = "search:" + ResponseCache.make_key(self.scraper.base_url, data)
+        result, coalesced = self.coalescer.run(
+            key, lambda: self.pipeline.run(state=state, member=member, breed=breed)
+        )
+        return self._response(result, coalesced)
+
+    def nl_search(self, query: str) -> Dict[str, Any]:
+        """Pencarian dengan perintah bahasa alami; perintah yang sama setelah normalisasi digabung"""
+        if self.processor is None:
+            raise LookupError("Pencarian bahasa alami tidak tersedia (NLPProcessor belum dikonfigurasi)")
+        from nlp_processor import normalize_query
+
+        key = "nl:" + normalize_query(query)
+        result, coalesced = self.coalescer.run(key, lambda: self.pipeline.run(nl_query=query))
+        return self._response(result, coalesced)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "catalog_fresh": self.scraper.catalog.is_fresh(),
+            "nl_available": self.processor is not None,
+            "coalesced": self.coalescer.coalesced,
+            "transport": self.scraper.transport.metrics.snapshot(),
+        }
+
+
+def make_handler(service: AMGRService):
+    """Buat kelas handler HTTP yang terikat ke service"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _params(self) -> Dict[str, Any]:
+            """Parameter dari query string (GET) atau body JSON (POST)"""
+            params = {key: values[-1] for key, values in parse_qs(urlparse(self.path).query).items()}
+            if self.command == "POST":
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    raise ValueError("Body request terlalu besar")
+                if length:
+                    body = json.loads(self.rfile.read(length))
+                    if not isinstance(body, dict):
+                        raise ValueError("Body request harus berupa objek JSON")
+                    params.update(body)
+            return params
+
+        def _dispatch(self):
+            path = urlparse(self.path).path.rstrip("/")
+            try:
+                if path == "/health":
+                    self._send_json(200, service.health())
+                    return
+                if path == "/metrics" and service.metrics is not None:
+                    self._send(200, service.metrics.render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+                    return
+
+                params = self._params()
+                if path == "/search":
+                    self._send_json(200, service.search(params.get("state"), params.get("member"), params.get("breed")))
+                elif path == "/nl-search":
+                    query = params.get("query") or params.get("q")
+                    if not query or not isinstance(query, str):
+                        raise ValueError("Parameter 'query' wajib diisi")
+                    self._send_json(200, service.nl_search(query))
+                else:
+                    self._send_json(404, {"error": f"Endpoint tidak dikenal: {path}"})
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            except LookupError as e:
+                self._send_json(503, {"error": str(e)})
+            except Exception as e:
+                self._send_json(502, {"error": f"{e.__class__.__name__}: {e}"})
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+
+        def log_message(self, format, *args):
+            if service.scraper.debug:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def create_server(service: AMGRService, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Buat server HTTP multi-thread (belum berjalan; panggil serve_forever())"""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Generator direktori AMGR sintetis untuk uji skala parser, katalog opsi, dan crawler.
+
+Halaman yang dihasilkan mengikuti struktur situs asli (form filterGoats dengan dropdown
+stateID/memberID/breedID dan tabel hasil table#example dengan kolom Action berisi link
+profil), tetapi dengan jumlah opsi dan baris yang bisa diatur. Data dibangkitkan secara
+deterministik dari seed sehingga hasil benchmark bisa dibandingkan antar run.
+
+Contoh:
+    python synthetic.py --members 5000 --rows 100000 --write synthetic_pages
+    python synthetic.py --rows 1000000 --serve --port 8765
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import parse_qs
+
+from resolver import STATE_ABBREVIATIONS
+
+FIRST_NAMES = ("Alan", "Anne", "Bill", "Carla", "Dwight", "Emma", "Frank", "Grace", "Henry", "Irene",
+               "Jared", "Karen", "Lloyd", "Mary", "Nathan", "Olivia", "Paul", "Rita", "Sheila", "Tom")
+LAST_NAMES = ("Anderson", "Brooks", "Carter", "Combs", "Dawson", "Elmore", "Fisher", "Gilleo", "Harper",
+              "Jensen", "Keller", "Lawson", "Mayer", "Nolan", "Powell", "Roheim", "Simpson", "Turner")
+FARM_WORDS = ("Acres", "Ranch", "Farm", "Goats", "Genetics", "Meadows", "Hollow", "Creek", "Valley")
+# Huruf awal berbeda agar kode breed ("(AB) - American Boer") unik untuk 50 breed pertama
+BREED_WORDS = ("Boer", "Kiko", "Savanna", "Myotonic", "Red", "Dapple", "Nubian", "Alpine", "Ghost", "Cashmere")
+BREED_PREFIXES = ("American", "Heritage", "Texas", "Pygmy", "Kinder")
+
+# Bagian halaman yang tidak bergantung pada data
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>AMGR - Breeders Directory</title></head>
+<body>
+	<section>
+		<div class="container">
+			<h1>Breeders Directory</h1>
+			<form name="filterGoats" action="frm_directorySearch.cfm" method="post">
+				<div class="bg-light">
+"""
+FORM_TAIL = """					<input type="submit" class="btn btn-primary" id="submitButton" name="submitButton" value="Submit">
+				</div>
+			</form>
+"""
+TABLE_HEAD = """			<div class="card-body">
+				<table id="example" class="table table-bordered" width="100%">
+					<thead>
+						<tr class="card-header">
+						<th>Action</th>
+						<th>State</th>
+						<th>Name</th>
+						<th>Farm</th>
+						<th>Phone</th>
+						<th>Website</th>
+						</tr>
+					</thead>
+					<tbody>
+"""
+TABLE_TAIL = """					</tbody>
+				</table>
+			</div>
+"""
+PAGE_TAIL = """		</div>
+	</section>
+</body>
+</html>
+"""
+
+# Jumlah baris per potongan saat halaman hasil dibangkitkan bertahap
+ROWS_PER_CHUNK = 500
+
+
+class Breeder(NamedTuple):
+    """Satu baris tabel hasil"""
+    member_id: int
+    state_id: int
+    name: str
+    farm: str
+    phone: str
+    website: str
+    breed_ids: tuple
+
+
+class SyntheticDirectory:
+    """Direktori AMGR sintetis dengan index per state, member, dan breed untuk filter cepat"""
+
+    def __init__(self, members: int = 300, rows: int = 1000, breeds: int = 30, states: int = 53, seed: int = 0):
+        """
+        Args:
+            members: Jumlah opsi dropdown member
+            rows: Jumlah baris direktori (satu baris per peternak; member bisa punya beberapa farm)
+            breeds: Jumlah opsi dropdown breed
+            states: Jumlah opsi dropdown state (nama state asli dipakai lebih dulu)
+            seed: Seed generator acak
+        """
+        rng = random.Random(seed)
+
+        names = [name for abbreviation, name in STATE_ABBREVIATIONS.items() if len(abbreviation) == 2]
+        self.states: Dict[int, tuple] = {}
+        for i in range(states):
+            if i < len(names):
+                name = names[i]
+                abbreviation = next(code for code, state in STATE_ABBREVIATIONS.items() if state == name)
+            else:
+                name, abbreviation = f"Territory {i + 1}", f"T{i + 1}"
+            self.states[i + 1] = (name, abbreviation)
+
+        self.members: Dict[int, str] = {}
+        used = set()
+        for i in range(members):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            # Nama member unik seperti di dropdown situs asli
+            if name in used:
+                name = f"{name} {i + 1}"
+            used.add(name)
+            self.members[i + 1] = name
+
+        self.breeds: Dict[int, str] = {}
+        for i in range(breeds):
+            word = BREED_WORDS[i % len(BREED_WORDS)]
+            prefix = BREED_PREFIXES[(i // len(BREED_WORDS)) % len(BREED_PREFIXES)]
+            cycle = i // (len(BREED_WORDS) * len(BREED_PREFIXES))
+            code = f"{prefix[0]}{word[0]}{cycle or ''}"
+            self.breeds[i + 1] = f"({code}) - {prefix} {word}" + (f" {cycle}" if cycle else "")
+
+        self.rows: List[Breeder] = []
+        self._by_state: Dict[int, List[int]] = {}
+        self._by_member: Dict[int, List[int]] = {}
+        self._by_breed: Dict[int, List[int]] = {}
+        member_ids = list(self.members)
+        breed_ids = list(self.breeds)
+        for i in range(rows):
+            member_id = member_ids[i % len(member_ids)] if i < len(member_ids) else rng.choice(member_ids)
+            state_id = rng.randint(1, states)
+            last = self.members[member_id].split()[1]
+            code = "".join(rng.choice("ABCDEFGHJKLMNPRSTW") for _ in range(3))
+            farm = f"{last} {rng.choice(FARM_WORDS)} - {code}"
+            phone = f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+            website = f"www.{last.lower()}{code.lower()}.com" if rng.random() < 0.3 else ""
+            breeder_breeds = tuple(rng.sample(breed_ids, min(len(breed_ids), rng.randint(1, 3))))
+            index = len(self.rows)
+            self.rows.append(Breeder(member_id, state_id, self.members[member_id], farm, phone, website, breeder_breeds))
+            self._by_state.setdefault(state_id, []).append(index)
+            self._by_member.setdefault(member_id, []).append(index)
+            for breed_id in breeder_breeds:
+                self._by_breed.setdefault(breed_id, []).append(index)
+
+    def options(self) -> Dict[str, Dict[str, str]]:
+        """Opsi dalam format AMGRScraper.get_options()"""
+        return {
+            "states": {name: str(state_id) for state_id, (name, _) in self.states.items()},
+            "members": {name: str(member_id) for member_id, name in self.members.items()},
+            "breeds": {name: str(breed_id) for breed_id, name in self.breeds.items()},
+        }
+
+    def select(self, state_id: Optional[int] = None, member_id: Optional[int] = None,
+               breed_id: Optional[int] = None) -> List[Breeder]:
+        """Baris yang cocok dengan filter form; tanpa filter semua baris dikembalikan"""
+        selected = None
+        for field, index in ((state_id, self._by_state), (member_id, self._by_member), (breed_id, self._by_breed)):
+            if field is None:
+                continue
+            matches = set(index.get(field, ()))
+            selected = matches if selected is None else selected & matches
+        if selected is None:
+            return self.rows
+        return [self.rows[i] for i in sorted(selected)]
+
+    def _form(self, selected: Dict[str, Optional[int]]) -> Iterator[str]:
+        yield PAGE_HEAD
+        for field, label, options in (("stateID", "State", {k: v[0] for k, v in self.states.items()}),
+                                      ("memberID", "Member", self.members),
+                                      ("breedID", "Breed", self.breeds)):
+            lines = [f'\t\t\t\t\t<select name="{field}" class="form-control">\n',
+                     f'\t\t\t\t\t\t<option value="">-- Select {label} --</option>\n']
+            for value, name in options.items():
+                mark = "selected" if selected.get(field) == value else ""
+                lines.append(f'\t\t\t\t\t\t\t<option value="{value}" {mark}>{escape(name)}</option>\n')
+            lines.append("\t\t\t\t\t</select>\n")
+            yield "".join(lines)
+        yield FORM_TAIL
+
+    def _row(self, row: Breeder) -> str:
+        website = f'<a href="http://{row.website}" target="_blank">{row.website}</a>' if row.website else ""
+        return (
+            "\t\t\t\t\t\t<tr>\n"
+            f'\t\t\t\t\t\t\t<td align="center"><a href="dsp_memberProfile.cfm?memberID={row.member_id}" '
+            'title="Click to view more..."><i class="fas fa-glasses"></i></a></td>\n'
+            f"\t\t\t\t\t\t\t<td>\n\t\t\t\t\t\t\t\t{self.states[row.state_id][1]}\n\t\t\t\t\t\t\t</td>\n"
+            f"\t\t\t\t\t\t\t<td>{escape(row.name)}</td>\n"
+            f"\t\t\t\t\t\t\t<td>{escape(row.farm)}</td>\n"
+            f"\t\t\t\t\t\t\t<td nowrap>{row.phone}</td>\n"
+            f"\t\t\t\t\t\t\t<td>{website}</td>\n"
+            "\t\t\t\t\t\t</tr>\n"
+        )
+
+    def iter_main_page(self) -> Iterator[bytes]:
+        """Halaman utama (form tanpa tabel hasil) dalam potongan bytes"""
+        for part in self._form({}):
+            yield part.encode("utf-8")
+        yield PAGE_TAIL.encode("utf-8")
+
+    def iter_results_page(self, state_id: Optional[int] = None, member_id: Optional[int] = None,
+                          breed_id: Optional[int] = None) -> Iterator[bytes]:
+        """Halaman hasil pencarian dalam potongan bytes; halaman 1 juta baris tidak pernah utuh di memori"""
+        selected = {"stateID": state_id, "memberID": member_id, "breedID": breed_id}
+        for part in self._form(selected):
+            yield part.encode("utf-8")
+        yield TABLE_HEAD.encode("utf-8")
+        rows = self.select(state_id, member_id, breed_id)
+        for start in range(0, len(rows), ROWS_PER_CHUNK):
+            yield "".join(self._row(row) for row in rows[start:start + ROWS_PER_CHUNK]).encode("utf-8")
+        yield (TABLE_TAIL + PAGE_TAIL).encode("utf-8")
+
+    def main_page(self) -> bytes:
+        return b"".join(self.iter_main_page())
+
+    def results_page(self, state_id: Optional[int] = None, member_id: Optional[int] = None,
+                     breed_id: Optional[int] = None) -> bytes:
+        return b"".join(self.iter_results_page(state_id, member_id, breed_id))
+
+
+def _form_id(form: Dict[str, List[str]], field: str) -> Optional[int]:
+    value = (form.get(field) or [""])[-1]
+    return int(value) if value.isdigit() else None
+
+
+class SyntheticServer:
+    """
+    Server HTTP lokal yang melayani SyntheticDirectory seperti frm_directorySearch.cfm:
+    GET mengembalikan halaman utama, POST mengembalikan hasil sesuai form. Body dikirim
+    dengan chunked transfer encoding sehingga halaman besar langsung mengalir ke klien.
+    """
+
+    def __init__(self, directory: SyntheticDirectory, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0):
+        """
+        Args:
+            directory: Data yang dilayani
+            host, port: Alamat server (port 0 = pilih port bebas)
+            delay: Jeda sebelum setiap response (detik) untuk mensimulasikan latensi jaringan
+        """
+        outer = self
+        self.directory = directory
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_chunks(self, chunks):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Klien berhenti membaca (misalnya parser streaming selesai lebih awal)
+                    self.close_connection = True
+
+            def do_GET(self):
+                outer._count()
+                time.sleep(outer.delay)
+                self._send_chunks(outer.directory.iter_main_page())
+
+            def do_POST(self):
+                outer._count()
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+                time.sleep(outer.delay)
+                self._send_chunks(outer.directory.iter_results_page(
+                    _form_id(form, "stateID"), _form_id(form, "memberID"), _form_id(form, "breedID")))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        host, port = self.server.server_address[:2]
+        self.url = f"http://{host}:{port}/frm_directorySearch.cfm"
+
+    def _count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> "SyntheticServer":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generator direktori AMGR sintetis')
+    parser.add_argument('--members', type=int, default=300, help='Jumlah opsi member (default: 300)')
+    parser.add_argument('--breeds', type=int, default=30, help='Jumlah opsi breed (default: 30)')
+    parser.add_argument('--states', type=int, default=53, help='Jumlah opsi state (default: 53)')
+    parser.add_argument('--rows', type=int, default=1000, help='Jumlah baris direktori (default: 1000)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed generator (default: 0)')
+    parser.add_argument('--write', type=str, metavar='DIR',
+                        help='Tulis main_page.html dan response.html (semua baris) ke folder')
+    parser.add_argument('--serve', action='store_true', help='Jalankan server HTTP lokal')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='Latensi buatan per response (detik)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    directory = SyntheticDirectory(members=args.members, rows=args.rows, breeds=args.breeds,
+                                   states=args.states, seed=args.seed)
+    print(f"Direktori sintetis: {len(directory.states)} state, {len(directory.members)} member, "
+          f"{len(directory.breeds)} breed, {len(directory.rows)} baris ({time.perf_counter() - start:.2f} detik)")
+
+    if args.write:
+        os.makedirs(args.write, exist_ok=True)
+        for name, chunks in (("main_page.html", directory.iter_main_page()),
+                             ("response.html", directory.iter_results_page())):
+            path = os.path.join(args.write, name)
+            with open(path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            print(f"Ditulis: {path} ({os.path.getsize(path)} bytes)")
+
+    if args.serve:
+        server = SyntheticServer(directory, args.host, args.port, delay=args.delay)
+        print(f"Melayani {server.url} (Ctrl+C untuk berhenti)")
+        try:
+            server.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServer dihentikan.")
+        finally:
+            server.server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,30 +9,86 @@ import sys
 import time
 import json
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import os
 from mrscraper import AMGRScraper
 from nlp_processor import NLPProcessor
+import io
+import pstats
+import tempfile
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from option_catalog import OptionCatalog, CatalogStore
+from async_scraper import AsyncAMGRScraper, AIOHTTP_AVAILABLE
+from async_nlp import AsyncNLPProcessor
+from crawler import DirectoryCrawler
+from pipeline import QueryPipeline
+from server import AMGRService, create_server
+from result_parsers import PARSER_BACKENDS, StreamingResults
+from records import split_farm
+from transport import HTTPTransport
+from synthetic import SyntheticDirectory, SyntheticServer
+from instrumentation import NOOP, Instrumentation, JSONLinesExporter, PrometheusExporter
+from profiling import NO_PROFILE, SHARED_PROFILER
+from debug_capture import DebugCapture, ZSTD_AVAILABLE, read_capture
+from replay import FixtureStore, FixtureNotFound, ReplayTransport, request_key
+from rate_limiter import RateLimiter, FCNTL_AVAILABLE
+from resolver import CatalogResolver, OptionIndex
+from rule_extractor import RuleExtractor
+from cache import ResponseCache, ParsedResultCache, TieredCache, MemoryLRUBackend, SQLiteBackend, FileSystemBackend
 
 # Buat folder untuk menyimpan hasil jika belum ada
 TEST_RESULTS_DIR = "test_results"
 if not os.path.exists(TEST_RESULTS_DIR):
     os.makedirs(TEST_RESULTS_DIR)
 
+# HTML hasil capture mode debug, dipakai untuk pengujian offline
+DEBUG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug")
+
+
+def load_fixture(name):
+    """Baca file HTML capture dari folder debug"""
+    with open(os.path.join(DEBUG_DIR, name), "rb") as f:
+        return f.read()
+
+
+def fake_response(content, status_code=200, headers=None):
+    """Buat objek mirip requests.Response dari konten HTML"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.text = content.decode("utf-8")
+    response.headers = headers or {}
+    response.url = "https://www.amgr.org/frm_directorySearch.cfm"
+    return response
+
 
 class TestAMGRScraper(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up scraper instance untuk semua test"""
         print("Menginisialisasi scraper untuk pengujian...")
-        cls.scraper = AMGRScraper(debug=False)
+        # Tanpa AMGR_FIXTURES pengujian ini memakai situs amgr.org asli (butuh jaringan).
+        # AMGR_FIXTURES: folder fixture; mode default replay (tanpa jaringan),
+        # AMGR_FIXTURE_MODE=record untuk merekam dari situs asli
+        transport, nlp_transport = None, None
+        if os.environ.get("AMGR_FIXTURES"):
+            store = FixtureStore(os.environ["AMGR_FIXTURES"])
+            mode = os.environ.get("AMGR_FIXTURE_MODE", "replay")
+            transport = ReplayTransport(store, mode)
+            nlp_transport = ReplayTransport(store, mode, read_timeout=60)
+            print(f"Memakai fixture {store.directory} (mode {mode})")
+        cls.scraper = AMGRScraper(debug=False, transport=transport)
 
         # Cek apakah NLP Processor tersedia
         cls.nlp_available = False
         try:
             api_key = os.environ.get("OPENAI_API_KEY")
             if api_key:
-                cls.nlp = NLPProcessor(api_key=api_key)
+                cls.nlp = NLPProcessor(api_key=api_key, transport=nlp_transport)
                 cls.nlp_available = True
                 print("NLP Processor berhasil diinisialisasi - Pengujian NL tersedia")
             else:
@@ -167,9 +223,9 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Jalankan pencarian
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.scraper.search(state=self.sample_state)
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -232,9 +288,9 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Jalankan pencarian
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.scraper.search(member=self.sample_member)
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -311,9 +367,9 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Jalankan pencarian
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.scraper.search(breed=self.sample_breed)
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -355,9 +411,9 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Jalankan pencarian
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.scraper.search(state=iowa_state, breed=savanna_breed)
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -449,7 +505,7 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Proses query bahasa alami
-        start_time = time.time()
+        start_time = time.perf_counter()
         nl_params = self.nlp.parse_command(nl_query)
         print(f"Hasil parsing NL: {nl_params}")
 
@@ -459,7 +515,7 @@ class TestAMGRScraper(unittest.TestCase):
             member=nl_params.get("member"),
             breed=nl_params.get("breed"),
         )
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -535,7 +591,7 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Proses query bahasa alami
-        start_time = time.time()
+        start_time = time.perf_counter()
         nl_params = self.nlp.parse_command(nl_query)
         print(f"Hasil parsing NL: {nl_params}")
 
@@ -545,7 +601,7 @@ class TestAMGRScraper(unittest.TestCase):
             member=nl_params.get("member"),
             breed=nl_params.get("breed"),
         )
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -630,9 +686,9 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Ekspektasi: {expected['content']}")
 
         # Jalankan pencarian
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = self.scraper.search(state=invalid_state)
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Tampilkan hasil
         print(f"Waktu eksekusi: {execution_time:.2f} detik")
@@ -670,7 +726,7 @@ class TestAMGRScraper(unittest.TestCase):
         self.scraper.base_url = "https://nonexistent-url.example.com"
 
         # Coba lakukan pencarian
-        start_time = time.time()
+        start_time = time.perf_counter()
         error_message = None
         try:
             result = self.scraper.search()
@@ -684,7 +740,7 @@ class TestAMGRScraper(unittest.TestCase):
             # Kembalikan URL asli
             self.scraper.base_url = original_url
 
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
 
         # Validasi bahwa error telah dihandle dengan baik
         self.assertGreaterEqual(
@@ -710,6 +766,1729 @@ class TestAMGRScraper(unittest.TestCase):
         print(f"Hasil disimpan ke: {file_path}")
 
 
+class StubServer:
+    """
+    Server HTTP lokal untuk pengujian offline. handler(method, path, body) mengembalikan
+    tuple (status, headers, body) dan boleh tidur untuk mensimulasikan server lambat.
+    """
+
+    def __init__(self, handler):
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                outer.requests.append((self.command, self.path, dict(self.headers), body))
+                status, headers, content = handler(self.command, self.path, body)
+                try:
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Length", str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            do_GET = _dispatch
+            do_POST = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        self.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/frm_directorySearch.cfm"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestOptionCatalog(unittest.TestCase):
+    """Pengujian offline katalog opsi menggunakan HTML capture"""
+
+    def setUp(self):
+        self.main_page = load_fixture("main_page.html")
+        self.response_page = load_fixture("response.html")
+
+    def make_scraper(self, catalog=None):
+        scraper = AMGRScraper(debug=False, catalog=catalog)
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(self.main_page)
+        scraper.session.post.return_value = fake_response(self.response_page)
+        return scraper
+
+    def test_search_fetches_main_page_once(self):
+        """Pencarian berulang hanya mengambil halaman utama sekali"""
+        scraper = self.make_scraper()
+        scraper.search(state="Kansas")
+        scraper.search(breed="Kiko")
+
+        self.assertEqual(scraper.session.get.call_count, 1)
+        self.assertEqual(scraper.session.post.call_count, 2)
+        data = scraper.session.post.call_args.kwargs["data"]
+        self.assertEqual(data["submitButton"], "Submit")
+
+    def test_catalog_shared_between_scrapers(self):
+        """Katalog yang sama dapat dipakai beberapa scraper"""
+        catalog = OptionCatalog(ttl=None)
+        first = self.make_scraper(catalog)
+        second = self.make_scraper(catalog)
+
+        self.assertEqual(first.get_options(), second.get_options())
+        self.assertEqual(first.session.get.call_count, 1)
+        self.assertEqual(second.session.get.call_count, 0)
+
+    def test_invalidate_and_ttl(self):
+        """Katalog dimuat ulang setelah invalidasi atau TTL habis"""
+        catalog = OptionCatalog(ttl=0)
+        scraper = self.make_scraper(catalog)
+        scraper.get_options()
+        scraper.get_options()
+        self.assertEqual(scraper.session.get.call_count, 2)
+
+        catalog.ttl = None
+        scraper.get_options(refresh=True)
+        scraper.get_options()
+        self.assertEqual(scraper.session.get.call_count, 3)
+
+    def test_persistent_store_with_conditional_revalidation(self):
+        """Katalog dimuat dari disk dan divalidasi ulang dengan ETag"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "catalog.json")
+
+            # Proses pertama: unduh, parse, dan simpan ke disk
+            first = self.make_scraper(OptionCatalog(store=CatalogStore(path)))
+            first.session.get.return_value = fake_response(
+                self.main_page, headers={"ETag": '"v1"'}
+            )
+            options = first.get_options()
+            self.assertTrue(os.path.exists(path))
+
+            # Proses baru dengan katalog masih segar: tanpa request sama sekali
+            second = self.make_scraper(OptionCatalog(store=CatalogStore(path)))
+            self.assertEqual(second.get_options(), options)
+            self.assertEqual(second.session.get.call_count, 0)
+
+            # Katalog kadaluarsa: kirim If-None-Match, server membalas 304
+            third = self.make_scraper(OptionCatalog(ttl=0, store=CatalogStore(path)))
+            third.session.get.return_value = fake_response(b"", status_code=304)
+            with patch.object(third, "_build_catalog_entry") as build:
+                self.assertEqual(third.get_options(), options)
+                build.assert_not_called()
+            headers = third.session.get.call_args.kwargs["headers"]
+            self.assertEqual(headers["If-None-Match"], '"v1"')
+
+    def test_sync_and_async_refresh_are_serialized(self):
+        """Refresh dari thread dan dari task asyncio memakai lock yang sama"""
+        catalog = OptionCatalog(ttl=None)
+        calls = []
+        started = threading.Event()
+
+        def sync_loader(previous):
+            started.set()
+            time.sleep(0.2)
+            calls.append("sync")
+            return {"states": {}, "members": {}, "breeds": {}, "submit": None}
+
+        async def async_loader(previous):
+            calls.append("async")
+            return {"states": {}, "members": {}, "breeds": {}, "submit": None}
+
+        async def refresh_while_sync_loads():
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            # Event loop tetap berjalan selama menunggu lock
+            ticker = asyncio.ensure_future(asyncio.sleep(0.01))
+            entry = await catalog.aget(async_loader)
+            self.assertTrue(ticker.done())
+            return entry
+
+        thread = threading.Thread(target=catalog.get, args=(sync_loader,))
+        thread.start()
+        entry = asyncio.run(refresh_while_sync_loads())
+        thread.join()
+        self.assertEqual(calls, ["sync"])
+        self.assertIs(entry, catalog._entry)
+
+    def test_invalidate_during_async_load_does_not_block(self):
+        """invalidate() tidak menunggu load yang sedang berjalan dan hasil load itu tidak dipasang"""
+        catalog = OptionCatalog(ttl=None)
+        calls = []
+
+        async def loader(previous):
+            calls.append(previous)
+            await asyncio.sleep(0.05)
+            return {"states": {"Kansas": str(len(calls))}, "members": {}, "breeds": {}, "submit": None}
+
+        async def refresh_while_loading():
+            first = asyncio.ensure_future(catalog.aget(loader))
+            second = asyncio.ensure_future(catalog.aget(loader))
+            await asyncio.sleep(0.01)
+            catalog.invalidate()
+            # Load sebelum invalidate tidak dipasang; task yang menunggu memuat ulang
+            results = await asyncio.gather(first, second)
+            return results, await catalog.aget(loader)
+
+        outcome = []
+        thread = threading.Thread(target=lambda: outcome.append(asyncio.run(refresh_while_loading())), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "event loop terblokir oleh invalidate()")
+        (first, second), latest = outcome[0]
+        self.assertEqual(first["states"], {"Kansas": "1"})
+        self.assertEqual(second["states"], {"Kansas": "2"})
+        self.assertIs(latest, second)
+        self.assertIs(catalog._entry, second)
+        self.assertEqual(len(calls), 2)
+
+    def test_content_hash_fallback_skips_parse(self):
+        """Tanpa validator dari server, hash konten yang sama tidak di-parse ulang"""
+        scraper = self.make_scraper(OptionCatalog(ttl=0))
+        options = scraper.get_options()
+        with patch.object(scraper, "_build_catalog_entry") as build:
+            self.assertEqual(scraper.get_options(), options)
+            build.assert_not_called()
+
+
+class TestResultParsers(unittest.TestCase):
+    """Pengujian offline backend parser hasil"""
+
+    def test_backends_match_heuristic_parser(self):
+        """Setiap backend cepat menghasilkan output identik dengan parser heuristik"""
+        html_content = load_fixture("response.html")
+        expected = AMGRScraper(parser="bs4")._parse_results(html_content)
+        self.assertEqual(expected["header"], ["Action", "State", "Name", "Farm", "Phone", "Website"])
+        self.assertEqual(len(expected["data"]), 3)
+
+        for name in PARSER_BACKENDS:
+            with self.subTest(backend=name):
+                self.assertEqual(AMGRScraper(parser=name)._parse_results(html_content), expected)
+
+    def test_fallback_without_result_table(self):
+        """Tanpa table#example, parser kembali ke heuristik"""
+        html_content = b"<table><tr><th>Name</th><th>State</th></tr><tr><td>Smith</td><td>KS</td></tr></table>"
+        result = AMGRScraper()._parse_results(html_content)
+        self.assertEqual(result, {"header": ["Name", "State"], "data": [["Smith", "KS"]]})
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            AMGRScraper(parser="html5lib")
+
+    def test_streaming_parser_emits_rows_incrementally(self):
+        """Parser streaming menghasilkan output sama dan baris pertama sebelum body habis"""
+        html_content = load_fixture("response.html")
+        chunks = [html_content[i:i + 512] for i in range(0, len(html_content), 512)]
+        consumed = []
+
+        def chunk_source():
+            for chunk in chunks:
+                consumed.append(len(chunk))
+                yield chunk
+
+        closed = MagicMock()
+        results = StreamingResults(chunk_source(), close=closed)
+        self.assertEqual(results.header, ["Action", "State", "Name", "Farm", "Phone", "Website"])
+
+        rows = iter(results)
+        first_row = next(rows)
+        self.assertLess(len(consumed), len(chunks))
+        data = [first_row] + list(rows)
+
+        expected = AMGRScraper(parser="bs4")._parse_results(html_content)
+        self.assertEqual(data, expected["data"])
+        # Pembacaan berhenti setelah </table>, sisa halaman tidak diunduh
+        self.assertLess(len(consumed), len(chunks))
+        closed.assert_called_once()
+
+    def test_search_stream_mode(self):
+        """search(stream=True) mengirim request streaming dan mengembalikan baris"""
+        scraper = AMGRScraper()
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        response = fake_response(load_fixture("response.html"), headers={"Content-Type": "text/html; charset=utf-8"})
+        response.iter_content.return_value = iter([load_fixture("response.html")])
+        scraper.session.post.return_value = response
+
+        with scraper.search(state="Kansas", stream=True) as results:
+            self.assertEqual(results.to_dict(), AMGRScraper()._parse_results(load_fixture("response.html")))
+        self.assertTrue(scraper.session.post.call_args.kwargs["stream"])
+
+    def test_iter_results_yields_records(self):
+        """iter_results menghasilkan BreederRecord dengan kode farm terpisah"""
+        scraper = AMGRScraper()
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        response = fake_response(load_fixture("response.html"))
+        response.iter_content.return_value = iter([load_fixture("response.html")])
+        scraper.session.post.return_value = response
+
+        records = list(scraper.iter_results(state="Kansas"))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2].name, "Sheila Anderson")
+        self.assertEqual(records[2].state, "KS")
+        self.assertEqual(records[2].action, "navigate_pagination")
+        self.assertEqual((records[2].farm_name, records[2].farm_code), ("Anderson Boer Goat Acres", "SBA1"))
+        self.assertEqual(records[0].farm_name, "3TAC Ranch Genetics")
+
+        self.assertEqual(split_farm("-"), (None, None))
+        self.assertEqual(split_farm("Lone Oak Farm"), ("Lone Oak Farm", None))
+
+
+class TestResolver(unittest.TestCase):
+    """Pengujian resolver fuzzy nama state/member/breed"""
+
+    @classmethod
+    def setUpClass(cls):
+        catalog = AMGRScraper()._build_catalog_entry(load_fixture("main_page.html"))
+        cls.resolver = CatalogResolver(catalog)
+
+    def test_states(self):
+        cases = {
+            "KS": "Kansas",
+            "kansas": "Kansas",  # bukan Arkansas walaupun substring
+            "kans": "Kansas",
+            "Arkan": "Arkansas",
+            "NY": "New York",
+            "Pensylvania": "Pennsylvania",
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(self.resolver.states.resolve(query).name, expected)
+        self.assertEqual(self.resolver.states.resolve("KS").score, 1.0)
+        self.assertIsNone(self.resolver.states.resolve("zzzz"))
+        # Singkatan hanya dikenali dengan huruf kapital, kata biasa tidak menjadi state
+        for query in ("in", "or", "me", "ny", "Ks"):
+            with self.subTest(query=query):
+                self.assertIsNone(self.resolver.states.resolve(query))
+
+    def test_breeds_and_members(self):
+        self.assertEqual(self.resolver.breeds.resolve("boer").name, "(B) - Boer")
+        self.assertEqual(self.resolver.breeds.resolve("AB").name, "(AB) - American Boer")
+        # Huruf kecil bukan alias kode, hanya kecocokan fuzzy dengan nama opsi
+        self.assertLess(self.resolver.breeds.resolve("ab").score, 1.0)
+        self.assertEqual(self.resolver.breeds.resolve("Amercan Red").name, "(AR) - American Red")
+        self.assertEqual(self.resolver.members.resolve("Dayn & Sharon Pullen").name, "Dayn and Sharon Pullen")
+        self.assertEqual(self.resolver.members.resolve("Cody Crum").name, "Cody or Austin Crum")
+
+    def test_large_catalog_is_fast(self):
+        """Ribuan member tetap di-resolve cepat (batas longgar agar tidak flaky di mesin lambat)"""
+        options = {f"Member{i} Farm{i % 97} Ranch": str(i) for i in range(5000)}
+        index = OptionIndex(options)
+        queries = [f"member{i} farm{i % 97}" for i in range(0, 5000, 50)]
+        start = time.perf_counter()
+        for query in queries:
+            index.resolve(query)
+        per_query = (time.perf_counter() - start) / len(queries)
+        self.assertEqual(index.resolve("member1234 farm70").value, "1234")
+        self.assertLess(per_query, 0.005)
+
+    def test_search_uses_best_match(self):
+        scraper = AMGRScraper()
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        catalog = scraper._get_catalog()
+        self.assertEqual(scraper._build_form_data(catalog, state="kansas")["stateID"], "18")
+        # Index hanya dibangun sekali untuk entry katalog yang sama
+        self.assertIs(scraper._resolvers.get(catalog), scraper._resolvers.get(catalog))
+
+
+class TestHTTPTransport(unittest.TestCase):
+    """Pengujian timeout dan retry transport terhadap server lokal"""
+
+    def test_retries_5xx_then_succeeds(self):
+        """Status 503 diulang dengan backoff sampai server pulih"""
+        main_page = load_fixture("main_page.html")
+        response_page = load_fixture("response.html")
+        failures = {"left": 2}
+
+        def handler(method, path, body):
+            if method == "POST" and failures["left"]:
+                failures["left"] -= 1
+                return 503, {}, b"busy"
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, main_page if method == "GET" else response_page
+
+        with StubServer(handler) as server:
+            transport = HTTPTransport(backoff_factor=0.01, max_retries=3)
+            scraper = AMGRScraper(transport=transport)
+            scraper.base_url = server.url
+            result = scraper.search(state="Kansas")
+
+        self.assertEqual(len(result["data"]), 3)
+        metrics = transport.metrics.snapshot()
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["errors"], 0)
+        self.assertEqual(metrics["requests"], 4)
+        self.assertGreater(metrics["latency_ms"]["max"], 0)
+
+    def test_read_timeout_is_retried_then_raised(self):
+        """Server yang macet tidak menggantung worker selamanya"""
+        def handler(method, path, body):
+            time.sleep(0.5)
+            return 200, {}, b"late"
+
+        with StubServer(handler) as server:
+            transport = HTTPTransport(read_timeout=0.1, max_retries=1, backoff_factor=0.01)
+            start = time.perf_counter()
+            with self.assertRaises(requests.exceptions.Timeout):
+                transport.get(server.url)
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(len(server.requests), 2)
+        snapshot = transport.metrics.snapshot()
+        self.assertEqual((snapshot["retries"], snapshot["errors"]), (1, 1))
+
+    def test_pool_size_follows_concurrency(self):
+        """Ukuran connection pool mengikuti batas konkurensi per host"""
+        scraper = AMGRScraper(max_per_host=12)
+        adapter = scraper.session.get_adapter("https://www.amgr.org/")
+        self.assertEqual(adapter._pool_maxsize, 12)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Pengujian token bucket yang dibagikan antar worker"""
+
+    def test_rate_shared_across_threads(self):
+        """Beberapa thread berbagi kuota request yang sama"""
+        limiter = RateLimiter(rate=40, burst=1)
+        start = time.perf_counter()
+        workers = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(3)]) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        # 9 request dengan 1 token awal membutuhkan minimal 8 / 40 detik
+        self.assertGreaterEqual(time.perf_counter() - start, 0.18)
+
+    def test_throttle_response_slows_down(self):
+        """429 dengan Retry-After menurunkan laju dan menahan request berikutnya"""
+        limiter = RateLimiter(rate=10, burst=5)
+        limiter.feedback(429, "1")
+        self.assertEqual(limiter.current_rate, 5)
+
+        start = time.perf_counter()
+        limiter.acquire()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.9)
+
+        limiter.feedback(200)
+        self.assertGreater(limiter.current_rate, 5)
+
+    def test_transport_honors_retry_after(self):
+        """Transport mengulang 429 setelah jeda Retry-After"""
+        statuses = [429, 200]
+
+        def handler(method, path, body):
+            status = statuses.pop(0)
+            return status, {"Retry-After": "1"} if status == 429 else {}, b"ok"
+
+        with StubServer(handler) as server:
+            limiter = RateLimiter(rate=50, burst=5)
+            transport = HTTPTransport(rate_limiter=limiter, backoff_factor=0.01)
+            start = time.perf_counter()
+            response = transport.get(server.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.9)
+        self.assertEqual(transport.metrics.snapshot()["retries"], 1)
+
+    @unittest.skipUnless(FCNTL_AVAILABLE, "fcntl tidak tersedia")
+    def test_state_file_shared_between_limiters(self):
+        """Dua limiter dengan file status yang sama berbagi kuota (mensimulasikan dua proses)"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "rate.json")
+            first = RateLimiter(rate=10, burst=2, state_path=path)
+            second = RateLimiter(rate=10, burst=2, state_path=path)
+
+            first.acquire()
+            first.acquire()
+            start = time.perf_counter()
+            second.acquire()
+            self.assertGreaterEqual(time.perf_counter() - start, 0.08)
+
+    def test_async_acquire(self):
+        """acquire_async menunggu tanpa memblokir event loop"""
+        import asyncio
+
+        limiter = RateLimiter(rate=40, burst=1)
+
+        async def run():
+            start = time.perf_counter()
+            await asyncio.gather(*(limiter.acquire_async() for _ in range(5)))
+            return time.perf_counter() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.09)
+
+    @unittest.skipUnless(FCNTL_AVAILABLE, "fcntl tidak tersedia")
+    def test_async_state_file_lock_does_not_block_loop(self):
+        """Menunggu flock yang dipegang proses lain tidak memblokir event loop"""
+        import fcntl
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "rate.json")
+            limiter = RateLimiter(rate=10, burst=2, state_path=path)
+            ticks = []
+
+            async def ticker():
+                for _ in range(10):
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+
+            async def run():
+                with open(path, "a") as holder:
+                    fcntl.flock(holder, fcntl.LOCK_EX)
+                    task = asyncio.ensure_future(limiter.acquire_async())
+                    await ticker()
+                    self.assertFalse(task.done())
+                    fcntl.flock(holder, fcntl.LOCK_UN)
+                await task
+                await limiter.feedback_async(429)
+
+            asyncio.run(run())
+            self.assertEqual(len(ticks), 10)
+            self.assertLess(limiter.current_rate, 10)
+
+
+class TestResponseCache(unittest.TestCase):
+    """Pengujian cache response POST pencarian"""
+
+    def test_search_served_from_cache(self):
+        """Query yang sama (meski ditulis berbeda) hanya dikirim sekali ke server"""
+        scraper = AMGRScraper(response_cache=ResponseCache())
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        scraper.session.post.return_value = fake_response(load_fixture("response.html"))
+
+        first = scraper.search(state="Iowa")
+        second = scraper.search(state="iowa")
+        self.assertEqual(first, second)
+        self.assertEqual(scraper.session.post.call_count, 1)
+        self.assertEqual(scraper.response_cache.stats(), {"hits": 1, "misses": 1})
+
+        scraper.search(state="Kansas")
+        self.assertEqual(scraper.session.post.call_count, 2)
+
+    def test_key_ignores_field_order(self):
+        key = ResponseCache.make_key("u", {"stateID": "17", "submitButton": "Submit"})
+        self.assertEqual(key, ResponseCache.make_key("u", {"submitButton": "Submit", "stateID": 17}))
+        self.assertNotEqual(key, ResponseCache.make_key("u", {"stateID": "18", "submitButton": "Submit"}))
+
+    def test_backends_ttl_and_eviction(self):
+        """Setiap backend menghormati TTL dan batas jumlah entry"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backends = {
+                "memory": MemoryLRUBackend(max_entries=2),
+                "sqlite": SQLiteBackend(os.path.join(tmp_dir, "cache.db"), max_entries=2),
+                "dir": FileSystemBackend(os.path.join(tmp_dir, "files"), max_entries=2),
+            }
+            for name, backend in backends.items():
+                with self.subTest(backend=name):
+                    backend.set("a", b"1")
+                    time.sleep(0.01)
+                    backend.set("b", b"2")
+                    time.sleep(0.01)
+                    backend.get("a")
+                    time.sleep(0.01)
+                    backend.set("c", b"3")
+                    # "b" paling lama tidak diakses sehingga dikeluarkan
+                    self.assertIsNone(backend.get("b"))
+                    self.assertEqual(backend.get("a"), b"1")
+                    self.assertEqual(backend.get("c"), b"3")
+
+                    backend.set("short", b"x", ttl=0)
+                    self.assertIsNone(backend.get("short"))
+            backends["sqlite"].close()
+
+    def test_filesystem_backend_tracks_size_without_scanning(self):
+        """set() tidak memindai folder kecuali batas terlampaui"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            FileSystemBackend(tmp_dir).set("existing", b"x" * 10)
+            backend = FileSystemBackend(tmp_dir, max_entries=5)
+            self.assertEqual((backend._count, backend._bytes), (1, 18))
+
+            with patch("cache.os.scandir", wraps=os.scandir) as scandir:
+                for i in range(4):
+                    backend.set(str(i), b"y" * 10)
+                backend.set("0", b"z" * 20)
+                self.assertEqual(scandir.call_count, 0)
+                self.assertEqual((backend._count, backend._bytes), (5, 18 * 4 + 28))
+
+                for i in range(4, 24):
+                    backend.set(str(i), b"y" * 10)
+                self.assertLessEqual(scandir.call_count, 6)
+
+            self.assertEqual(len(os.listdir(tmp_dir)), 5)
+            self.assertEqual(backend._count, 5)
+            self.assertEqual(backend.get("23"), b"y" * 10)
+            backend.delete("23")
+            self.assertEqual(backend._count, 4)
+
+    def test_parsed_results_skip_parsing(self):
+        """HTML identik tidak di-parse ulang, termasuk oleh proses lain lewat tier disk"""
+        html = load_fixture("response.html")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            scraper = AMGRScraper(result_cache=ParsedResultCache(directory=tmp_dir))
+            expected = scraper._parse_results(html)
+
+            with patch.object(scraper, "_parse_html") as parse_html:
+                self.assertEqual(scraper._parse_results(html), expected)
+                parse_html.assert_not_called()
+
+            # Cache baru dengan folder yang sama, tier memori masih kosong
+            other = AMGRScraper(result_cache=ParsedResultCache(directory=tmp_dir))
+            with patch.object(other, "_parse_html") as parse_html:
+                self.assertEqual(other._parse_results(html), expected)
+                parse_html.assert_not_called()
+            self.assertEqual(other.result_cache.stats()["disk_hits"], 1)
+            self.assertEqual(other.result_cache.stats()["misses"], 0)
+
+
+class TestNLPCache(unittest.TestCase):
+    """Pengujian cache hasil parse_command"""
+
+    def chat_response(self, params):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"choices": [{"message": {"content": json.dumps(params)}}]}
+        return response
+
+    def test_repeated_queries_skip_api(self):
+        params = {"state": "Texas", "member": None, "breed": None}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "nl.db")
+            transport = HTTPTransport(max_retries=0)
+            with patch.object(transport.session, "post", return_value=self.chat_response(params)) as post:
+                processor = NLPProcessor(api_key="test", cache=TieredCache(disk=SQLiteBackend(path)),
+                                         transport=transport)
+                self.assertEqual(processor.parse_command("Cari peternak di Texas"), params)
+                self.assertEqual(processor.parse_command("  cari PETERNAK di texas? "), params)
+                self.assertEqual(post.call_count, 1)
+                self.assertEqual(processor.get_api_usage()["cache"]["memory_hits"], 1)
+
+                # Proses lain dengan file cache yang sama memakai tier disk
+                other = NLPProcessor(api_key="test", cache=TieredCache(disk=SQLiteBackend(path)),
+                                     transport=transport)
+                self.assertEqual(other.parse_command("Cari peternak di Texas"), params)
+                self.assertEqual(post.call_count, 1)
+                self.assertEqual(other.cache.stats()["disk_hits"], 1)
+
+                # Model berbeda tidak memakai entry yang sama
+                other.model = "other-model"
+                other.parse_command("Cari peternak di Texas")
+                self.assertEqual(post.call_count, 2)
+
+    def test_cache_keyed_and_revalidated_by_vocabulary(self):
+        vocabulary = AMGRScraper()._build_catalog_entry(load_fixture("main_page.html"))
+        params = {"state": "Texas", "member": "Jared Combs", "breed": None}
+        cache = TieredCache(MemoryLRUBackend())
+        transport = HTTPTransport(max_retries=0)
+        with patch.object(transport.session, "post", return_value=self.chat_response(params)) as post:
+            first = NLPProcessor(api_key="test", cache=cache, vocabulary=vocabulary, transport=transport)
+            self.assertEqual(first.parse_command("peternak milik combs di lone star state"), params)
+
+            # Kosakata lain (misalnya opsi situs berubah) tidak memakai entry yang sama
+            changed = dict(vocabulary, members=dict(vocabulary["members"], **{"New Member": "9999"}))
+            second = NLPProcessor(api_key="test", cache=cache, vocabulary=changed, transport=transport)
+            self.assertNotEqual(second._cache_key("x"), first._cache_key("x"))
+            second.parse_command("peternak milik combs di lone star state")
+            self.assertEqual(post.call_count, 2)
+
+        # Entry cache dengan nilai yang tidak valid untuk kosakata sekarang dianggap miss
+        first.cache.set(first._cache_key("peternak di atlantis"), json.dumps(
+            {"state": "Atlantis", "member": None, "breed": None}).encode("utf-8"))
+        self.assertIsNone(first._local_result("peternak di atlantis"))
+        first.cache.set(first._cache_key("peternak di kansas?"), json.dumps(
+            {"state": "kansas", "member": None, "breed": None}).encode("utf-8"))
+        self.assertEqual(first._local_result("peternak di kansas?")["state"], "Kansas")
+
+    def test_errors_are_not_cached(self):
+        processor = NLPProcessor(api_key="test", transport=HTTPTransport(max_retries=0))
+        with patch.object(processor.transport.session, "post",
+                          side_effect=requests.exceptions.ConnectionError("down")) as post:
+            processor.parse_command("Cari peternak di Texas")
+            processor.parse_command("Cari peternak di Texas")
+        self.assertEqual(post.call_count, 2)
+
+
+class TestBatchParsing(unittest.TestCase):
+    """Pengujian parse_commands(): banyak query dalam satu request API"""
+
+    ANSWERS = {
+        "elmore di kansas": {"state": "Kansas", "member": "Dwight Elmore", "breed": None},
+        "carter": {"state": None, "member": "Bill Carter", "breed": None},
+        "combs in texas": {"state": "Texas", "member": "Jared Combs", "breed": None},
+    }
+
+    def fake_api(self, truncate_batches=False, drop=()):
+        """Session.post palsu yang menjawab sesuai ANSWERS dan mencatat isi setiap batch"""
+        self.batches = []
+
+        def post(url, **kwargs):
+            payload = kwargs["json"]
+            messages = payload["messages"]
+            response = MagicMock(status_code=200)
+            if payload["response_format"]["json_schema"]["name"] != "batch_commands":
+                # Request satu query (parse_command)
+                content = self.ANSWERS[messages[1]["content"].casefold()]
+                response.json.return_value = {"choices": [{"message": {"content": json.dumps(content)}}]}
+                return response
+
+            items = json.loads(messages[1]["content"])
+            self.batches.append([item["query"] for item in items])
+            if truncate_batches and len(items) > 1:
+                response.json.return_value = {"choices": [{"message": {"content": "{"}, "finish_reason": "length"}]}
+                return response
+            results = [dict(self.ANSWERS[item["query"].casefold()], id=item["id"])
+                       for item in items if item["query"] not in drop]
+            response.json.return_value = {"choices": [{
+                "message": {"content": json.dumps({"results": results})},
+                "finish_reason": "stop",
+            }]}
+            return response
+        return post
+
+    def make_processor(self, **kwargs):
+        vocabulary = AMGRScraper()._build_catalog_entry(load_fixture("main_page.html"))
+        return NLPProcessor(api_key="test", vocabulary=vocabulary,
+                            transport=HTTPTransport(max_retries=0), **kwargs)
+
+    def test_results_follow_input_order(self):
+        processor = self.make_processor(max_batch_size=2)
+        queries = ["Elmore di Kansas", "Cari peternak di Iowa", "carter", "elmore di kansas", "Combs in Texas"]
+        with patch.object(processor.transport.session, "post", side_effect=self.fake_api()):
+            results = processor.parse_commands(queries)
+
+        self.assertEqual([r["member"] for r in results], ["Dwight Elmore", None, "Bill Carter", "Dwight Elmore", "Jared Combs"])
+        self.assertEqual(results[1]["state"], "Iowa")
+        # Query berbasis aturan dan duplikat tidak dikirim; tiga query unik dalam dua batch
+        self.assertEqual(self.batches, [["Elmore di Kansas", "carter"], ["Combs in Texas"]])
+
+        # Batch berikutnya dilayani dari cache
+        with patch.object(processor.transport.session, "post") as post:
+            processor.parse_commands(["CARTER"])
+        post.assert_not_called()
+
+    def test_truncated_batches_are_split(self):
+        processor = self.make_processor()
+        with patch.object(processor.transport.session, "post", side_effect=self.fake_api(truncate_batches=True)):
+            results = processor.parse_commands(["Elmore di Kansas", "carter", "Combs in Texas"])
+        self.assertEqual([r["member"] for r in results], ["Dwight Elmore", "Bill Carter", "Jared Combs"])
+        # Dibelah dua sampai setiap batch muat
+        self.assertEqual(self.batches, [
+            ["Elmore di Kansas", "carter", "Combs in Texas"],
+            ["Elmore di Kansas"],
+            ["carter", "Combs in Texas"],
+            ["carter"],
+            ["Combs in Texas"],
+        ])
+
+    def test_missing_answers_fall_back_to_single_requests(self):
+        processor = self.make_processor()
+        with patch.object(processor.transport.session, "post", side_effect=self.fake_api(drop={"carter"})) as post:
+            results = processor.parse_commands(["Elmore di Kansas", "carter"])
+        self.assertEqual(results[1]["member"], "Bill Carter")
+        self.assertEqual(post.call_count, 2)
+
+
+class MockChatServer(StubServer):
+    """
+    Server chat completions palsu: menjawab {"state": <isi pesan user>} setelah delay,
+    membalas 429 untuk sejumlah request pertama, dan mencatat jumlah request bersamaan.
+    """
+
+    def __init__(self, delay=0.0, throttle=0):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttle = throttle
+        lock = threading.Lock()
+
+        def handler(method, path, body):
+            with lock:
+                if self.throttle > 0:
+                    self.throttle -= 1
+                    return 429, {"Retry-After": "0"}, b"{}"
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                time.sleep(delay)
+                query = json.loads(body)["messages"][1]["content"]
+                content = json.dumps({"state": query, "member": None, "breed": None})
+                reply = {"choices": [{"message": {"content": content}, "finish_reason": "stop"}]}
+                return 200, {"Content-Type": "application/json"}, json.dumps(reply).encode()
+            finally:
+                with lock:
+                    self.in_flight -= 1
+
+        super().__init__(handler)
+
+
+class TestNLPClients(unittest.TestCase):
+    """Pengujian client NLP sinkron terhadap server chat completions lokal"""
+
+    def test_backoff_on_429(self):
+        with MockChatServer(throttle=2) as server:
+            processor = NLPProcessor(api_key="test", transport=HTTPTransport(backoff_factor=0.01))
+            processor.api_url = server.url
+            self.assertEqual(processor.parse_command("Texas")["state"], "Texas")
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(processor.transport.metrics.retries, 2)
+        # Koneksi keep-alive dipakai ulang dengan API key di header
+        self.assertEqual(server.requests[0][2]["Authorization"], "Bearer test")
+
+    def test_hung_call_times_out(self):
+        with MockChatServer(delay=1.0) as server:
+            processor = NLPProcessor(api_key="test", transport=HTTPTransport(read_timeout=0.1, max_retries=0))
+            processor.api_url = server.url
+            start = time.perf_counter()
+            result = processor.parse_command("Texas")
+        self.assertLess(time.perf_counter() - start, 0.9)
+        self.assertEqual(result, {"state": None, "member": None, "breed": None})
+
+    def test_failed_batch_is_not_retried_per_query(self):
+        """Batch yang gagal di transport tidak dipecah menjadi satu request per query"""
+        with MockChatServer(delay=1.0) as server:
+            processor = NLPProcessor(api_key="test", transport=HTTPTransport(read_timeout=0.1, max_retries=0))
+            processor.api_url = server.url
+            results = processor.parse_commands(["Texas", "Iowa", "Kansas"])
+        self.assertEqual(results, [{"state": None, "member": None, "breed": None}] * 3)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_threads_share_bounded_session(self):
+        with MockChatServer(delay=0.05) as server:
+            processor = NLPProcessor(api_key="test", max_concurrency=2)
+            processor.api_url = server.url
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                results = list(executor.map(processor.parse_command, [f"State{i}" for i in range(6)]))
+        self.assertEqual([r["state"] for r in results], [f"State{i}" for i in range(6)])
+        self.assertLessEqual(server.max_in_flight, 2)
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp tidak terinstal")
+class TestAsyncNLPProcessor(unittest.IsolatedAsyncioTestCase):
+    """Pengujian AsyncNLPProcessor terhadap server chat completions lokal"""
+
+    async def test_concurrency_is_bounded(self):
+        with MockChatServer(delay=0.05, throttle=1) as server:
+            async with AsyncNLPProcessor(api_key="test", max_concurrency=3, backoff_factor=0.01) as processor:
+                processor.api_url = server.url
+                results = await processor.parse_many([f"State{i}" for i in range(9)])
+        self.assertEqual([r["state"] for r in results], [f"State{i}" for i in range(9)])
+        self.assertLessEqual(server.max_in_flight, 3)
+        self.assertGreater(server.max_in_flight, 1)
+        metrics = processor.metrics.snapshot()
+        self.assertEqual(metrics["retries"], 1)
+        self.assertEqual(metrics["requests"], 10)
+        self.assertEqual(metrics["latency_ms"]["count"], 10)
+        self.assertEqual(metrics["errors"], 0)
+
+    async def test_shares_non_io_base_without_sync_transport(self):
+        """Bukan subclass NLPProcessor: tidak ada method sinkron yang diganti coroutine"""
+        processor = AsyncNLPProcessor(api_key="test")
+        self.assertNotIsInstance(processor, NLPProcessor)
+        self.assertFalse(hasattr(processor, "transport"))
+
+    async def test_gives_up_on_retryable_status_with_error(self):
+        with MockChatServer(throttle=5) as server:
+            async with AsyncNLPProcessor(api_key="test", max_retries=1, backoff_factor=0) as processor:
+                processor.api_url = server.url
+                result = await processor.parse_command("Texas")
+        self.assertEqual(result, {"state": None, "member": None, "breed": None})
+        metrics = processor.metrics.snapshot()
+        self.assertEqual((metrics["requests"], metrics["retries"], metrics["errors"]), (2, 1, 1))
+
+    async def test_hung_call_times_out(self):
+        with MockChatServer(delay=1.0) as server:
+            async with AsyncNLPProcessor(api_key="test", read_timeout=0.1, max_retries=0) as processor:
+                processor.api_url = server.url
+                result = await asyncio.wait_for(processor.parse_command("Texas"), timeout=0.9)
+        self.assertEqual(result, {"state": None, "member": None, "breed": None})
+        self.assertEqual(processor.metrics.snapshot()["errors"], 1)
+
+    async def test_failed_batch_is_not_retried_per_query(self):
+        with MockChatServer(delay=1.0) as server:
+            async with AsyncNLPProcessor(api_key="test", read_timeout=0.1, max_retries=0) as processor:
+                processor.api_url = server.url
+                results = await processor.parse_commands(["Texas", "Iowa", "Kansas"])
+        self.assertEqual(results, [{"state": None, "member": None, "breed": None}] * 3)
+        self.assertEqual(len(server.requests), 1)
+
+
+class TestStructuredOutput(unittest.TestCase):
+    """Pengujian validasi jawaban LLM terhadap kosakata opsi situs"""
+
+    def setUp(self):
+        vocabulary = AMGRScraper()._build_catalog_entry(load_fixture("main_page.html"))
+        self.processor = NLPProcessor(api_key="test", vocabulary=vocabulary, transport=HTTPTransport(max_retries=0))
+
+    def replies(self, *contents):
+        """Session.post palsu yang mengembalikan contents berurutan dan mencatat payload"""
+        self.payloads = []
+        contents = list(contents)
+
+        def post(url, **kwargs):
+            self.payloads.append(kwargs["json"])
+            response = MagicMock(status_code=200)
+            response.json.return_value = {"choices": [{"message": {"content": contents.pop(0)}}]}
+            return response
+        return post
+
+    def test_schema_lists_site_options(self):
+        schema = self.processor.response_format["json_schema"]["schema"]["properties"]
+        self.assertIn("Kansas", schema["state"]["anyOf"][0]["enum"])
+        self.assertIn("(AR) - American Red", schema["breed"]["anyOf"][0]["enum"])
+
+    def test_values_are_canonicalized(self):
+        reply = json.dumps({"state": "kansas", "member": "Elmore", "breed": "American Red"})
+        with patch.object(self.processor.transport.session, "post", side_effect=self.replies(reply)):
+            result = self.processor.parse_command("peternak american red milik elmore di kansas")
+        self.assertEqual(result, {"state": "Kansas", "member": "Dwight Elmore", "breed": "(AR) - American Red"})
+        self.assertEqual(len(self.payloads), 1)
+        self.assertEqual(self.payloads[0]["response_format"]["type"], "json_schema")
+
+    def test_one_corrective_retry(self):
+        bad = json.dumps({"state": "Atlantis", "member": None, "breed": None})
+        good = json.dumps({"state": "Texas", "member": None, "breed": None})
+        with patch.object(self.processor.transport.session, "post", side_effect=self.replies(bad, good)):
+            result = self.processor.parse_command("peternak di negara bagian bintang tunggal")
+        self.assertEqual(result["state"], "Texas")
+        # Permintaan koreksi menyertakan jawaban sebelumnya dan alasannya
+        self.assertEqual(self.payloads[1]["messages"][-2]["content"], bad)
+        self.assertIn("Atlantis", self.payloads[1]["messages"][-1]["content"])
+        self.assertEqual(self.processor.corrections, 1)
+
+    def test_invalid_values_never_reach_scraper(self):
+        bad = json.dumps({"state": "Atlantis", "member": None, "breed": "Unicorn"})
+        with patch.object(self.processor.transport.session, "post",
+                          side_effect=self.replies("bukan json", bad)):
+            result = self.processor.parse_command("peternak unicorn di atlantis")
+        self.assertEqual(result, {"state": None, "member": None, "breed": None})
+        self.assertEqual(len(self.payloads), 2)
+        # Hasil yang masih bermasalah tidak disimpan, query yang sama dianalisis ulang
+        self.assertIsNone(self.processor._local_result("peternak unicorn di atlantis"))
+
+
+class TestRuleExtractor(unittest.TestCase):
+    """Pengujian analisis perintah berbasis aturan tanpa LLM"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vocabulary = AMGRScraper()._build_catalog_entry(load_fixture("main_page.html"))
+        cls.extractor = RuleExtractor(cls.vocabulary)
+
+    def test_explicit_queries(self):
+        cases = {
+            "Cari peternak di Texas": {"state": "Texas", "member": None, "breed": None},
+            "Cari peternak American Red di Alabama": {"state": "Alabama", "member": None, "breed": "(AR) - American Red"},
+            "find breeders in KS": {"state": "Kansas", "member": None, "breed": None},
+            "breeders in West Virginia": {"state": "West Virginia", "member": None, "breed": None},
+            "peternak Dwight Elmore": {"state": None, "member": "Dwight Elmore", "breed": None},
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(self.extractor.extract(query), expected)
+
+    def test_ambiguous_queries_fall_through(self):
+        # Nama belakang saja, dua state berbeda, atau tanpa parameter sama sekali
+        for query in ["Tampilkan semua peternak bernama Smith di Kansas",
+                      "peternak di Texas dan Iowa",
+                      "cari semua peternak"]:
+            with self.subTest(query=query):
+                self.assertIsNone(self.extractor.extract(query))
+
+    def test_processor_skips_api(self):
+        processor = NLPProcessor(api_key="test", vocabulary=self.vocabulary)
+        with patch.object(processor.transport.session, "post") as post:
+            self.assertEqual(processor.parse_command("Boer goats in Iowa")["breed"], "(B) - Boer")
+            post.assert_not_called()
+            self.assertEqual(processor.get_api_usage()["rule_hits"], 1)
+
+    def test_offline_without_api_key(self):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            with self.assertRaises(ValueError):
+                NLPProcessor()
+            processor = NLPProcessor(vocabulary=self.vocabulary)
+        self.assertEqual(processor.parse_command("cari peternak di Kansas")["state"], "Kansas")
+        with patch.object(processor.transport.session, "post") as post:
+            result = processor.parse_command("peternak bernama Smith")
+        post.assert_not_called()
+        self.assertEqual(result, {"state": None, "member": None, "breed": None})
+
+
+class TestQueryPipeline(unittest.TestCase):
+    """Pengujian pipeline NL -> resolve -> fetch -> parse"""
+
+    def make_scraper(self, get_delay=0.0, post_delay=0.0):
+        scraper = AMGRScraper()
+        scraper.session = MagicMock()
+
+        def get(*args, **kwargs):
+            time.sleep(get_delay)
+            return fake_response(load_fixture("main_page.html"))
+
+        def post(*args, **kwargs):
+            time.sleep(post_delay)
+            return fake_response(load_fixture("response.html"))
+
+        scraper.session.get.side_effect = get
+        scraper.session.post.side_effect = post
+        return scraper
+
+    def test_catalog_fetch_overlaps_llm_call(self):
+        scraper = self.make_scraper(get_delay=0.3)
+        processor = MagicMock(api_key="test", extractor=None)
+
+        def parse_command(query, remember=True):
+            time.sleep(0.3)
+            return {"state": "kansas", "member": None, "breed": None}
+        processor.parse_command.side_effect = parse_command
+        processor.revalidate.side_effect = lambda query, params: params
+
+        start = time.perf_counter()
+        result = QueryPipeline(scraper, processor).run(nl_query="peternak di kansas")
+        elapsed = time.perf_counter() - start
+
+        # Berurutan butuh 0.6 detik; paralel sekitar 0.3 detik
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(result.results, AMGRScraper()._parse_results(load_fixture("response.html")))
+        self.assertEqual(scraper.session.post.call_args.kwargs["data"]["stateID"], "18")
+        for stage in ("catalog", "nl", "resolve", "fetch", "parse", "total"):
+            self.assertIn(stage, result.timings)
+        processor.set_vocabulary.assert_called_once()
+        # Jawaban dianalisis tanpa kosakata: tidak disimpan di cache dan divalidasi setelah katalog tiba
+        self.assertEqual(processor.parse_command.call_args.kwargs, {"remember": False})
+        processor.revalidate.assert_called_once()
+
+    def test_cold_catalog_answers_are_revalidated(self):
+        """Jawaban LLM sebelum katalog tiba divalidasi ulang dan tidak disimpan dengan key tanpa kosakata"""
+        cases = [
+            # Koreksi tetap tidak valid: tidak ada POST
+            ([{"state": "Atlantis"}, {"state": "Atlantis"}], None),
+            # Koreksi memilih opsi yang ada: dicari dengan nilai resmi
+            ([{"state": "Atlantis"}, {"state": "Kansas"}], "18"),
+        ]
+        for replies, state_id in cases:
+            with self.subTest(state_id=state_id):
+                scraper = self.make_scraper()
+                processor = NLPProcessor(api_key="test", transport=HTTPTransport(max_retries=0))
+                replies = [json.dumps({"state": None, "member": None, "breed": None, **reply}) for reply in replies]
+                payloads = []
+
+                def post(url, **kwargs):
+                    payloads.append(kwargs["json"])
+                    response = MagicMock(status_code=200)
+                    response.json.return_value = {"choices": [{"message": {"content": replies.pop(0)},
+                                                               "finish_reason": "stop"}]}
+                    return response
+
+                with patch.object(processor.transport.session, "post", side_effect=post):
+                    result = QueryPipeline(scraper, processor).run(nl_query="peternak di atlantis")
+
+                self.assertEqual(len(payloads), 2)
+                # Koreksi memakai skema yang sudah berisi daftar opsi
+                self.assertIn("Kansas", payloads[1]["response_format"]["json_schema"]["schema"]["properties"]
+                              ["state"]["anyOf"][0]["enum"])
+                if state_id is None:
+                    self.assertEqual(result.params, {"state": None, "member": None, "breed": None})
+                    scraper.session.post.assert_not_called()
+                else:
+                    self.assertEqual(result.params["state"], "Kansas")
+                    self.assertEqual(scraper.session.post.call_args.kwargs["data"]["stateID"], state_id)
+
+                # Proses baru tanpa kosakata tidak memakai jawaban yang belum divalidasi
+                cold = NLPProcessor(api_key="test", cache=processor.cache)
+                self.assertIsNone(cold._local_result("peternak di atlantis"))
+                self.assertEqual(processor._local_result("peternak di atlantis") is not None, state_id is not None)
+
+    def test_batch_runs_in_input_order(self):
+        scraper = self.make_scraper(post_delay=0.1)
+        queries = [{"state": "Iowa"}, {"state": None}, {"state": "Texas"}, {"state": "Ohio"}]
+        start = time.perf_counter()
+        results = QueryPipeline(scraper, max_workers=3).run_many(queries)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.35)
+        self.assertEqual([r.params["state"] for r in results], ["Iowa", None, "Texas", "Ohio"])
+        self.assertEqual(results[1].results, {"header": [], "data": []})
+        self.assertTrue(results[0].results["data"])
+        self.assertEqual(scraper.session.post.call_count, 3)
+
+
+class TestServer(unittest.TestCase):
+    """Pengujian layanan HTTP mode serve"""
+
+    def setUp(self):
+        self.scraper = TestQueryPipeline.make_scraper(self, post_delay=0.3)
+        self.processor = MagicMock(api_key=None, extractor=None)
+        self.processor.parse_command.return_value = {"state": "Kansas", "member": None, "breed": None}
+        self.service = AMGRService(self.scraper, self.processor)
+        self.service.warm()
+        self.server = create_server(self.service, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_identical_requests_are_coalesced(self):
+        # Penulisan berbeda, form data sama -> satu POST ke situs
+        queries = [{"state": "Kansas"}, {"state": "kansas"}, {"state": "KS"}, {"state": "Kansas"}]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(lambda q: requests.get(self.url + "/search", params=q, timeout=5), queries))
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        bodies = [response.json() for response in responses]
+        self.assertEqual(self.scraper.session.post.call_count, 1)
+        self.assertEqual(sum(body["coalesced"] for body in bodies), 3)
+        self.assertTrue(all(body["results"] == bodies[0]["results"] for body in bodies))
+        self.processor.set_vocabulary.assert_called_once()
+
+    def test_different_requests_run_concurrently(self):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            responses = list(executor.map(
+                lambda state: requests.post(self.url + "/search", json={"state": state}, timeout=5), ["Iowa", "Texas"]))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertEqual(self.scraper.session.post.call_count, 2)
+        self.assertLess(elapsed, 0.55)
+
+    def test_nl_search_and_errors(self):
+        response = requests.get(self.url + "/nl-search", params={"query": "peternak di kansas"}, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["params"]["state"], "Kansas")
+        self.assertTrue(response.json()["results"]["data"])
+
+        self.assertEqual(requests.get(self.url + "/nl-search", timeout=5).status_code, 400)
+        self.assertEqual(requests.post(self.url + "/search", data="[1]", timeout=5).status_code, 400)
+        self.assertEqual(requests.get(self.url + "/unknown", timeout=5).status_code, 404)
+
+        health = requests.get(self.url + "/health", timeout=5).json()
+        self.assertTrue(health["catalog_fresh"])
+        self.assertEqual(health["coalesced"], 0)
+
+        self.service.pipeline.processor = None
+        self.assertEqual(requests.get(self.url + "/nl-search", params={"q": "kansas"}, timeout=5).status_code, 503)
+        self.assertEqual(requests.get(self.url + "/metrics", timeout=5).status_code, 404)
+
+
+class TestReplayTransport(unittest.TestCase):
+    """Pengujian transport rekam/putar ulang fixture"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def handler(self, method, path, body):
+        name = "main_page.html" if method == "GET" else "response.html"
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'}, load_fixture(name)
+
+    def test_record_then_replay_without_network(self):
+        store = FixtureStore(self.tmpdir.name)
+        with StubServer(self.handler) as server:
+            recorder = AMGRScraper(transport=ReplayTransport(store, mode="record"))
+            recorder.base_url = server.url
+            recorded = recorder.search(state="Kansas")
+
+        # Server sudah mati: semua response harus datang dari fixture
+        player = AMGRScraper(transport=ReplayTransport(store, mode="replay", max_retries=0))
+        player.base_url = server.url
+        self.assertEqual(player.search(state="Kansas"), recorded)
+        self.assertEqual(player.catalog.get(player._load_catalog)["etag"], '"v1"')
+        with player.search(state="Kansas", stream=True) as results:
+            self.assertEqual(list(results), recorded["data"])
+
+        # Form berbeda belum pernah direkam
+        with self.assertRaises(FixtureNotFound):
+            player.search(state="Texas")
+        self.assertEqual(player.transport.metrics.retries, 0)
+
+    def test_keys_ignore_headers_and_form_order(self):
+        url = "https://www.amgr.org/frm_directorySearch.cfm"
+        key = request_key("POST", url, data={"stateID": "18", "breedID": ""})
+        self.assertEqual(key, request_key("post", url, data={"breedID": "", "stateID": "18"}))
+        self.assertNotEqual(key, request_key("POST", url, data={"stateID": "19", "breedID": ""}))
+        self.assertEqual(request_key("POST", url, data={"stateID": "19"}, match_body=False),
+                         request_key("POST", url, data={"stateID": "18"}, match_body=False))
+
+    def test_nlp_processor_replay(self):
+        store = FixtureStore(self.tmpdir.name)
+        processor = NLPProcessor(api_key="test", transport=ReplayTransport(store, mode="replay"))
+        messages = processor._command_messages("peternak di kansas")
+        answer = {"choices": [{"message": {"content": '{"state": "Kansas", "member": null, "breed": null}'},
+                               "finish_reason": "stop"}]}
+        store.put("POST", processor.api_url, json.dumps(answer).encode("utf-8"),
+                  headers={"Content-Type": "application/json"},
+                  json=processor._payload(messages, response_format=processor.response_format))
+
+        self.assertEqual(processor.parse_command("peternak di kansas")["state"], "Kansas")
+        self.assertEqual(processor.transport.session.replayed, 1)
+
+
+class TestSyntheticDirectory(unittest.TestCase):
+    """Pengujian generator direktori sintetis dan server stub-nya"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = SyntheticDirectory(members=400, rows=2000, breeds=60, seed=7)
+
+    def test_generator_is_deterministic(self):
+        again = SyntheticDirectory(members=400, rows=2000, breeds=60, seed=7)
+        self.assertEqual(again.rows, self.directory.rows)
+        self.assertNotEqual(SyntheticDirectory(members=400, rows=2000, breeds=60, seed=8).rows, self.directory.rows)
+        options = self.directory.options()
+        self.assertEqual([len(options[k]) for k in ("states", "members", "breeds")], [53, 400, 60])
+
+    def test_parsers_agree_on_generated_page(self):
+        html_content = self.directory.results_page()
+        expected = AMGRScraper(parser="bs4")._parse_results(html_content)
+        self.assertEqual(len(expected["data"]), 2000)
+        self.assertEqual(expected["header"], ["Action", "State", "Name", "Farm", "Phone", "Website"])
+        self.assertEqual(expected["data"][0][0], "navigate_pagination")
+        for name in PARSER_BACKENDS:
+            self.assertEqual(AMGRScraper(parser=name)._parse_results(html_content), expected, name)
+        chunks = [html_content[i:i + 4096] for i in range(0, len(html_content), 4096)]
+        self.assertEqual(StreamingResults(chunks).to_dict(), expected)
+
+    def test_server_filters_like_site(self):
+        with SyntheticServer(self.directory) as server:
+            scraper = AMGRScraper()
+            scraper.base_url = server.url
+            self.assertEqual(scraper.get_options(), self.directory.options())
+
+            kansas = self.directory.options()["states"]["Kansas"]
+            result = scraper.search(state="Kansas", breed="american savanna")
+            breed_id = int(self.directory.options()["breeds"]["(AS) - American Savanna"])
+            expected = self.directory.select(state_id=int(kansas), breed_id=breed_id)
+            self.assertEqual([row[2] for row in result["data"]], [row.name for row in expected])
+            self.assertTrue(all(row[1] == "KS" for row in result["data"]))
+
+            with scraper.search(state="Texas", stream=True) as results:
+                texas = int(self.directory.options()["states"]["Texas"])
+                self.assertEqual(sum(1 for _ in results), len(self.directory.select(state_id=texas)))
+
+            totals = [len(result["data"]) for _, result in scraper.search_many([("Iowa",), ("Texas",), ("Ohio",)])]
+            self.assertEqual(sum(totals), sum(len(self.directory.select(state_id=int(
+                self.directory.options()["states"][state]))) for state in ("Iowa", "Texas", "Ohio")))
+            self.assertEqual(server.requests, 6)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Pengujian span dan counter instrumentasi"""
+
+    def make_scraper(self, **kwargs):
+        self.stream = io.StringIO()
+        self.metrics = PrometheusExporter()
+        scraper = AMGRScraper(instrumentation=Instrumentation(JSONLinesExporter(self.stream), self.metrics), **kwargs)
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        scraper.session.post.return_value = fake_response(load_fixture("response.html"))
+        return scraper
+
+    def records(self):
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_noop_by_default(self):
+        scraper = AMGRScraper()
+        self.assertIs(scraper.instrumentation, NOOP)
+        self.assertIs(scraper.transport.instrumentation, NOOP)
+        with NOOP.span("parse.results") as span:
+            span.set(rows=1)
+
+    def test_search_spans_and_counters(self):
+        scraper = self.make_scraper()
+        result = scraper.search(state="Kansas")
+
+        spans = {record["name"]: record for record in self.records() if record["type"] == "span"}
+        self.assertEqual(set(spans), {"catalog.load", "http.get", "form.analyze", "resolve", "http.post", "parse.results"})
+        # Span bersarang mencatat parent-nya
+        self.assertEqual(spans["http.get"]["parent_id"], spans["catalog.load"]["span_id"])
+        self.assertEqual(spans["form.analyze"]["parent_id"], spans["catalog.load"]["span_id"])
+        self.assertIsNone(spans["http.post"]["parent_id"])
+        self.assertEqual(spans["http.post"]["attributes"]["status"], 200)
+        self.assertEqual(spans["parse.results"]["attributes"]["rows"], len(result["data"]))
+
+        counters = [record for record in self.records() if record["type"] == "counter"]
+        downloaded = sum(record["value"] for record in counters if record["name"] == "http.bytes_downloaded")
+        self.assertEqual(downloaded, len(load_fixture("main_page.html")) + len(load_fixture("response.html")))
+
+        text = self.metrics.render()
+        self.assertIn('amgr_span_duration_seconds_count{span="parse.results",error=""} 1', text)
+        self.assertIn('amgr_span_duration_seconds_bucket{span="http.post",error="",le="+Inf"} 1', text)
+        self.assertIn(f"amgr_rows_parsed_total {len(result['data'])}", text)
+
+    def test_cache_counters_and_errors(self):
+        scraper = self.make_scraper(result_cache=ParsedResultCache())
+        scraper.search(state="Kansas")
+        scraper.search(state="Kansas")
+        text = self.metrics.render()
+        self.assertIn('amgr_cache_hits_total{cache="result"} 1', text)
+        self.assertIn('amgr_cache_misses_total{cache="result"} 1', text)
+
+        scraper.session.post.side_effect = requests.exceptions.ConnectionError("down")
+        scraper.transport.max_retries = 0
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            scraper.search(state="Iowa")
+        self.assertIn('span="http.post",error="ConnectionError"', self.metrics.render())
+
+    def test_llm_call_span(self):
+        stream = io.StringIO()
+        processor = NLPProcessor(api_key="test", transport=HTTPTransport(max_retries=0),
+                                 instrumentation=Instrumentation(JSONLinesExporter(stream)))
+        response = MagicMock(status_code=200)
+        response.json.return_value = {
+            "choices": [{"message": {"content": '{"state": "Kansas", "member": null, "breed": null}'}}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 15},
+        }
+        with patch.object(processor.transport.session, "post", return_value=response):
+            processor.parse_command("peternak di kansas")
+            processor.parse_command("peternak di kansas")
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        llm = [record for record in records if record["name"] == "llm.call"]
+        self.assertEqual(len(llm), 1)
+        self.assertEqual(llm[0]["attributes"]["prompt_tokens"], 120)
+        self.assertEqual([(r["name"], r["labels"]) for r in records if r["name"].startswith("cache.")],
+                         [("cache.misses", {"cache": "nl"}), ("cache.hits", {"cache": "nl"})])
+
+
+class TestProfiling(unittest.TestCase):
+    """Pengujian sesi profiling AMGRScraper.profile()"""
+
+    def test_profile_batch_run(self):
+        scraper = TestQueryPipeline.make_scraper(self, post_delay=0.05)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, "out", "batch")
+            with scraper.profile(prefix, sample_interval=0.001) as session:
+                results = list(scraper.search_many([("Kansas",), ("Iowa",), ("Texas",)], max_workers=3))
+            self.assertIs(scraper._profiler, NO_PROFILE)
+            self.assertEqual(len(results), 3)
+            self.assertFalse([result for _, result in results if "error" in result])
+
+            report = session.report()
+            self.assertEqual(report["allocations"]["calls"], {"parse": 3})
+            self.assertGreater(report["allocations"]["peak_bytes"]["parse"], 0)
+            self.assertTrue(report["allocations"]["top_sites"])
+            self.assertGreater(report["samples"], 0)
+
+            # Parse berjalan di thread worker search_many dan tetap masuk .pstats
+            stats = pstats.Stats(report["files"]["pstats"])
+            parsed = [key for key in stats.stats if key[2] == "_parse_html"]
+            self.assertEqual(stats.stats[parsed[0]][1], 3)
+
+            with open(report["files"]["collapsed"], encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertTrue(lines)
+            self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+            self.assertTrue(any("search (mrscraper.py" in line for line in lines))
+            with open(report["files"]["report"], encoding="utf-8") as f:
+                self.assertIn("Alokasi memori fase parse", f.read())
+
+    def test_allocations_can_be_disabled(self):
+        scraper = TestQueryPipeline.make_scraper(self)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with scraper.profile(os.path.join(tmpdir, "single"), allocations=False) as session:
+                scraper.search(state="Kansas")
+            self.assertIsNone(session.report()["allocations"])
+            self.assertTrue(os.path.exists(session.paths["pstats"]))
+
+    def test_search_many_with_shared_profiler(self):
+        """Python 3.12+: profiler sesi dipakai semua thread, tugas worker tidak membuat profiler baru"""
+        scraper = TestQueryPipeline.make_scraper(self)
+        with patch("profiling.SHARED_PROFILER", True), tempfile.TemporaryDirectory() as tmpdir:
+            with scraper.profile(os.path.join(tmpdir, "batch")) as session:
+                self.assertIs(session.wrap(split_farm), split_farm)
+                results = list(scraper.search_many([("Kansas",), ("Iowa",), ("Texas",)], max_workers=3))
+            self.assertFalse([result for _, result in results if "error" in result])
+            self.assertEqual(session._thread_profilers, [])
+            self.assertEqual(session.report()["allocations"]["calls"], {"parse": 3})
+
+    def test_allocation_sites_cover_parse_phase_only(self):
+        import tracemalloc
+        scraper = TestQueryPipeline.make_scraper(self)
+
+        def make_ballast():
+            return [bytes(1000) for _ in range(2000)]
+        ballast_site = f"{__file__}:{make_ballast.__code__.co_firstlineno + 1}"
+
+        for already_tracing in (False, True):
+            with self.subTest(already_tracing=already_tracing), tempfile.TemporaryDirectory() as tmpdir:
+                if already_tracing:
+                    tracemalloc.start()
+                try:
+                    with scraper.profile(os.path.join(tmpdir, "batch")) as session:
+                        list(scraper.search_many([("Kansas",), ("Iowa",)], max_workers=2))
+                        # Alokasi di luar fase parse tidak boleh masuk lokasi alokasi parse
+                        ballast = make_ballast()
+                    self.assertEqual(tracemalloc.is_tracing(), already_tracing)
+                finally:
+                    tracemalloc.stop()
+                sites = [site["site"] for site in session.report()["allocations"]["top_sites"]]
+                self.assertTrue(sites)
+                self.assertNotIn(ballast_site, sites)
+                self.assertEqual(len(ballast), 2000)
+
+    def test_only_session_workers_are_profiled(self):
+        import tracemalloc
+        scraper = TestQueryPipeline.make_scraper(self)
+
+        def unrelated_work():
+            return sum(range(1000))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with scraper.profile(os.path.join(tmpdir, "batch")) as session:
+                # Thread lain (misalnya writer DebugCapture atau thread server) tidak diprofil
+                thread = threading.Thread(target=unrelated_work)
+                thread.start()
+                thread.join()
+                list(scraper.search_many([("Kansas",), ("Iowa",)], max_workers=2))
+                # Sesi bertumpuk akan saling menimpa profiler, jadi ditolak
+                with self.assertRaises(RuntimeError):
+                    with scraper.profile(os.path.join(tmpdir, "nested")):
+                        pass
+                self.assertIs(scraper._profiler, session)
+
+            self.assertFalse(tracemalloc.is_tracing())
+            self.assertEqual(session.report()["allocations"]["calls"], {"parse": 2})
+            functions = {key[2] for key in session.stats().stats}
+            self.assertIn("_parse_html", functions)
+            if not SHARED_PROFILER:
+                # Sejak Python 3.12 satu profiler sys.monitoring mencatat semua thread
+                self.assertNotIn("unrelated_work", functions)
+
+            # Setelah sesi selesai, sesi baru boleh dibuka lagi
+            with scraper.profile(os.path.join(tmpdir, "again"), allocations=False):
+                scraper.search(state="Kansas")
+
+
+class TestDebugCapture(unittest.TestCase):
+    """Pengujian capture HTML debug asinkron"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.directory = os.path.join(self.tmp_dir.name, "captures")
+
+    def files(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_concurrent_queries_do_not_overwrite(self):
+        capture = DebugCapture(self.directory)
+        scraper = AMGRScraper(capture=capture)
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        scraper.session.post.return_value = fake_response(load_fixture("response.html"))
+
+        list(scraper.search_many([("Kansas",), ("Iowa",), ("Texas",)], max_workers=3))
+        capture.close()
+
+        files = self.files()
+        self.assertEqual(len([name for name in files if name.startswith("main_page-")]), 1)
+        responses = [name for name in files if name.startswith("response-")]
+        # Satu file per query, hash query berbeda
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(len({name.rsplit("-", 1)[1] for name in responses}), 3)
+        self.assertTrue(all(name.endswith(".html.gz") for name in files))
+        self.assertEqual(read_capture(os.path.join(self.directory, responses[0])), load_fixture("response.html"))
+        self.assertEqual(capture.stats()["written"], 4)
+
+    def test_debug_mode_enables_capture(self):
+        first, second = AMGRScraper(debug=True), AMGRScraper(debug=True)
+        self.assertIsInstance(first.capture, DebugCapture)
+        # Scraper mode debug memakai satu capture bersama (satu thread writer per proses)
+        self.assertIs(first.capture, second.capture)
+        own = DebugCapture(self.directory)
+        self.assertIs(AMGRScraper(debug=True, capture=own).capture, own)
+        self.assertIsNone(AMGRScraper().capture)
+
+    def test_rotation_by_count_and_size(self):
+        os.makedirs(self.directory)
+        # File capture lama dari proses sebelumnya ikut dihitung, file lain tidak disentuh
+        old = os.path.join(self.directory, "response-20200101-000000-000000-0123456789ab.html.gz")
+        with open(old, "wb") as f:
+            f.write(b"x" * 10)
+        with open(os.path.join(self.directory, "notes.txt"), "w") as f:
+            f.write("keep")
+
+        with DebugCapture(self.directory, compression="none", max_files=3) as capture:
+            for i in range(4):
+                capture.capture("response", b"<html>%d</html>" % i, key=str(i))
+        self.assertEqual(capture.removed, 2)
+        self.assertNotIn(os.path.basename(old), self.files())
+        self.assertIn("notes.txt", self.files())
+        self.assertEqual(len(self.files()), 4)
+
+        with DebugCapture(self.directory, compression="none", max_bytes=50, max_files=None) as capture:
+            for i in range(3):
+                capture.capture("response", b"y" * 40, key=str(i))
+        # File terbaru tetap disimpan meskipun sendirian melebihi batas
+        captures = [name for name in self.files() if name != "notes.txt"]
+        self.assertEqual(len(captures), 1)
+        self.assertEqual(read_capture(os.path.join(self.directory, captures[0])), b"y" * 40)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        release = threading.Event()
+        capture = DebugCapture(self.directory, queue_size=1)
+        original = capture._compress
+        capture._compress = lambda content: (release.wait(5), original(content))[1]
+
+        paths = [capture.capture("response", b"<html></html>", key=str(i)) for i in range(5)]
+        self.assertIsNone(paths[-1])
+        self.assertGreaterEqual(capture.dropped, 3)
+        release.set()
+        capture.close()
+        self.assertEqual(capture.written + capture.dropped, 5)
+        self.assertIsNone(capture.capture("response", b"late"))
+
+    def test_compression_options(self):
+        with self.assertRaises(ValueError):
+            DebugCapture(self.directory, compression="brotli")
+        if not ZSTD_AVAILABLE:
+            with self.assertRaises(ImportError):
+                DebugCapture(self.directory, compression="zstd")
+            return
+        with DebugCapture(self.directory, compression="zstd") as capture:
+            path = capture.capture("main_page", load_fixture("main_page.html"))
+        self.assertTrue(path.endswith(".html.zst"))
+        self.assertEqual(read_capture(path), load_fixture("main_page.html"))
+
+
+class TestSearchMany(unittest.TestCase):
+    """Pengujian offline pencarian batch paralel"""
+
+    def test_results_tagged_and_host_limit_respected(self):
+        """Semua query mendapat hasil dan batas koneksi per host dipatuhi"""
+        scraper = AMGRScraper(debug=False, max_per_host=2)
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def slow_post(*args, **kwargs):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            if kwargs["data"].get("stateID") == "2":
+                raise ConnectionError("boom")
+            return fake_response(load_fixture("response.html"))
+
+        scraper.session.post.side_effect = slow_post
+
+        queries = [("Kansas",), ("Alaska", None, None), (None, None, "Kiko"), ("Texas", "Smith")]
+        results = dict(scraper.search_many(queries, max_workers=4))
+
+        self.assertEqual(set(results), {("Kansas", None, None), ("Alaska", None, None),
+                                        (None, None, "Kiko"), ("Texas", "Smith", None)})
+        self.assertEqual(len(results[("Kansas", None, None)]["data"]), 3)
+        self.assertIn("error", results[("Alaska", None, None)])
+        self.assertLessEqual(active["peak"], 2)
+        self.assertEqual(scraper.session.get.call_count, 1)
+
+
+class TestDirectoryCrawler(unittest.TestCase):
+    """Pengujian offline crawl direktori dengan checkpoint"""
+
+    def make_scraper(self, fail_states=()):
+        scraper = AMGRScraper(debug=False)
+        scraper.session = MagicMock()
+        scraper.session.get.return_value = fake_response(load_fixture("main_page.html"))
+        options = scraper.get_options()
+        failing = {options["states"][name] for name in fail_states}
+
+        def post(*args, **kwargs):
+            if kwargs["data"].get("stateID") in failing:
+                raise ConnectionError("timeout")
+            return fake_response(load_fixture("response.html"))
+
+        scraper.session.post.side_effect = post
+        return scraper
+
+    def test_crawl_deduplicates_and_resumes(self):
+        """Baris duplikat digabung dan crawl lanjut dari checkpoint"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint = os.path.join(tmp_dir, "crawl.json")
+
+            # Crawl pertama terputus pada dua state
+            first = DirectoryCrawler(self.make_scraper(fail_states=("Iowa", "Texas")), checkpoint,
+                                     include_breeds=True)
+            total = len(first.plan())
+            results = first.run()
+            self.assertEqual(len(results["data"]), 3)
+            self.assertEqual(first.pending(), [("state", "Iowa"), ("state", "Texas")])
+
+            # Crawl kedua hanya menjalankan query yang tersisa
+            scraper = self.make_scraper()
+            second = DirectoryCrawler(scraper, checkpoint)
+            results = second.run()
+            self.assertEqual(scraper.session.post.call_count, 2)
+            self.assertEqual(second.pending(), [])
+            self.assertEqual(len(second.state["completed"]), total)
+
+            self.assertEqual(results["header"][-1], "Breeds")
+            self.assertEqual(len(results["data"]), 3)
+            self.assertIn("(K) - Kiko", results["data"][0][-1])
+
+
+# Body halaman 503 dari server uji
+UNAVAILABLE_PAGE = b"<html><body><p>Service Unavailable</p></body></html>"
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp tidak terinstal")
+class TestAsyncScraper(unittest.IsolatedAsyncioTestCase):
+    """Pengujian AsyncAMGRScraper terhadap server aiohttp lokal"""
+
+    async def asyncSetUp(self):
+        from aiohttp import web
+
+        self.posts = []
+        # Jumlah POST pertama yang dibalas 503 (untuk pengujian retry)
+        self.failures = 0
+        # Status halaman utama (None = 200)
+        self.main_status = None
+        main_page = load_fixture("main_page.html")
+        response_page = load_fixture("response.html")
+
+        async def directory(request):
+            if request.method == "POST":
+                self.posts.append(dict(await request.post()))
+                if self.failures:
+                    self.failures -= 1
+                    return web.Response(status=503, headers={"Retry-After": "0"}, body=UNAVAILABLE_PAGE,
+                                        content_type="text/html")
+                return web.Response(body=response_page, content_type="text/html")
+            if self.main_status:
+                return web.Response(status=self.main_status)
+            return web.Response(body=main_page, content_type="text/html")
+
+        app = web.Application()
+        app.router.add_route("*", "/frm_directorySearch.cfm", directory)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/frm_directorySearch.cfm"
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+
+    async def test_search_matches_sync_parser(self):
+        """Hasil async sama dengan parser sinkron"""
+        async with AsyncAMGRScraper() as scraper:
+            scraper.base_url = self.base_url
+            result = await scraper.search(state="Kansas")
+            options = await scraper.get_options()
+
+        expected = AMGRScraper()._parse_results(load_fixture("response.html"))
+        self.assertEqual(result, expected)
+        self.assertIn("Kansas", options["states"])
+        self.assertEqual(self.posts[0]["submitButton"], "Submit")
+
+    async def test_search_many_streams_all_queries(self):
+        """search_many mengembalikan hasil untuk setiap query"""
+        queries = [("Kansas",), ("Iowa",), (None, None, "Kiko")]
+        async with AsyncAMGRScraper(max_concurrency=2) as scraper:
+            scraper.base_url = self.base_url
+            results = [item async for item in scraper.search_many(queries)]
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(self.posts), 3)
+        self.assertTrue(all(len(result["data"]) == 3 for _, result in results))
+
+    async def test_search_many_bounds_pending_tasks(self):
+        """search_many hanya mengambil 2 x max_concurrency query sebelum hasil pertama"""
+        pulled = []
+
+        def queries():
+            for state in ["Kansas", "Iowa", "Texas"] * 10:
+                pulled.append(state)
+                yield (state,)
+
+        async with AsyncAMGRScraper(max_concurrency=2) as scraper:
+            scraper.base_url = self.base_url
+            results = scraper.search_many(queries())
+            await results.__anext__()
+            self.assertLessEqual(len(pulled), 5)
+            remaining = [item async for item in results]
+        self.assertEqual(len(remaining), 29)
+
+    async def test_retries_transient_errors(self):
+        """503 diulang seperti HTTPTransport dan tercatat di metrik"""
+        from aiohttp import ClientResponseError
+
+        self.failures = 2
+        async with AsyncAMGRScraper(backoff_factor=0) as scraper:
+            scraper.base_url = self.base_url
+            result = await scraper.search(state="Kansas")
+        self.assertEqual(len(result["data"]), 3)
+        self.assertEqual(len(self.posts), 3)
+        self.assertEqual(scraper.metrics.snapshot()["retries"], 2)
+
+        # Setelah retry habis, halaman hasil di-parse apa pun statusnya, sama dengan AMGRScraper
+        self.failures = 5
+        async with AsyncAMGRScraper(backoff_factor=0, max_retries=1) as scraper:
+            scraper.base_url = self.base_url
+            result = await scraper.search(state="Kansas")
+        self.assertEqual(result, AMGRScraper()._parse_results(UNAVAILABLE_PAGE))
+        self.assertEqual(scraper.metrics.snapshot()["errors"], 1)
+
+        # Halaman utama yang gagal tetap menjadi exception, seperti _load_catalog sinkron
+        self.main_status = 404
+        async with AsyncAMGRScraper(backoff_factor=0) as scraper:
+            scraper.base_url = self.base_url
+            with self.assertRaises(ClientResponseError):
+                await scraper.get_options()
+
+    async def test_parse_off_loop_with_instrumentation(self):
+        """Parsing berjalan di thread pool dan span tercatat di instrumentasi"""
+        stream = io.StringIO()
+        threads = []
+        async with AsyncAMGRScraper(instrumentation=Instrumentation(JSONLinesExporter(stream))) as scraper:
+            scraper.base_url = self.base_url
+            parse = scraper._parse_results
+
+            def tracked_parse(html_content):
+                threads.append(threading.get_ident())
+                return parse(html_content)
+            scraper._parse_results = tracked_parse
+            await scraper.search(state="Kansas")
+
+        # Backend cache response (I/O disk) juga dipanggil dari thread pool
+        cache_threads = []
+
+        class TrackedCache(ResponseCache):
+            def get(self, *args):
+                cache_threads.append(threading.get_ident())
+                return super().get(*args)
+
+            def set(self, *args):
+                cache_threads.append(threading.get_ident())
+                return super().set(*args)
+
+        async with AsyncAMGRScraper(response_cache=TrackedCache()) as scraper:
+            scraper.base_url = self.base_url
+            await scraper.search(state="Kansas")
+            await scraper.search(state="Kansas")
+        # Pencarian kedua dilayani cache (get, set, get)
+        self.assertEqual(len(self.posts), 2)
+        self.assertEqual(len(cache_threads), 3)
+        threads.extend(cache_threads)
+
+        self.assertNotIn(threading.get_ident(), threads)
+        names = {json.loads(line)["name"] for line in stream.getvalue().splitlines()}
+        self.assertTrue({"http.get", "http.post", "catalog.load", "form.analyze", "parse.results", "rows.parsed"} <= names)
+
+
 def save_summary_report(results):
     """Simpan laporan ringkasan pengujian ke file JSON"""
     timestamp = time.strftime("%Y%m%d_%H%M%S")
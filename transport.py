@@ -0,0 +1,206 @@
+import time
+import random
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import RateLimiter, parse_retry_after
+from instrumentation import NOOP
+
+
+# Status HTTP yang dianggap sementara dan layak diulang
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def backoff_delay(attempt: int, factor: float, maximum: float) -> float:
+    """Jeda sebelum percobaan ulang ke-(attempt + 1), full jitter dari [0, factor * 2^attempt]"""
+    # Full jitter: sebar percobaan ulang agar worker paralel tidak serentak
+    return random.uniform(0, min(maximum, factor * (2 ** attempt)))
+
+
+class TransportMetrics:
+    """Counter retry/error dan sampel latensi request, aman dipakai banyak thread"""
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=max_samples)
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Ringkasan metrik: jumlah request, retry, error, dan persentil latensi (ms)"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            summary = {
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+            }
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        summary["latency_ms"] = {
+            "count": len(latencies),
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(0.50) if latencies else 0.0,
+            "p95": percentile(0.95) if latencies else 0.0,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        }
+        return summary
+
+
+class HTTPTransport:
+    """
+    Lapisan HTTP di atas requests.Session dengan timeout connect/read, retry dengan
+    exponential backoff + jitter untuk error koneksi, status 5xx, dan 429, ukuran connection
+    pool yang bisa diatur, rate limiter opsional, serta metrik retry dan latensi.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        pool_maxsize: int = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        debug: bool = False,
+        instrumentation=None,
+    ):
+        """
+        Args:
+            connect_timeout: Batas waktu membuka koneksi (detik)
+            read_timeout: Batas waktu menunggu data dari server (detik)
+            max_retries: Jumlah percobaan ulang setelah percobaan pertama gagal
+            backoff_factor: Dasar backoff; jeda percobaan ke-n diambil acak dari [0, factor * 2^n]
+            backoff_max: Jeda maksimum antar percobaan (detik)
+            retry_statuses: Status HTTP yang dianggap sementara dan layak diulang
+            pool_maxsize: Jumlah koneksi per host yang disimpan di pool (samakan dengan tingkat konkurensi)
+            rate_limiter: Pembatas laju request; bisa dibagikan ke beberapa transport/scraper
+            debug: Cetak informasi retry
+            instrumentation: Penerima span http.get/http.post dan counter byte/retry (default no-op)
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter
+        self.debug = debug
+        self.metrics = TransportMetrics()
+        self.instrumentation = instrumentation if instrumentation is not None else NOOP
+
+        self.session = requests.Session()
+        # Retry ditangani sendiri agar bisa memakai jitter dan dicatat di metrik
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Kirim request dengan timeout dan retry
+
+        Returns:
+            Response terakhir. Jika semua percobaan mendapat status yang layak diulang, atau
+            Retry-After dari server lebih lama dari backoff_max, response itu dikembalikan apa adanya.
+
+        Raises:
+            requests.exceptions.RequestException: Jika koneksi tetap gagal setelah semua percobaan
+        """
+        with self.instrumentation.span(f"http.{method.lower()}", url=url) as span:
+            response = self._send(method, url, **kwargs)
+            span.set(status=response.status_code)
+        if self.instrumentation.enabled:
+            # Response streaming belum dibaca; pakai Content-Length jika server mengirimnya
+            size = response.headers.get("Content-Length")
+            if size is None and not kwargs.get("stream"):
+                size = len(response.content)
+            if size is not None:
+                self.instrumentation.count("http.bytes_downloaded", int(size), method=method.upper())
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        send = getattr(self.session, method.lower())
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                response = send(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.metrics.record(time.perf_counter() - start)
+                if attempt >= self.max_retries:
+                    self.metrics.record_error()
+                    raise
+                reason = e.__class__.__name__
+            else:
+                self.metrics.record(time.perf_counter() - start)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.feedback(response.status_code, response.headers.get("Retry-After"))
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                give_up = (
+                    response.status_code not in self.retry_statuses
+                    or attempt >= self.max_retries
+                    or (retry_after is not None and retry_after > self.backoff_max)
+                )
+                if give_up:
+                    if response.status_code in self.retry_statuses:
+                        self.metrics.record_error()
+                    return response
+                reason = f"HTTP {response.status_code}"
+                # Lepaskan koneksi sebelum mencoba lagi (penting untuk response streaming)
+                response.close()
+
+            # Hormati Retry-After dari server jika lebih lama dari backoff
+            delay = max(self._backoff(attempt), retry_after or 0)
+            attempt += 1
+            self.metrics.record_retry()
+            self.instrumentation.count("http.retries", method=method.upper())
+            if self.debug:
+                print(f"Debug - {method} {url} gagal ({reason}), retry {attempt}/{self.max_retries} dalam {delay:.2f} detik")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Tutup semua koneksi di pool"""
+        self.session.close()